@@ -44,4 +44,16 @@ class AdminPasswordWrongError(Exception):
 
 class TypeIsNotValidError(Exception):
     """When user input unvalid item type"""
-    pass
\ No newline at end of file
+    pass
+
+class DisplayIdCollisionError(Exception):
+    """When two users, or two items have the same display id (the first 8 characters)"""
+    pass
+
+class OperationNotAllowedError(Exception):
+    """When the operation can't be done now (e.g, removing a borrowed item, or adding an existing item)"""
+    pass
+
+class ScriptEndedError(Exception):
+    """When a scripted console (no terminal) is asked more questions than its answers"""
+    pass
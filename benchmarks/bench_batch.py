@@ -0,0 +1,77 @@
+"""
+Benchmark: a self-checkout kiosk borrowing a stack of items for each user
+
+compares two ways for each stack (and returning it after that):
+    - one by one => `borrow_item()` + `update_users()` + `update_items()` for each item
+    - batch => one `borrow_many()` + one `update_many()` for the whole stack
+and prints the stacks per second, and the journal writes of each way (without group commit).
+
+Run it from the project folder:
+    python -m benchmarks.bench_batch [items] [stack size] [stacks]
+"""
+import os
+import sys
+import tempfile
+import time
+from models.library import Library
+from models.user import User
+from services import storage
+from benchmarks.dataset import make_items
+
+def one_by_one(library, user, stack):
+    """Borrow then return each item alone, returns how many saves were made"""
+    saves = 0
+    for item in stack:
+        assert library.borrow_item(user, item)
+        assert storage.update_users(library, user) and storage.update_items(library, item)
+        saves += 2
+    for item in stack:
+        assert library.return_item(user, item)
+        assert storage.update_users(library, user) and storage.update_items(library, item)
+        saves += 2
+    return saves
+
+def batch(library, user, stack):
+    """Borrow then return the whole stack together, returns how many saves were made"""
+    assert library.borrow_many(user, stack)[0]
+    assert storage.update_many(library, [user], stack)
+    assert library.return_many(user, stack)[0]
+    assert storage.update_many(library, [user], stack)
+    return 2
+
+def main(items_count, stack_size, stacks):
+    # no group commit => each save is a real write (what the request counts)
+    storage.GROUP_COMMIT = False
+    storage.USE_BINARY_SNAPSHOT = False
+
+    print(f'{items_count:,} items, {stacks} stacks of {stack_size} items (borrow then return)')
+    print(f'{"way":<12}{"stacks/s":>10}{"writes":>10}{"ms/stack":>10}')
+
+    for name, way in (('one by one', one_by_one), ('batch', batch)):
+        with tempfile.TemporaryDirectory() as folder:
+            storage.JOURNAL_FILE_NAME = os.path.join(folder, 'journal.log')
+            storage.ITEMS_FILE_NAME = os.path.join(folder, 'items.json')
+            storage.USERS_FILE_NAME = os.path.join(folder, 'users.json')
+            # the journal compaction stores the whole files => they need to exist
+            open(storage.ITEMS_FILE_NAME, 'w').close()
+            open(storage.USERS_FILE_NAME, 'w').close()
+
+            items = make_items(items_count)
+            users = [User(f'user {number}', f'user{number}@library.com') for number in range(stacks)]
+            library = Library(users, items)
+
+            writes = 0
+            start = time.perf_counter()
+            for number in range(stacks):
+                stack = items[number * stack_size:(number + 1) * stack_size]
+                writes += way(library, users[number], stack)
+            seconds = time.perf_counter() - start
+
+        print(f'{name:<12}{stacks / seconds:>10.1f}{writes:>10,}{seconds / stacks * 1000:>10.2f}')
+
+if __name__ == '__main__':
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 10_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    )
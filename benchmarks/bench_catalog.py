@@ -0,0 +1,64 @@
+"""
+Benchmark: the startup time with the mapped columnar catalog vs making all items instances
+
+    - the normal startup => `Library(users, load_items())` (an instance for each item, and all indexes)
+    - the catalog startup => `Library(users, open_items())` (just mapping data/items.catalog)
+and the title searching on both (the trigram index vs scanning the mapped titles)
+
+Run it from the project folder:
+    python -m benchmarks.bench_catalog [count]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from models.library import Library
+from services import storage
+from benchmarks.dataset import make_items
+
+QUERIES = ['at', 'secret gar', 'ocean 12', 'no such title']
+
+def main(count):
+    with tempfile.TemporaryDirectory() as folder:
+        storage.ITEMS_FILE_NAME = os.path.join(folder, 'items.json')
+        storage.JOURNAL_FILE_NAME = os.path.join(folder, 'journal.log')
+        storage.USE_BINARY_SNAPSHOT = False
+
+        with open(storage.ITEMS_FILE_NAME, 'w') as f:
+            json.dump([item.instance_to_dict() for item in make_items(count)], f)
+        print(f'{count:,} items, items.json is {os.path.getsize(storage.ITEMS_FILE_NAME) / 1024 / 1024:.1f} MB')
+
+        start = time.perf_counter()
+        full = Library([], storage.load_items())
+        full_time = time.perf_counter() - start
+
+        # the first opening writes the catalog file from items.json
+        start = time.perf_counter()
+        storage.open_items()
+        write_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        mapped = Library([], storage.open_items())
+        mapped_time = time.perf_counter() - start
+        assert len(mapped.get_items()) == count
+
+        print(f'startup (all instances):     {full_time:.3f}s')
+        print(f'writing the catalog (once):  {write_time:.3f}s')
+        print(f'startup (mapped catalog):    {mapped_time:.4f}s')
+
+        print(f'\n{"query":<16}{"matches":>8}{"trigram ms":>12}{"mapped ms":>12}')
+        for query in QUERIES:
+            start = time.perf_counter()
+            expected = full.search_by_title(query)
+            index_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            result = mapped.search_by_title(query)
+            mapped_search_time = time.perf_counter() - start
+            assert [item.get_item_id() for item in result] == [item.get_item_id() for item in expected]
+
+            print(f'{query:<16}{len(result):>8}{index_time * 1000:>12.2f}{mapped_search_time * 1000:>12.2f}')
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,124 @@
+"""
+Benchmark: many threads (desks) borrowing, returning, and reserving from one Library together
+
+for each threads count it checks that no item was given to two users:
+    - the race => all threads try to borrow the same items together, each item must have one borrower
+    - the mixed work => random borrow / return / reserve / cancel, then each not available item
+      must be with exactly one user, and each available item with nobody
+and prints the operations per second, and the checkouts (successful borrows) per second.
+
+Run it from the project folder:
+    python -m benchmarks.bench_concurrency [items] [operations per thread]
+"""
+import random
+import sys
+import threading
+import time
+from models.library import Library
+from models.user import User
+from benchmarks.dataset import make_items
+
+THREADS = [1, 2, 4, 8, 16]
+USERS = 200
+
+def make_library(items_count):
+    """Returns a new library with random items and `USERS` users"""
+    users = [User(f'user {number}', f'user{number}@library.com') for number in range(USERS)]
+    return Library(users, make_items(items_count))
+
+def run_threads(count, work):
+    """Runs work(thread number) in `count` threads together, returns the seconds"""
+    barrier = threading.Barrier(count)
+
+    def start(number):
+        barrier.wait()
+        work(number)
+
+    threads = [threading.Thread(target=start, args=(number,)) for number in range(count)]
+    begin = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - begin
+
+# all threads want the same items
+def check_race(threads_count, items_count):
+    """Each thread tries to borrow every item, each item must be borrowed one time"""
+    library = make_library(items_count)
+    users = library.get_users()
+    wins = [0] * threads_count
+
+    def work(number):
+        user = users[number]
+        for item in library.get_items():
+            if library.borrow_item(user, item):
+                wins[number] += 1
+
+    run_threads(threads_count, work)
+    assert sum(wins) == items_count, f'{sum(wins)} borrows for {items_count} items'
+
+# random borrowing, returning, reserving
+def check_mixed(threads_count, items_count, operations):
+    """Random operations from all threads, then check each item has at most one owner"""
+    library = make_library(items_count)
+    users = library.get_users()
+    items = library.get_items()
+    checkouts = [0] * threads_count
+
+    def work(number):
+        rand = random.Random(number)
+        for _ in range(operations):
+            user = rand.choice(users)
+            item = rand.choice(items)
+            action = rand.random()
+            if action < 0.5:
+                if library.borrow_item(user, item):
+                    checkouts[number] += 1
+            elif action < 0.8:
+                library.return_item(user, item)
+            elif hasattr(item, 'reserve'):
+                if action < 0.9:
+                    library.make_reservation(user, item)
+                else:
+                    library.cancel_reserve(user, item)
+
+    seconds = run_threads(threads_count, work)
+
+    # who has each item (borrowed, or reserved)
+    owners = {}
+    for user in users:
+        for item_id in list(user.get_borrowed_items()) + list(user.get_reserved_items()):
+            owners.setdefault(item_id, []).append(user.get_user_id())
+
+    for item in items:
+        item_owners = owners.get(item.get_item_id(), [])
+        if item.check_availability():
+            assert not item_owners, f'{item.get_title()} is available but has owners'
+        else:
+            assert len(item_owners) == 1, f'{item.get_title()} has {len(item_owners)} owners'
+
+    # the counters must be the same as counting the items again
+    for item_type in library.get_types():
+        available = sum(1 for item in library.iter_items_by_type(item_type) if item.check_availability())
+        assert library.get_available_count(item_type) == available
+
+    return sum(checkouts), seconds
+
+def main(items_count, operations):
+    print(f'{items_count:,} items, {USERS} users, {operations:,} operations per thread')
+    print(f'{"threads":>8}{"checkouts":>12}{"seconds":>10}{"operations/s":>14}{"checkouts/s":>14}')
+
+    for threads_count in THREADS:
+        check_race(threads_count, items_count)
+        checkouts, seconds = check_mixed(threads_count, items_count, operations)
+        print(f'{threads_count:>8}{checkouts:>12,}{seconds:>10.2f}'
+              f'{threads_count * operations / seconds:>14,.0f}{checkouts / seconds:>14,.0f}')
+
+    print('no double bookings')
+
+if __name__ == '__main__':
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 2_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    )
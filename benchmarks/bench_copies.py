@@ -0,0 +1,96 @@
+"""
+Benchmark: many copies of the same titles (e.g, 40 copies of each bestseller)
+
+compares the old way (an item instance for each copy, with its own id) with one item for each title
+that has its copies (`Copies`), and measures:
+    - the items.json size, and the memory of the items
+    - the search results of one title
+    - borrowing all the copies of the titles (the old way searches the title, then loops for an available copy)
+
+Run it from the project folder:
+    python -m benchmarks.bench_copies [titles] [copies]
+"""
+import json
+import sys
+import time
+import tracemalloc
+from models.book import Book
+from models.library import Library
+from models.user import User
+
+def measure(make):
+    """Returns (the made value, the memory it keeps in bytes)"""
+    tracemalloc.start()
+    value = make()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, size
+
+def per_copy_items(titles, copies):
+    """The old way => an item for each copy"""
+    return [Book(f'Bestseller {number}', 'James Clear', True) for number in range(titles) for _ in range(copies)]
+
+def title_items(titles, copies):
+    """One item for each title, with its copies"""
+    items = []
+    for number in range(titles):
+        item = Book(f'Bestseller {number}', 'James Clear', True)
+        item.add_copies(copies - 1)
+        items.append(item)
+    return items
+
+# the old way of borrowing any copy
+def borrow_any_copy(library, user, title):
+    """Searches the title, then borrows the first available copy (loops over the copies)"""
+    for item in library.search_by_title(title.lower()):
+        if item.check_availability():
+            return library.borrow_item(user, item)
+    return False
+
+def make_users(count):
+    """Makes `count` users (each library has its own users)"""
+    return [User(f'user {number}', f'user{number}@library.com') for number in range(count)]
+
+def main(titles, copies):
+    old_items, old_memory = measure(lambda: per_copy_items(titles, copies))
+    new_items, new_memory = measure(lambda: title_items(titles, copies))
+    old_size = len(json.dumps([item.instance_to_dict() for item in old_items]))
+    new_size = len(json.dumps([item.instance_to_dict() for item in new_items]))
+
+    old_users, new_users = make_users(copies), make_users(copies)
+    old_library = Library(old_users, old_items)
+    new_library = Library(new_users, new_items)
+
+    print(f'{titles:,} titles x {copies} copies')
+    print(f'{"":<22}{"item each copy":>16}{"copies":>12}')
+    print(f'{"items":<22}{len(old_items):>16,}{len(new_items):>12,}')
+    print(f'{"items.json bytes":<22}{old_size:>16,}{new_size:>12,}')
+    print(f'{"items memory bytes":<22}{old_memory:>16,}{new_memory:>12,}')
+    # the last title => its number isn't the start of another title number
+    query = f'bestseller {titles - 1}'
+    print(f'{"search results":<22}{len(old_library.search_by_title(query)):>16,}'
+          f'{len(new_library.search_by_title(query)):>12,}  (one title)')
+
+    # each user borrows one copy of each title
+    start = time.perf_counter()
+    for number in range(titles):
+        for user in old_users:
+            assert borrow_any_copy(old_library, user, f'Bestseller {number}')
+    old_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for item in new_items:
+        for user in new_users:
+            assert new_library.borrow_item(user, item)
+    new_seconds = time.perf_counter() - start
+
+    borrows = titles * copies
+    print(f'{"borrows/s":<22}{borrows / old_seconds:>16,.0f}{borrows / new_seconds:>12,.0f}'
+          f'  ({old_seconds / new_seconds:,.1f}x faster)')
+    assert new_library.get_available_count('Book') == 0 == old_library.get_available_count('Book')
+
+if __name__ == '__main__':
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    )
@@ -0,0 +1,58 @@
+"""
+Benchmark: the throughput cost of each durability level ('fast', 'safe', 'paranoid')
+
+measures two kinds of writes for each level:
+    - storing the whole items file (`store_items()`, temp file + rename)
+    - appending one record to the journal (what each borrow / return does without group commit)
+
+Run it from the project folder:
+    python -m benchmarks.bench_durability [count] [rounds]
+"""
+import os
+import sys
+import tempfile
+import time
+from services import atomic_file, storage
+from benchmarks.dataset import make_items
+
+def main(count, rounds):
+    items = make_items(count)
+    record = items[0].instance_to_dict()
+
+    # no snapshot and no group commit, to measure just the writing of the files
+    storage.USE_BINARY_SNAPSHOT = False
+    storage.GROUP_COMMIT = False
+
+    print(f'{count:,} items, {rounds} rounds for each level')
+    print(f'{"level":<10}{"store_items/s":>15}{"MB/s":>10}{"journal appends/s":>20}')
+
+    for durability in atomic_file.DURABILITY_LEVELS:
+        with tempfile.TemporaryDirectory() as folder:
+            storage.ITEMS_FILE_NAME = os.path.join(folder, 'items.json')
+            storage.JOURNAL_FILE_NAME = os.path.join(folder, 'journal.log')
+            storage.DURABILITY = durability
+
+            # store_items() needs the file to exist
+            open(storage.ITEMS_FILE_NAME, 'w').close()
+
+            start = time.perf_counter()
+            for _ in range(rounds):
+                assert storage.store_items(items)
+            store_time = time.perf_counter() - start
+            size = os.path.getsize(storage.ITEMS_FILE_NAME)
+
+            appends = rounds * 50
+            start = time.perf_counter()
+            for _ in range(appends):
+                assert storage.append_journal('item', record)
+            append_time = time.perf_counter() - start
+
+        print(f'{durability:<10}{rounds / store_time:>15.1f}'
+              f'{size * rounds / store_time / 1024 / 1024:>10.1f}'
+              f'{appends / append_time:>20.0f}')
+
+if __name__ == '__main__':
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 10_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    )
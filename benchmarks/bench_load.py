@@ -0,0 +1,84 @@
+"""
+Benchmark: the cold start loading time of a big items.json file
+
+compares the old converting (calling the constructor for each item, then replacing its new uuid4)
+with the bulk converting that `load_items()` uses now (`hydrate_items()`),
+and loading from the JSON file with loading from the binary snapshot.
+
+Run it from the project folder:
+    python -m benchmarks.bench_load [count]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from models.book import Book
+from models.dvd import DVD
+from models.magazine import Magazine
+from services import storage
+from benchmarks.dataset import make_items
+
+# the old converting (before `hydrate_items()`)
+def constructor_convert(items_data):
+    """Converts the dictionaries by calling the constructor and then replacing the id"""
+    items = []
+    for item in items_data:
+        item_type = item['type']
+        if item_type == 'Book':
+            instance = Book(item['title'], item['author'], item.get('available', True))
+            instance.set_reserved_by(item.get('reserved_by'))
+        elif item_type == 'Magazine':
+            instance = Magazine(item['title'], item['author'], item.get('available', True))
+        elif item_type == 'DVD':
+            instance = DVD(item['title'], item['author'], item.get('available', True))
+            instance.set_reserved_by(item.get('reserved_by'))
+        else:
+            continue
+        instance._LibraryItem__item_id = item['item_id']
+        items.append(instance)
+    return items
+
+def main(count):
+    with tempfile.TemporaryDirectory() as folder:
+        storage.ITEMS_FILE_NAME = os.path.join(folder, 'items.json')
+        storage.JOURNAL_FILE_NAME = os.path.join(folder, 'journal.log')
+
+        with open(storage.ITEMS_FILE_NAME, 'w') as f:
+            json.dump([item.instance_to_dict() for item in make_items(count)], f)
+        size = os.path.getsize(storage.ITEMS_FILE_NAME)
+        print(f'{count:,} items, items.json is {size / 1024 / 1024:.1f} MB')
+
+        start = time.perf_counter()
+        with open(storage.ITEMS_FILE_NAME) as f:
+            items_data = json.load(f)
+        parse_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        constructor_convert(items_data)
+        constructor_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        storage.hydrate_items(items_data)
+        hydrate_time = time.perf_counter() - start
+
+        # the first loading parses the JSON file (and writes the binary snapshot)
+        start = time.perf_counter()
+        items = storage.load_items()
+        load_time = time.perf_counter() - start
+        assert len(items) == count
+
+        # the second loading uses the fresh binary snapshot
+        start = time.perf_counter()
+        items = storage.load_items()
+        snapshot_load_time = time.perf_counter() - start
+        assert len(items) == count
+
+        print(f'json.load:                  {parse_time:.2f}s')
+        print(f'converting (constructor):   {constructor_time:.2f}s')
+        print(f'converting (hydrate_items): {hydrate_time:.2f}s')
+        print(f'load_items() from JSON:     {load_time:.2f}s')
+        print(f'load_items() from snapshot: {snapshot_load_time:.2f}s')
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
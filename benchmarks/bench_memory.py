@@ -0,0 +1,86 @@
+"""
+Benchmark: how many bytes each item / user instance keeps in memory (using tracemalloc)
+
+it measures what stays in memory after loading the items the same way `load_items()` does
+(JSON text => dictionaries => instances), then dropping the text and the dictionaries,
+for the old layout (a `__dict__` for each instance, its own type string, and not interned authors)
+and the current classes (`__slots__`, the type as a class attribute, interned authors).
+
+Run it from the project folder:
+    python -m benchmarks.bench_memory [count]
+"""
+import gc
+import json
+import sys
+import tracemalloc
+from models.book import Book
+from models.dvd import DVD
+from models.magazine import Magazine
+from models.user import User
+from benchmarks.dataset import make_items
+
+ITEM_CLASSES = {'Book': Book, 'DVD': DVD, 'Magazine': Magazine}
+
+# the old layout (before `__slots__`) => the same attributes in a `__dict__` for each instance
+class DictItem:
+    """An item like the old LibraryItem subclasses (a __dict__, its own type string, the author not interned)"""
+    def __init__(self, item_dict):
+        self.item_id = item_dict['item_id']
+        self.title = item_dict['title']
+        self.author = item_dict['author']
+        self.available = item_dict.get('available', True)
+        self.listener = None
+        self.type = item_dict['type']
+        # just Book and DVD had the reservation attribute
+        if self.type != 'Magazine':
+            self.reserved_by = item_dict.get('reserved_by')
+
+class DictUser:
+    """A user like the old User class (a __dict__ for each instance)"""
+    def __init__(self, user_dict):
+        self.user_id = user_dict['user_id']
+        self.name = user_dict['name']
+        self.email = user_dict['email']
+        self.borrowed_items = user_dict['borrowed_items']
+        self.reserved_items = user_dict['reserved_items']
+        self.waiting_items = user_dict['waiting_items']
+
+def retained_bytes(text, convert):
+    """
+    Returns how many bytes are still allocated after converting the JSON text into instances
+
+    Args:
+        text (str): the JSON text (list of dictionaries)
+        convert (function): converts one dictionary into an instance
+    """
+    gc.collect()
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+
+    records = json.loads(text)
+    instances = [convert(record) for record in records]
+    del records
+    gc.collect()
+
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # keep the instances alive until the measuring is done
+    assert instances
+    return current - start
+
+def main(count):
+    items_text = json.dumps([item.instance_to_dict() for item in make_items(count)])
+    users_text = json.dumps([User(f'user {i}', f'user{i}@example.com').instance_to_dict() for i in range(count)])
+
+    old_item_bytes = retained_bytes(items_text, DictItem)
+    item_bytes = retained_bytes(items_text, lambda d: ITEM_CLASSES[d['type']].dict_to_instance(d))
+    old_user_bytes = retained_bytes(users_text, DictUser)
+    user_bytes = retained_bytes(users_text, User.dict_to_instance)
+
+    print(f'{count:,} records, bytes for each one')
+    print(f'{"":<8}{"__dict__":>12}{"__slots__":>12}{"saved":>10}')
+    for name, old_bytes, new_bytes in (('items', old_item_bytes, item_bytes), ('users', old_user_bytes, user_bytes)):
+        print(f'{name:<8}{old_bytes / count:>12.0f}{new_bytes / count:>12.0f}{1 - new_bytes / old_bytes:>10.0%}')
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
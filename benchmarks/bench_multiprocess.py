@@ -0,0 +1,142 @@
+"""
+Benchmark: many processes (e.g, many terminals) borrowing and returning from the same data folder
+
+each process loads the library from the same JSON files, then each operation is one
+`storage.shared_transaction()` (holds the writer lock, reads the other processes changes, saves).
+all processes want the same items, after they finish the data is loaded again and checked:
+each borrowed item must be with exactly one user, and each available item with nobody.
+prints the operations per second, and the time the processes waited for the lock.
+
+Run it from the project folder:
+    python -m benchmarks.bench_multiprocess [items] [operations per process]
+"""
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from models.library import Library
+from models.user import User
+from services import storage
+from benchmarks.dataset import make_items
+
+PROCESSES = [1, 2, 4, 8]
+USERS = 200
+
+def use_folder(folder):
+    """Point the storage to the data files of the folder"""
+    storage.ITEMS_FILE_NAME = os.path.join(folder, 'items.json')
+    storage.USERS_FILE_NAME = os.path.join(folder, 'users.json')
+    storage.JOURNAL_FILE_NAME = os.path.join(folder, 'journal.log')
+    storage.USE_BINARY_SNAPSHOT = False
+    storage.USE_COLUMNAR_CATALOG = False
+
+def write_data(folder, items_count):
+    """Writes users.json and items.json in the folder"""
+    users = [User(f'user {number}', f'user{number}@library.com') for number in range(USERS)]
+    with open(os.path.join(folder, 'users.json'), 'w') as f:
+        json.dump([user.instance_to_dict() for user in users], f)
+    with open(os.path.join(folder, 'items.json'), 'w') as f:
+        json.dump([item.instance_to_dict() for item in make_items(items_count)], f)
+
+def load_library():
+    """Loads the library from the data files (like main.py does)"""
+    library = Library(storage.load_users(), storage.load_items())
+    storage.refresh(library)
+    return library
+
+def worker(number, folder, operations, barrier, results):
+    """One process: random borrows and returns, each one is a transaction between the processes"""
+    use_folder(folder)
+    library = load_library()
+    users = library.get_users()
+    items = library.get_items()
+    rand = random.Random(number)
+    checkouts = 0
+    waited = 0.0
+
+    barrier.wait()
+    begin = time.perf_counter()
+    for _ in range(operations):
+        user = rand.choice(users)
+        item = rand.choice(items)
+        asked = time.perf_counter()
+        with storage.shared_transaction(library):
+            waited += time.perf_counter() - asked
+            if rand.random() < 0.6:
+                if library.borrow_item(user, item):
+                    checkouts += 1
+                    storage.update_users(library, user)
+                    storage.update_items(library, item)
+            else:
+                # return one of the user items (the user may borrowed it from another process)
+                borrowed = user.get_borrowed_items()
+                if borrowed:
+                    item = library.get_item(next(iter(borrowed)))
+                    if item is not None and library.return_item(user, item):
+                        storage.update_users(library, user)
+                        storage.update_items(library, item)
+    seconds = time.perf_counter() - begin
+
+    storage.close_storage()
+    results.put((checkouts, waited, seconds, storage.shared_stats()['conflicts']))
+
+def check_data(folder):
+    """Loads the saved data again, each borrowed item must be with one user, returns the borrowed count"""
+    use_folder(folder)
+    library = load_library()
+
+    owners = {}
+    for user in library.get_users():
+        for item_id in user.get_borrowed_items():
+            owners.setdefault(item_id, []).append(user.get_user_id())
+
+    for item in library.get_items():
+        item_owners = owners.get(item.get_item_id(), [])
+        if item.check_availability():
+            assert not item_owners, f'{item.get_title()} is available but has owners'
+        else:
+            assert len(item_owners) == 1, f'{item.get_title()} has {len(item_owners)} owners'
+    return len(owners)
+
+def main(items_count, operations):
+    # each process its own interpreter (no shared memory, like many terminals)
+    context = multiprocessing.get_context('spawn')
+
+    print(f'{items_count:,} items, {USERS} users, {operations:,} operations per process')
+    print(f'{"processes":>10}{"checkouts":>11}{"borrowed":>10}{"operations/s":>14}{"lock wait %":>13}{"conflicts":>11}')
+
+    for processes_count in PROCESSES:
+        with tempfile.TemporaryDirectory() as folder:
+            write_data(folder, items_count)
+            barrier = context.Barrier(processes_count)
+            results = context.Queue()
+            processes = [
+                context.Process(target=worker, args=(number, folder, operations, barrier, results))
+                for number in range(processes_count)
+            ]
+            for process in processes:
+                process.start()
+            finished = [results.get() for _ in processes]
+            for process in processes:
+                process.join()
+
+            borrowed = check_data(folder)
+
+        checkouts = sum(result[0] for result in finished)
+        waited = sum(result[1] for result in finished)
+        seconds = max(result[2] for result in finished)
+        busy = sum(result[2] for result in finished)
+        conflicts = sum(result[3] for result in finished)
+        print(f'{processes_count:>10}{checkouts:>11,}{borrowed:>10,}'
+              f'{processes_count * operations / seconds:>14,.0f}{waited / busy * 100:>12.1f}%{conflicts:>11}')
+
+    print('no double bookings')
+
+if __name__ == '__main__':
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 2_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    )
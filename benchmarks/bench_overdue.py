@@ -0,0 +1,89 @@
+"""
+Benchmark: finding the overdue loans with 1,000,000 active loans
+
+the loans have random due times (some days before now, some after), and for a few overdue counts it compares:
+    - the due times heap => `Library.get_overdue()` (costs the overdue loans count)
+    - looping over all users borrowed items (costs all the loans)
+and a batch of reminders (the oldest overdue loans, `limit`) while many loans are overdue.
+
+Run it from the project folder:
+    python -m benchmarks.bench_overdue [loans] [loans per user]
+"""
+import random
+import sys
+import time
+import uuid
+from models.library import Library, DAY_SECONDS
+from models.user import User
+
+OVERDUE_COUNTS = [10, 1_000, 10_000, 100_000]
+REMINDERS_BATCH = 1_000
+
+def make_users(loans_count, loans_per_user, now):
+    """Makes users that have `loans_count` borrowed items, the due times are between 30 days before now and 30 days after"""
+    rand = random.Random(0)
+    users = []
+    for number in range(loans_count // loans_per_user):
+        borrowed_items = {
+            str(uuid.UUID(int=rand.getrandbits(128), version=4)): {'due': now + rand.uniform(-30, 30) * DAY_SECONDS}
+            for _ in range(loans_per_user)
+        }
+        users.append(User.dict_to_instance({
+            'user_id': str(uuid.UUID(int=rand.getrandbits(128), version=4)), 'name': f'user {number}',
+            'email': f'user{number}@library.com', 'borrowed_items': borrowed_items, 'reserved_items': {}, 'waiting_items': {}
+        }))
+    return users
+
+# the old way (no index)
+def looping_overdue(users, now):
+    """Loops over all users borrowed items, returns the overdue (due time, item id) ordered by the due time"""
+    return sorted(
+        (loan['due'], item_id)
+        for user in users for item_id, loan in user.get_borrowed_items().items() if loan['due'] <= now
+    )
+
+def best_time(function, repeat=3):
+    """Returns (the best time in seconds, the result) of calling the function `repeat` times"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+def main(loans_count, loans_per_user):
+    now = time.time()
+    users = make_users(loans_count, loans_per_user, now)
+
+    start = time.perf_counter()
+    library = Library(users, [])
+    print(f'{loans_count:,} loans of {len(users):,} users, building the library (and the heap): '
+          f'{time.perf_counter() - start:.2f}s')
+
+    dues = sorted(loan['due'] for user in users for loan in user.get_borrowed_items().values())
+    if not dues:
+        print('no loans, use more loans than the loans per user')
+        return
+
+    print(f'{"overdue":>10}{"heap ms":>12}{"looping ms":>14}{"faster":>10}')
+    # a few loans => just the overdue counts that they have
+    for count in [count for count in OVERDUE_COUNTS if count <= len(dues)]:
+        # the time when exactly `count` loans are overdue
+        when = dues[count - 1]
+        heap_seconds, loans = best_time(lambda: library.get_overdue(when))
+        looping_seconds, expected = best_time(lambda: looping_overdue(users, when), repeat=1)
+        assert [(loan['due'], loan['item_id']) for loan in loans] == expected
+        print(f'{count:>10,}{heap_seconds * 1000:>12.2f}{looping_seconds * 1000:>14.2f}{looping_seconds / heap_seconds:>9,.1f}x')
+
+    # a batch of reminders while half of the loans are overdue
+    when = dues[len(dues) // 2]
+    batch = min(REMINDERS_BATCH, len(dues) // 2 + 1)
+    batch_seconds, loans = best_time(lambda: library.get_overdue(when, batch))
+    assert len(loans) == batch
+    print(f'a batch of {batch:,} reminders ({len(dues) // 2 + 1:,} overdue loans): {batch_seconds * 1000:.2f} ms')
+
+if __name__ == '__main__':
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    )
@@ -0,0 +1,91 @@
+"""
+Benchmark: replaying a synthetic session trace through the real CLI handlers (without a terminal)
+
+makes a synthetic library (see dataset module), writes a trace of random operations with the same answers
+a person would type (register, borrow, return, reserve, cancel, search, view, admin adding items),
+then replays it with the replay module, and prints the operations per second and the latency of each handler.
+
+Run it from the project folder:
+    python -m benchmarks.bench_replay [items] [operations]
+"""
+import random
+import sys
+import tempfile
+from services import replay, storage, track_process, validators
+from benchmarks.dataset import WORDS, make_library
+
+# the weight of each operation in the trace
+OPERATIONS_MIX = {'register': 5, 'borrow': 30, 'return': 25, 'reserve': 15, 'cancel': 10, 'search': 8, 'view': 2, 'admin': 5}
+
+def make_trace(library, count, seed=0):
+    """
+    Makes `count` operations (the answers of each one) on the library users and items
+
+    the trace keeps which items it borrowed / reserved, so most returns and cancels are real ones
+
+    Returns:
+        list: the operations => {'op', 'answers', 'new_ids'}
+    """
+    rand = random.Random(seed)
+    users_ids = [user.get_display_id() for user in library.get_users()]
+    items = list(library.get_items())
+    free = {item.get_display_id() for item in items if item.check_availability()}
+    reservable = {item.get_display_id() for item in items if hasattr(item, 'reserve')}
+    loans, reservations = [], []
+
+    names, weights = list(OPERATIONS_MIX), list(OPERATIONS_MIX.values())
+    operations = []
+    for number in range(count):
+        name = rand.choices(names, weights)[0]
+        if name == 'register':
+            answers = ['3', f'new.user{number}@library.com', f'new user {number}']
+        elif name == 'borrow' and free:
+            loan = (rand.choice(users_ids), free.pop())
+            loans.append(loan)
+            answers = ['4', '1', *loan]
+        elif name == 'return' and loans:
+            loan = loans.pop(rand.randrange(len(loans)))
+            free.add(loan[1])
+            answers = ['4', '2', *loan]
+        elif name == 'reserve' and free & reservable:
+            item_id = next(iter(free & reservable))
+            free.discard(item_id)
+            reservation = (rand.choice(users_ids), item_id)
+            reservations.append(reservation)
+            answers = ['5', '1', *reservation]
+        elif name == 'cancel' and reservations:
+            reservation = reservations.pop(rand.randrange(len(reservations)))
+            free.add(reservation[1])
+            answers = ['5', '2', *reservation]
+        elif name == 'view':
+            # the first page of the available items, then stop the listing
+            answers = ['1', 'q']
+        elif name == 'admin':
+            title = ' '.join(rand.choice(WORDS) for _ in range(3)).title() + f' New {number}'
+            answers = ['6', validators.ADMIN_PASSWORD, '1', '1', 'book', title, 'New Author']
+        else:
+            answers = ['2', '1', ' '.join(rand.choice(WORDS) for _ in range(2))]
+        operations.append({'op': replay.operation_name(answers), 'answers': answers, 'new_ids': []})
+    return operations
+
+def main(items_count, count):
+    library = make_library(items_count, max(1, items_count // 10))
+    operations = make_trace(library, count)
+
+    with tempfile.TemporaryDirectory() as folder:
+        replay.use_data_folder(folder)
+        # the files need to exist to store into them
+        open(storage.ITEMS_FILE_NAME, 'w').close()
+        open(storage.USERS_FILE_NAME, 'w').close()
+        assert storage.store_items(library.get_items()) and storage.store_users(library.get_users())
+
+        # start like the CLI does (from the files), then replay the trace
+        users, items, library_manager = track_process.initialize_library()
+        print(f'{items_count:,} items, {len(users):,} users, {count:,} operations')
+        replay.print_report(replay.replay(operations, users, items, library_manager))
+
+if __name__ == '__main__':
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 10_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+    )
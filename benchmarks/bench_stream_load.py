@@ -0,0 +1,87 @@
+"""
+Benchmark: the peak memory (RSS) of loading a big items.json file
+
+compares the whole file loading (`load_items()` => json.load, then the instances)
+with the streaming loading (`iter_items()` => one record at a time, read by the `Library` constructor).
+each loading runs in its own process, so the peak RSS of one doesn't hide the other.
+
+a multi-GB catalog is about 15 million items (each item is ~180 bytes in the file):
+    python -m benchmarks.bench_stream_load 15000000
+
+Run it from the project folder:
+    python -m benchmarks.bench_stream_load [count]
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from benchmarks.dataset import make_items
+
+# write the file in batches (a multi-GB list of instances doesn't fit in the memory)
+BATCH_SIZE = 100_000
+
+def write_items_file(file_name, count):
+    """Writes `count` random items into the file as a JSON array, batch by batch"""
+    with open(file_name, 'w') as f:
+        f.write('[\n')
+        for batch, start in enumerate(range(0, count, BATCH_SIZE)):
+            # a different seed for each batch, so the ids are not repeated
+            items = make_items(min(BATCH_SIZE, count - start), seed=batch + 1)
+            text = ',\n'.join(json.dumps(item.instance_to_dict(), indent=4) for item in items)
+            f.write((',\n' if start else '') + text)
+        f.write('\n]')
+
+def peak_rss_mb():
+    """Returns the peak RSS of this process in MB (ru_maxrss is KB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+# runs inside the child process
+def child(mode, folder):
+    from models.library import Library
+    from services import storage
+
+    storage.ITEMS_FILE_NAME = os.path.join(folder, 'items.json')
+    storage.JOURNAL_FILE_NAME = os.path.join(folder, 'journal.log')
+    storage.USE_BINARY_SNAPSHOT = False
+    # 0 => always stream, otherwise never
+    storage.STREAM_LOAD_SIZE = 0 if mode == 'stream' else float('inf')
+
+    base = peak_rss_mb()
+    start = time.perf_counter()
+    library = Library([], storage.iter_items())
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        'items': len(library.get_items()),
+        'seconds': elapsed,
+        'peak_rss_mb': peak_rss_mb(),
+        'base_rss_mb': base
+    }))
+
+def main(count):
+    with tempfile.TemporaryDirectory() as folder:
+        file_name = os.path.join(folder, 'items.json')
+        write_items_file(file_name, count)
+        print(f'{count:,} items, items.json is {os.path.getsize(file_name) / 1024 / 1024:.1f} MB')
+        print(f'{"loader":<12}{"seconds":>10}{"peak RSS MB":>14}{"over start MB":>16}')
+
+        for mode in ('whole', 'stream'):
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.bench_stream_load', '--child', mode, folder],
+                capture_output=True, text=True, check=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            assert result['items'] == count
+
+            print(f'{mode:<12}{result["seconds"]:>10.2f}{result["peak_rss_mb"]:>14.1f}'
+                  f'{result["peak_rss_mb"] - result["base_rss_mb"]:>16.1f}')
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        child(sys.argv[2], sys.argv[3])
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,192 @@
+"""
+Benchmark suite: the main flows of the library from 1,000 to 1,000,000 items
+
+for each scale it makes a synthetic library (see dataset module: the type mix, the loans and the reservations below),
+saves it into a temp data folder, and times:
+    - `storage.load_items()` / `storage.load_users()`
+    - `storage.search_by_title()` / `storage.search_by_type()` (with the displaying of the results)
+    - `display.display_available_items()` (all the items in one page)
+    - `Library.borrow_item()` / `Library.return_item()`
+    - the persistence round trip => `store_items()` + `store_users()`, then loading them again
+
+the results are written to a JSON report (sorted keys, one metric in a line) so two runs can be diffed,
+and if a previous report is given, each time is compared with it.
+
+Run it from the project folder:
+    python -m benchmarks.bench_suite [max scale] [report file] [previous report file]
+"""
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from models.library import Library
+from services import display, storage
+from benchmarks.dataset import make_library
+
+SCALES = [1_000, 10_000, 100_000, 1_000_000]
+# users for each item
+USERS_RATIO = 0.1
+# the weight of each type
+TYPE_MIX = {'Book': 6, 'DVD': 1, 'Magazine': 3}
+# the part of the items that are borrowed, and reserved
+LOAN_DENSITY = 0.2
+RESERVATION_DENSITY = 0.05
+# how many borrows (then returns) to time at each scale (at most)
+BORROW_OPS = 10_000
+TITLE_QUERIES = ['at', 'secret gar', 'ocean 12', 'no such title']
+TYPE_QUERIES = ['book', 'dvd', 'magazine']
+SEED = 0
+REPORT_FILE_NAME = 'bench_report.json'
+
+def best_time(function, repeat):
+    """Returns (the best time in seconds, the result) of calling the function `repeat` times"""
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best, result
+
+def quiet(function, *args):
+    """Calls the function without showing what it prints, returns how many characters it printed"""
+    screen = io.StringIO()
+    with redirect_stdout(screen):
+        function(*args)
+    return len(screen.getvalue())
+
+def use_folder(folder):
+    """Makes the storage use the files of the folder (the files need to exist to store into them)"""
+    storage.ITEMS_FILE_NAME = os.path.join(folder, 'items.json')
+    storage.USERS_FILE_NAME = os.path.join(folder, 'users.json')
+    storage.JOURNAL_FILE_NAME = os.path.join(folder, 'journal.log')
+    open(storage.ITEMS_FILE_NAME, 'w').close()
+    open(storage.USERS_FILE_NAME, 'w').close()
+
+def run_scale(scale):
+    """Runs all the benchmarks with `scale` items, returns metric name => value"""
+    # the small scales are fast => the best of 3 runs
+    repeat = 3 if scale <= 10_000 else 1
+    results = {}
+
+    start = time.perf_counter()
+    library = make_library(scale, max(1, int(scale * USERS_RATIO)), TYPE_MIX, LOAN_DENSITY, RESERVATION_DENSITY, SEED)
+    results['generate.seconds'] = time.perf_counter() - start
+    items, users = library.get_items(), library.get_users()
+
+    with tempfile.TemporaryDirectory() as folder:
+        use_folder(folder)
+
+        # the persistence round trip (storing, then the first loading of the new files)
+        store_seconds, _ = best_time(lambda: storage.store_items(items) and storage.store_users(users), repeat)
+        results['store.seconds'] = store_seconds
+        results['store.items_bytes'] = os.path.getsize(storage.ITEMS_FILE_NAME)
+        results['store.users_bytes'] = os.path.getsize(storage.USERS_FILE_NAME)
+
+        load_items_seconds, loaded_items = best_time(storage.load_items, repeat)
+        load_users_seconds, loaded_users = best_time(storage.load_users, repeat)
+        assert len(loaded_items) == len(items) and len(loaded_users) == len(users)
+        results['load_items.seconds'] = load_items_seconds
+        results['load_users.seconds'] = load_users_seconds
+        results['round_trip.seconds'] = store_seconds + load_items_seconds + load_users_seconds
+
+    start = time.perf_counter()
+    library = Library(loaded_users, loaded_items)
+    results['library.seconds'] = time.perf_counter() - start
+
+    for query in TITLE_QUERIES:
+        seconds, _ = best_time(lambda: quiet(storage.search_by_title, query, library), repeat)
+        results[f'search_by_title[{query}].seconds'] = seconds
+        results[f'search_by_title[{query}].results'] = len(library.search_by_title(query))
+
+    for query in TYPE_QUERIES:
+        seconds, _ = best_time(lambda: quiet(storage.search_by_type, query, library), repeat)
+        results[f'search_by_type[{query}].seconds'] = seconds
+
+    # one page for all the items => no waiting the Enter key between the pages
+    page_size = display.PAGE_SIZE
+    display.PAGE_SIZE = len(loaded_items)
+    try:
+        seconds, printed = best_time(lambda: quiet(display.display_available_items, library), repeat)
+    finally:
+        display.PAGE_SIZE = page_size
+    results['display_available_items.seconds'] = seconds
+    results['display_available_items.characters'] = printed
+
+    # random users borrow random available items, then return them
+    rand = random.Random(SEED)
+    available = [item for item in loaded_items if item.check_availability()]
+    loans = [(rand.choice(loaded_users), item) for item in rand.sample(available, min(BORROW_OPS, len(available)))]
+
+    start = time.perf_counter()
+    for user, item in loans:
+        assert library.borrow_item(user, item)
+    borrow_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for user, item in loans:
+        assert library.return_item(user, item)
+    return_seconds = time.perf_counter() - start
+
+    results['borrow_item.ops_per_second'] = len(loans) / borrow_seconds
+    results['return_item.ops_per_second'] = len(loans) / return_seconds
+    return results
+
+def compare(report, previous):
+    """Prints each metric of the report with the previous value, and how it changed"""
+    print(f'\n{"metric":<48}{"previous":>18}{"now":>18}{"change":>10}')
+    for scale, results in report['scales'].items():
+        old_results = previous.get('scales', {}).get(scale, {})
+        for name, value in results.items():
+            if name not in old_results:
+                continue
+            old_value = old_results[name]
+            change = f'{(value - old_value) / old_value * 100:+.1f}%' if old_value else ''
+            print(f'{scale + " " + name:<48}{old_value:>18,.4f}{value:>18,.4f}{change:>10}')
+
+def main(max_scale, report_file_name, previous_file_name):
+    # the stores are written now (no group commit in the background)
+    storage.GROUP_COMMIT = False
+
+    report = {
+        'settings': {
+            'python': platform.python_version(), 'platform': platform.platform(),
+            'users_ratio': USERS_RATIO, 'type_mix': TYPE_MIX, 'loan_density': LOAN_DENSITY,
+            'reservation_density': RESERVATION_DENSITY, 'borrow_ops': BORROW_OPS, 'seed': SEED,
+            'storage_backend': storage.STORAGE_BACKEND, 'durability': storage.DURABILITY,
+            'binary_snapshot': storage.USE_BINARY_SNAPSHOT
+        },
+        'scales': {}
+    }
+
+    for scale in SCALES:
+        if scale > max_scale:
+            break
+        results = run_scale(scale)
+        # rounded => the report doesn't change for nothing between the runs
+        report['scales'][str(scale)] = {
+            name: round(value, 6) if isinstance(value, float) else value for name, value in results.items()
+        }
+        print(f'\n{scale:,} items')
+        for name, value in results.items():
+            print(f'    {name:<44}{value:>16,.4f}' if isinstance(value, float) else f'    {name:<44}{value:>16,}')
+
+    with open(report_file_name, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f'\nthe report is in {report_file_name}')
+
+    if previous_file_name:
+        with open(previous_file_name) as f:
+            compare(report, json.load(f))
+
+if __name__ == '__main__':
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+        sys.argv[2] if len(sys.argv) > 2 else REPORT_FILE_NAME,
+        sys.argv[3] if len(sys.argv) > 3 else None
+    )
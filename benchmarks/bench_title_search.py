@@ -0,0 +1,57 @@
+"""
+Benchmark: searching by title using the trigram index vs looping over all items
+
+Run it from the project folder:
+    python -m benchmarks.bench_title_search [sizes...]
+e.g, python -m benchmarks.bench_title_search 10000 100000 1000000
+"""
+import sys
+import time
+from models.library import Library
+from benchmarks.dataset import make_items
+
+QUERIES = ['at', 'tom', 'habits', 'secret gar', 'ocean 12', 'no such title']
+
+# the old search (looping over all items)
+def linear_search(search_query, items):
+    """The same searching as the old `search_by_title()` (startswith, or in)"""
+    result = []
+    for item in items:
+        item_title = item.get_title().lower()
+        if item_title.startswith(search_query):
+            result.append(item)
+        elif len(search_query) > 2 and search_query in item_title:
+            result.append(item)
+    return result
+
+def best_time(function, repeat=5):
+    """Returns the best time (in seconds) of calling the function `repeat` times"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def main(sizes):
+    for size in sizes:
+        items = make_items(size)
+
+        start = time.perf_counter()
+        library = Library([], items)
+        build_time = time.perf_counter() - start
+
+        print(f'\n--- {size:,} items (building the indexes: {build_time:.2f}s) ---')
+        print(f"{'query':<16}{'matches':>10}{'loop (ms)':>12}{'index (ms)':>12}{'speedup':>10}")
+        for query in QUERIES:
+            # the results must be the same
+            expected = linear_search(query, items)
+            assert library.search_by_title(query) == expected, query
+
+            loop_time = best_time(lambda: linear_search(query, items))
+            index_time = best_time(lambda: library.search_by_title(query))
+            speedup = loop_time / index_time if index_time else float('inf')
+            print(f'{query:<16}{len(expected):>10}{loop_time * 1000:>12.2f}{index_time * 1000:>12.2f}{speedup:>9.1f}x')
+
+if __name__ == '__main__':
+    main([int(size) for size in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
@@ -0,0 +1,94 @@
+"""
+Benchmark: the users borrowed items as lists of the items dictionaries vs item id sets
+
+each user has many borrowed items, and it compares:
+    - the users.json size (the old format copies the title and the author of each item into the user)
+    - checking if the user borrowed an item (the old way loops and compares the titles)
+    - returning the items (the old way rebuilds the dictionary and calls `list.remove()`)
+and loading the old format (converting it with `User.migrate_dict()`).
+
+Run it from the project folder:
+    python -m benchmarks.bench_users_format [users] [loans per user]
+"""
+import json
+import sys
+import time
+from models.book import Book
+from models.user import User
+
+def make_items(count):
+    """Makes `count` books with long titles (like the real titles)"""
+    return [Book(f'The Complete Guide To Library Systems, Part {number}', 'Mohammed Yazji', False) for number in range(count)]
+
+def old_user_dict(number, items):
+    """A user saved in the old format => a list of the items dictionaries (with their titles and authors)"""
+    return {
+        'user_id': f'{number:032x}', 'name': f'user {number}', 'email': f'user{number}@library.com',
+        'borrowed_items': [
+            {'title': item.get_title(), 'author': item.get_author(), 'item_id': item.get_item_id(), 'due': 1e9}
+            for item in items
+        ],
+        'reserved_items': [], 'waiting_items': []
+    }
+
+# the old way of checking and returning
+def old_has_borrowed(borrowed_items, item):
+    """Loops over the borrowed items and compares the titles"""
+    for borrowed_item in borrowed_items:
+        if borrowed_item['title'] == item.get_title():
+            return True
+    return False
+
+def old_return(borrowed_items, item):
+    """Rebuilds the item dictionary, then `list.remove()` compares it with each borrowed item"""
+    borrowed_items.remove({'title': item.get_title(), 'author': item.get_author(), 'item_id': item.get_item_id(), 'due': 1e9})
+
+def main(users_count, loans_per_user):
+    items = make_items(loans_per_user)
+    old_dicts = [old_user_dict(number, items) for number in range(users_count)]
+
+    start = time.perf_counter()
+    users = [User.dict_to_instance(user_dict) for user_dict in old_dicts]
+    migrate_seconds = time.perf_counter() - start
+
+    old_size = len(json.dumps(old_dicts))
+    new_size = len(json.dumps([user.instance_to_dict() for user in users]))
+    print(f'{users_count:,} users x {loans_per_user} borrowed items (loading the old format: {migrate_seconds:.2f}s)')
+    print(f'{"":<24}{"lists":>14}{"id sets":>14}')
+    print(f'{"users.json bytes":<24}{old_size:>14,}{new_size:>14,}  ({old_size / new_size:,.1f}x smaller)')
+
+    # checking each borrowed item of each user (the last items cost the most in the old way)
+    start = time.perf_counter()
+    for user_dict in old_dicts:
+        for item in items:
+            assert old_has_borrowed(user_dict['borrowed_items'], item)
+    old_check = time.perf_counter() - start
+    start = time.perf_counter()
+    for user in users:
+        for item in items:
+            assert item.get_item_id() in user.get_borrowed_items()
+    new_check = time.perf_counter() - start
+
+    checks = users_count * loans_per_user
+    print(f'{"checks/s":<24}{checks / old_check:>14,.0f}{checks / new_check:>14,.0f}  ({old_check / new_check:,.1f}x faster)')
+
+    # returning all the items (the first borrowed first)
+    start = time.perf_counter()
+    for user_dict in old_dicts:
+        for item in items:
+            old_return(user_dict['borrowed_items'], item)
+    old_returns = time.perf_counter() - start
+    start = time.perf_counter()
+    for user in users:
+        for item in items:
+            user.remove_borrowed_item(item.get_item_id())
+    new_returns = time.perf_counter() - start
+
+    print(f'{"returns/s":<24}{checks / old_returns:>14,.0f}{checks / new_returns:>14,.0f}  ({old_returns / new_returns:,.1f}x faster)')
+    assert all(not user.get_borrowed_items() for user in users)
+
+if __name__ == '__main__':
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    )
@@ -0,0 +1,87 @@
+"""
+Benchmark: the reservations queues (waitlists) with many holds across the catalog
+
+borrows some popular items, then many users join their queues (100,000 holds by default), and measures:
+    - joining the queues (`make_reservation()` on a not available item)
+    - the queue position lookups (the indexed position vs looping over the queue list)
+    - giving the item to the next user (`return_item()` => the first waiting user gets it)
+    - loading the library again from the saved users (building the queues from their tickets)
+
+Run it from the project folder:
+    python -m benchmarks.bench_waitlist [holds] [popular items]
+"""
+import random
+import sys
+import time
+from models.library import Library
+from models.user import User
+from benchmarks.dataset import make_items
+
+ITEMS = 20_000
+LOOKUPS = 20_000
+
+def main(holds, popular_count):
+    items = [item for item in make_items(ITEMS) if hasattr(item, 'reserve')]
+    users = [User(f'user {number}', f'user{number}@library.com') for number in range(holds)]
+    owners = [User(f'owner {number}', f'owner{number}@library.com') for number in range(popular_count)]
+    library = Library(users + owners, items)
+    popular = items[:popular_count]
+
+    for owner, item in zip(owners, popular):
+        assert library.borrow_item(owner, item)
+
+    print(f'{len(items):,} reservable items, {holds:,} holds on {popular_count:,} borrowed items '
+          f'({holds // popular_count:,} users in each queue)')
+
+    # joining
+    start = time.perf_counter()
+    for number, user in enumerate(users):
+        assert library.make_reservation(user, popular[number % popular_count])
+    seconds = time.perf_counter() - start
+    print(f'joining the queues:        {holds / seconds:>12,.0f} holds/s')
+
+    # the position lookups
+    rand = random.Random(0)
+    lookups = [rand.randrange(holds) for _ in range(LOOKUPS)]
+    queues = {item.get_item_id(): [user.get_user_id() for user in library.get_waiting_users(item.get_item_id())]
+              for item in popular}
+
+    start = time.perf_counter()
+    for number in lookups:
+        library.get_waitlist_position(users[number], popular[number % popular_count])
+    indexed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for number in lookups:
+        queues[popular[number % popular_count].get_item_id()].index(users[number].get_user_id())
+    looping = time.perf_counter() - start
+    print(f'position lookups indexed:  {LOOKUPS / indexed:>12,.0f} lookups/s')
+    print(f'position lookups looping:  {LOOKUPS / looping:>12,.0f} lookups/s  ({looping / indexed:,.0f}x slower)')
+
+    # giving each item to its next user: the holder borrows it, then returns it => the next one gets it
+    start = time.perf_counter()
+    promotions = 0
+    for owner, item in zip(owners, popular):
+        assert library.return_item(owner, item)
+        promotions += 1
+    for _ in range(holds // popular_count - 1):
+        for item in popular:
+            holder = library.get_reserver(item.get_item_id())
+            assert library.borrow_item(holder, item) and library.return_item(holder, item)
+            promotions += 1
+    seconds = time.perf_counter() - start
+    print(f'giving to the next user:   {promotions / seconds:>12,.0f} promotions/s (each one is a borrow + return)')
+
+    # loading the queues again from the saved users (before the promotions)
+    saved_users = [user.instance_to_dict() for user in users]
+    for number, user_dict in enumerate(saved_users):
+        user_dict['waiting_items'] = {popular[number % popular_count].get_item_id(): {'ticket': number + 1}}
+    start = time.perf_counter()
+    Library([User.dict_to_instance(user_dict) for user_dict in saved_users], items)
+    print(f'loading {holds:,} holds:      {time.perf_counter() - start:>12.2f}s')
+
+if __name__ == '__main__':
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 100_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    )
@@ -0,0 +1,108 @@
+"""
+This dataset module: makes fake (synthetic) items and users to measure the
+performance of the library with big catalogs and user bases
+"""
+import random
+import uuid
+from models.book import Book
+from models.dvd import DVD
+from models.library import Library
+from models.magazine import Magazine
+from models.user import User
+
+WORDS = [
+    'atomic', 'habits', 'the', 'power', 'of', 'now', 'deep', 'work', 'clean', 'code',
+    'python', 'tom', 'and', 'jerry', 'counter', 'strike', 'national', 'geographic', 'time',
+    'history', 'world', 'war', 'science', 'art', 'music', 'life', 'mind', 'story', 'night',
+    'river', 'garden', 'kingdom', 'shadow', 'light', 'ocean', 'mountain', 'secret', 'silent'
+]
+AUTHORS = ['James Clear', 'Stephen Covey', 'Valve', 'William Hanna', 'Cal Newport', 'Robert Martin']
+ITEM_CLASSES = [Book, DVD, Magazine]
+FIRST_NAMES = ['mohammed', 'sara', 'omar', 'lina', 'yousef', 'huda', 'adam', 'maya', 'khaled', 'noor']
+
+# make random items
+def make_items(count, seed=0, type_mix=None):
+    """
+    Makes a list of random items (Book, DVD, Magazine)
+
+    each title is 2 - 5 random words + a number, so titles look real and share trigrams
+
+    Args:
+        count (int): how many items to make
+        seed (int): the random seed (the same seed => the same items)
+        type_mix (dict): the weight of each type (e.g, {'Book': 6, 'DVD': 1, 'Magazine': 3}),
+            or None for the same chance of each type
+
+    Returns:
+        list: list of items instances
+    """
+    rand = random.Random(seed)
+    classes = ITEM_CLASSES
+    weights = None
+    if type_mix:
+        classes = [item_class for item_class in ITEM_CLASSES if type_mix.get(item_class.__name__)]
+        weights = [type_mix[item_class.__name__] for item_class in classes]
+    items = []
+    for number in range(count):
+        title = ' '.join(rand.choice(WORDS) for _ in range(rand.randint(2, 5))).title() + f' {number}'
+        item_class = rand.choice(classes) if weights is None else rand.choices(classes, weights)[0]
+        item = item_class(title, rand.choice(AUTHORS), True)
+        # uuid4 from the random seed to make the same ids each run
+        item._LibraryItem__item_id = str(uuid.UUID(int=rand.getrandbits(128), version=4))
+        items.append(item)
+    return items
+
+# make random users
+def make_users(count, seed=0):
+    """
+    Makes a list of users without items (each name is a first name + a number, so names are unique)
+
+    Args:
+        count (int): how many users to make
+        seed (int): the random seed (the same seed => the same users)
+
+    Returns:
+        list: list of users instances
+    """
+    rand = random.Random(seed)
+    users = []
+    for number in range(count):
+        name = f'{rand.choice(FIRST_NAMES)} {number}'
+        user = User(name, f'{name.replace(" ", ".")}@library.com')
+        user._User__user_id = str(uuid.UUID(int=rand.getrandbits(128), version=4))
+        users.append(user)
+    return users
+
+# make a whole library (items + users + loans + reservations)
+def make_library(items_count, users_count, type_mix=None, loan_density=0.2, reservation_density=0.05, seed=0):
+    """
+    Makes a library with random items and users, then random users borrow and reserve some items
+    using the library methods (so the items, the users, and the library indexes agree)
+
+    Args:
+        items_count (int): how many items
+        users_count (int): how many users
+        type_mix (dict): the weight of each type (see `make_items()`)
+        loan_density (float): the part of the items that are borrowed (0 - 1)
+        reservation_density (float): the part of the items that are reserved (0 - 1, just Book and DVD can be reserved)
+        seed (int): the random seed (the same seed => the same library)
+
+    Returns:
+        Library: the library that has the items and the users
+    """
+    rand = random.Random(seed)
+    items = make_items(items_count, seed, type_mix)
+    users = make_users(users_count, seed)
+    library = Library(users, items)
+    if not users:
+        return library
+
+    # different items for the loans and the reservations (a borrowed item can't be reserved)
+    chosen = rand.sample(items, min(items_count, round(items_count * (loan_density + reservation_density))))
+    loans_count = round(items_count * loan_density)
+    for item in chosen[:loans_count]:
+        library.borrow_item(rand.choice(users), item)
+    for item in chosen[loans_count:]:
+        if hasattr(item, 'reserve'):
+            library.make_reservation(rand.choice(users), item)
+    return library
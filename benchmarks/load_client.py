@@ -0,0 +1,161 @@
+"""
+Benchmark: the load generator client for the library service (services/server.py)
+
+starts the service on a temp copy of a synthetic catalog (in its own process),
+connects many clients together (1000 by default), each one sends requests one after one
+(searching, borrowing, returning), and prints the p50 and p99 latency of each operation.
+
+Run it from the project folder:
+    python -m benchmarks.load_client [clients] [requests per client] [items]
+"""
+import asyncio
+import json
+import os
+import random
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from models.user import User
+from benchmarks.dataset import WORDS, make_items
+
+HOST = '127.0.0.1'
+# the operations mix => (operation, share of the requests)
+MIX = [('search', 0.7), ('borrow', 0.15), ('return', 0.15)]
+
+def raise_files_limit(needed):
+    """Each client is one socket (a file) in this process and one in the server => raise the open files limit"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+    if soft < wanted:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+
+def free_port():
+    """Returns a free local port"""
+    with socket.socket() as s:
+        s.bind((HOST, 0))
+        return s.getsockname()[1]
+
+def write_data(folder, users_count, items_count):
+    """Writes data/users.json and data/items.json in the folder, returns (users display ids, items display ids)"""
+    os.makedirs(os.path.join(folder, 'data'))
+    users = [User(f'client {number}', f'client{number}@library.com') for number in range(users_count)]
+    items = make_items(items_count)
+
+    with open(os.path.join(folder, 'data', 'users.json'), 'w') as f:
+        json.dump([user.instance_to_dict() for user in users], f)
+    with open(os.path.join(folder, 'data', 'items.json'), 'w') as f:
+        json.dump([item.instance_to_dict() for item in items], f)
+
+    return [user.get_display_id() for user in users], [item.get_display_id() for item in items]
+
+async def wait_server(port, seconds=120):
+    """Wait until the service accepts connections"""
+    deadline = time.monotonic() + seconds
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(HOST, port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.2)
+
+async def client(number, port, requests, user_id, items_ids, barrier, latencies, failures):
+    """One client: connects, waits all the other clients to connect, then sends its requests one after one"""
+    reader, writer = await asyncio.open_connection(HOST, port, limit=1024 * 1024)
+    rand = random.Random(number)
+    operations = [operation for operation, _ in MIX]
+    weights = [weight for _, weight in MIX]
+    borrowed = []
+
+    await barrier.wait()
+    for _ in range(requests):
+        operation = rand.choices(operations, weights)[0]
+        if operation == 'search':
+            request = {'op': 'search', 'query': rand.choice(WORDS)[:rand.randint(2, 6)]}
+        elif operation == 'return' and borrowed:
+            request = {'op': 'return', 'user_id': user_id, 'item_id': borrowed.pop()}
+        else:
+            operation = 'borrow'
+            request = {'op': 'borrow', 'user_id': user_id, 'item_id': rand.choice(items_ids)}
+
+        begin = time.perf_counter()
+        writer.write(json.dumps(request).encode() + b'\n')
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        latencies[operation].append(time.perf_counter() - begin)
+
+        if operation == 'borrow' and response['ok']:
+            borrowed.append(request['item_id'])
+        elif not response['ok'] and operation == 'search':
+            failures.append(response['error'])
+
+    writer.close()
+
+def percentile(values, percent):
+    """Returns the percent percentile of the values (e.g, 50, 99)"""
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method='inclusive')[percent - 1]
+
+async def run(clients, requests, items_count):
+    raise_files_limit(clients * 2 + 256)
+
+    with tempfile.TemporaryDirectory() as folder:
+        users_ids, items_ids = write_data(folder, clients, items_count)
+        port = free_port()
+
+        # the service in its own process (so the clients don't share its CPU time)
+        project = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'services.server', str(port)],
+            cwd=folder, env=dict(os.environ, PYTHONPATH=project),
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+
+        try:
+            await wait_server(port)
+
+            latencies = {operation: [] for operation, _ in MIX}
+            failures = []
+            # all clients are connected before the load starts (the clients + this function)
+            barrier = asyncio.Barrier(clients + 1)
+            tasks = [
+                asyncio.create_task(client(number, port, requests, users_ids[number], items_ids, barrier, latencies, failures))
+                for number in range(clients)
+            ]
+            await barrier.wait()
+
+            begin = time.perf_counter()
+            await asyncio.gather(*tasks)
+            seconds = time.perf_counter() - begin
+
+        finally:
+            server.terminate()
+            server.wait()
+
+    total = sum(len(values) for values in latencies.values())
+    print(f'{clients:,} clients, {requests} requests each, {items_count:,} items')
+    print(f'{total:,} requests in {seconds:.2f}s => {total / seconds:,.0f} requests/s')
+    print(f'{"operation":<10}{"count":>8}{"p50 ms":>10}{"p99 ms":>10}')
+
+    everything = []
+    for operation, values in latencies.items():
+        everything += values
+        print(f'{operation:<10}{len(values):>8}{percentile(values, 50) * 1000:>10.2f}{percentile(values, 99) * 1000:>10.2f}')
+    print(f'{"all":<10}{len(everything):>8}{percentile(everything, 50) * 1000:>10.2f}{percentile(everything, 99) * 1000:>10.2f}')
+
+    if failures:
+        print(f'{len(failures)} failed searches, e.g, {failures[0]}')
+
+if __name__ == '__main__':
+    asyncio.run(run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 20,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 10_000
+    ))
@@ -1,9 +1,18 @@
 """
 The main module: The Start point of The Library Management System.
 
-Handle the interaction of the user with the application 
+Handle the interaction of the user with the application
+
+to record the session into a trace file (and replay it later, see replay module):
+    python main.py session.jsonl
 """
-from services import display, track_process
+import sys
+from services import console, display, replay, storage, track_process
+
+# the trace file to record the session into (or None)
+trace_file_name = sys.argv[1] if len(sys.argv) > 1 else None
+if trace_file_name:
+    console.set_console(console.RecordingConsole())
 
 # initialize the application using => `initialize_library()`
 # and load the data from the JSON Files
@@ -11,34 +20,24 @@ users, items, library_manager = track_process.initialize_library()
 
 # The Main Loop [To keep displaying the menu]
 while True:
+    # read the changes of the other processes first (e.g, another terminal borrowed an item)
+    storage.refresh(library_manager)
+
     # display the menu and get the choice (1 - 7)
     choice = display.display_welcome_message()
 
-    # view all available items
-    if choice == 1:
-        display.display_available_items(users, items)
-
-    # search an items based on title, or type
-    elif choice == 2:
-        track_process.handle_searching(users, items)
-
-    # register a new user
-    elif choice == 3:
-        track_process.register_user(users)
-
-    # Borrow an item / return an item
-    elif choice == 4:
-        track_process.handle_borrow_return(users, items, library_manager)
-
-    # Reserve an item / cancel reservation
-    elif choice == 5:
-        track_process.handle_reserve_cancel(users, items, library_manager)
-        
-    # Admin: Add/Remove Items/Users (As Admin)
-    elif choice == 6:
-        track_process.handle_admin(users, items, library_manager)
-        
     # Exit and Save
-    elif choice == 7:
-        print("💡 Thanks for using my Library Management System.")
+    if choice == 7:
+        # save the waiting changes (group commit) before exit
+        storage.close_storage()
+        console.say("💡 Thanks for using my Library Management System.")
         exit()
+
+    # view, search, register, borrow / return, reserve / cancel, or admin
+    users_count, items_count = len(users), len(items)
+    track_process.handle_choice(choice, users, items, library_manager)
+
+    # save what the user typed for this choice into the trace (and the ids of the new users / items)
+    if trace_file_name:
+        new_ids = replay.new_display_ids(users, users_count) + replay.new_display_ids(items, items_count)
+        replay.append_trace(trace_file_name, console.get_console().take_answers(), new_ids)
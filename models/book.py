@@ -1,3 +1,4 @@
+from .copies import Copies
 from .libraryitem import LibraryItem
 from .reservable import Reservable
 
@@ -12,7 +13,8 @@ class Book(LibraryItem, Reservable):
     and make reservation.
     
     Attributes:
-        __type (str): Type of the instances will create using this constructor default 'Book'
+        __type (str): Type of the instances will create using this constructor 'Book'
+            (class attribute => one string for all the instances)
         
     Methods:
         display_info: Displays all the book information (override the abstractmethod)
@@ -21,6 +23,9 @@ class Book(LibraryItem, Reservable):
         dict_to_instance: `Class method` to create a Book instance from a dictionary after load items from JSON as dict
         instance_to_dict: Converts the book object to a `dictionary` to store it inside the items JSON File
     """
+    __slots__ = ('_reserved_by',)
+    __type = 'Book'
+
     def __init__(self, title, author, available):
         """
         Initialize a new Book instance.
@@ -33,7 +38,6 @@ class Book(LibraryItem, Reservable):
         # Explicitly call to the two constructors
         LibraryItem.__init__(self, title, author, available)
         Reservable.__init__(self)       
-        self.__type = 'Book'
 
     @classmethod
     def dict_to_instance(cls, book_dict):
@@ -48,42 +52,41 @@ class Book(LibraryItem, Reservable):
         Returns:
             Book: Returns an instance from the Book class
         """
-        book = cls(book_dict['title'], book_dict['author'], book_dict.get('available', True))
-        book._LibraryItem__item_id = book_dict['item_id'] # to prevent name-mangling (in python)
-        book.__type = book_dict['type']
+        # `from_values()` => without the constructor (no new uuid4 to replace it)
+        book = cls.from_values(book_dict['item_id'], book_dict['title'], book_dict['author'], book_dict.get('available', True))
         book._reserved_by = book_dict.get('reserved_by', None)  # Use get() with default None
+        book.set_copies(Copies.from_dict(book_dict))
         return book
     
     # implement the abstract method
-    def display_info(self, users):
+    def display_info(self, library_manager):
         """
         Display information about the book including its status, and borrowed by or reserved by if exist.
 
         Args:
-            users (list): List of User objects to check for borrowed and reserved status
+            library_manager (Library): the library object to get who borrowed and reserved the book
 
         Returns:
             str: Formatted string of DVD information
         """
         borrowed_by_name = None
         reserved_by_name = None
-        
-        # check the borrowed status
-        for user in users:
-            user_borrowed_items = user.get_borrowed_items()
-            # loop over each item in the user borrowed list
-            for item in user_borrowed_items:
-                # if this item exist there so store the user name here `borrowed_by_name`
-                if self.get_item_id() == item['item_id']:
-                    borrowed_by_name = user.get_name()
-            
-            # check the reserved status
-            # if the uer id matches this item id store the user as reserved here `reserved_by_name`
-            if user.get_user_id() == self._reserved_by:
-                reserved_by_name = user.get_name()
-            
+
+        # check the borrowed status and the reserved status
+        # using the library indexes (item id => user) without looping over the users
+        borrowers = library_manager.get_borrowers(self)
+        if borrowers:
+            borrowed_by_name = ', '.join(borrower.get_name() for borrower in borrowers)
+
+        reservers = library_manager.get_holders(self)
+        if reservers:
+            reserved_by_name = ', '.join(reserver.get_name() for reserver in reservers)
+
         # intial value 
         item_status = "available ✅" if self.check_availability() else "not available ❌"
+        # many copies => how many of them are free
+        if self.get_copies() is not None:
+            item_status = item_status + f" ({self.get_free_copies()} of {self.get_copies_count()} copies free)"
         # if borrowed_by_name not None => add it to `item_status` str
         if borrowed_by_name:
             item_status = item_status +  f", borrowed by {borrowed_by_name}"
@@ -106,12 +109,15 @@ class Book(LibraryItem, Reservable):
         Returns:
             bool: True if reservation was successful, otherwise return false
         """
+        # many copies => any free copy (see `reserve_copy()`)
+        if self.get_copies() is not None:
+            return self.reserve_copy(user)
         # if available and not reserved
         if self.check_availability() and self._reserved_by is None:
             # set the reserved_by value with the ueser id
             self._reserved_by = user.get_user_id()
             # and append the reserved item in the user reserved_item_list
-            user.append_reserved_item({'title': self.get_title(), 'author': self.get_author(), 'item_id': self.get_item_id()})
+            user.append_reserved_item(self.get_item_id())
             # set the availability false
             self.set_available(False)
             return True
@@ -128,6 +134,8 @@ class Book(LibraryItem, Reservable):
         Returns:
             bool: true if the process success , otherwise return false
         """
+        if self.get_copies() is not None:
+            return self.cancel_copy_reserve(user)
         # if the reserved by value is the same as the user id 
         if self.get_reserved_by() == user.get_user_id():
             # reset the reserved_by as None
@@ -135,21 +143,21 @@ class Book(LibraryItem, Reservable):
             # reset the availability as true
             self.set_available(True)
             # remove it from the user reserved_item_list
-            user.remove_reserved_item({'title': self.get_title(), 'author': self.get_author(), 'item_id': self.get_item_id()})
+            user.remove_reserved_item(self.get_item_id())
             return True
         return False
 
     # Getters
     def instance_to_dict(self):
-        """Returns the item data as dictionary to store it in the JSON ITems file"""
-        return {
+        """Returns the item data as dictionary to store it in the JSON ITems file (with the copies if it has many)"""
+        return self.copies_to_dict({
             'title': self.get_title(),
             'author': self.get_author(),
             'item_id': self.get_item_id(),
             'type': self.__type,
             'reserved_by': self._reserved_by,
             'available': self.check_availability()
-        }
+        })
     
     def get_type(self):
         """Returns the type of the item"""
@@ -0,0 +1,129 @@
+# the status of each copy (one ASCII character => the status text is stored as it is)
+FREE = ord('0')
+BORROWED = ord('1')
+RESERVED = ord('2')
+
+# the key of one copy in the library indexes (who borrowed / reserved it, the due times)
+def loan_key(item_id, copy=0):
+    """
+    Returns the key of the copy => the item id for the first copy (and the items that have one copy),
+    and 'item id#copy' for the other copies
+
+    so the items and the loans saved before the copies keep the same keys.
+    """
+    return item_id if not copy else f'{item_id}#{copy}'
+
+def entry_key(item_id, entry):
+    """Returns the key of a borrowed / reserved item of a user ('copy' is saved just for the copies after the first)"""
+    return loan_key(item_id, entry.get('copy', 0))
+
+def split_loan_key(key):
+    """Returns (item id, copy) of a key made by `loan_key()`"""
+    item_id, _, copy = key.partition('#')
+    return item_id, int(copy) if copy else 0
+
+class Copies:
+    """
+    Class representing the physical copies of one item (the holding).
+
+    instead of an item instance for each copy (the same title, author, and type 40 times),
+    the item has one holding with one status character for each copy.
+
+    Attributes:
+        __status (bytearray): one status for each copy (FREE, BORROWED, RESERVED)
+        __free (list): the numbers of the free copies (a stack => taking and giving back are O(1))
+        __holders (dict): copy number => the id of the user who reserved it
+
+    Methods:
+        count: Returns how many copies
+        free_count: Returns how many copies are free
+        take: Take any free copy (borrowed, or reserved for a user)
+        give_back: Make a copy free again
+        held_by: Returns the copy that a user reserved, or None
+        get_holders: Returns copy number => user id of the reserved copies
+        get_status: Returns the status of one copy
+        add: Add new free copies
+        to_dict: Returns the copies as dictionary values (to store them with the item)
+    """
+    __slots__ = ('__status', '__free', '__holders')
+
+    def __init__(self, status='0', holders=None):
+        """
+        Copies constructor
+
+        Args:
+            status (str): one character for each copy => '0' free, '1' borrowed, '2' reserved
+            holders (dict): copy number (int, or str from JSON) => the id of the user who reserved it
+        """
+        self.__status = bytearray(status.encode('ascii'))
+        # the last free copy at the top of the stack is the first copy (the lowest number)
+        self.__free = [copy for copy in range(len(self.__status) - 1, -1, -1) if self.__status[copy] == FREE]
+        self.__holders = {int(copy): user_id for copy, user_id in (holders or {}).items()}
+
+    @classmethod
+    def from_dict(cls, item_dict):
+        """Returns the copies of the item dictionary, or None if the item has one copy (no 'copies')"""
+        if 'copies' not in item_dict:
+            return None
+        return cls(item_dict['copies'], item_dict.get('holders'))
+
+    def to_dict(self):
+        """Returns {'copies': the status text, 'holders': {copy: user id}} to store them with the item"""
+        return {'copies': self.__status.decode('ascii'), 'holders': {str(copy): user_id for copy, user_id in self.__holders.items()}}
+
+    def count(self):
+        """Returns how many copies"""
+        return len(self.__status)
+
+    def free_count(self):
+        """Returns how many copies are free (the availability counter)"""
+        return len(self.__free)
+
+    def get_status(self, copy):
+        """Returns the status of the copy (FREE, BORROWED, RESERVED)"""
+        return self.__status[copy]
+
+    def get_holders(self):
+        """Returns copy number => the id of the user who reserved it"""
+        return dict(self.__holders)
+
+    def take(self, holder=None):
+        """
+        Take any free copy in O(1)
+
+        Args:
+            holder (str): the id of the user who reserves it, or None if it's borrowed
+
+        Returns:
+            int: the copy number, or None if no copy is free
+        """
+        if not self.__free:
+            return None
+        copy = self.__free.pop()
+        if holder is None:
+            self.__status[copy] = BORROWED
+        else:
+            self.__status[copy] = RESERVED
+            self.__holders[copy] = holder
+        return copy
+
+    def give_back(self, copy):
+        """Make the copy free again (returned, or its reservation canceled)"""
+        if self.__status[copy] != FREE:
+            self.__status[copy] = FREE
+            self.__holders.pop(copy, None)
+            self.__free.append(copy)
+
+    def held_by(self, user_id):
+        """Returns the copy that the user reserved, or None (the reserved copies are few => looping them)"""
+        for copy, holder in self.__holders.items():
+            if holder == user_id:
+                return copy
+        return None
+
+    def add(self, count):
+        """Add `count` new free copies"""
+        start = len(self.__status)
+        self.__status += bytes([FREE]) * count
+        # the new copies under the old free copies (the lower numbers are taken first)
+        self.__free[:0] = range(start + count - 1, start - 1, -1)
@@ -0,0 +1,131 @@
+import heapq
+import threading
+
+class DueIndex:
+    """
+    Class representing the due dates index of the borrowed items (a min-heap by the due time).
+
+    the heap root is always the loan that ends first, so the overdue loans are the top of the heap:
+        - borrowing => push O(log n)
+        - returning => the loan is just forgotten (dropped later when it reaches the root)
+        - the overdue loans => walking the heap from the root, and stopping at the first loan
+          that isn't overdue yet => O(k log k) for k overdue loans (not all the loans, or all the users)
+
+    Attributes:
+        __heap (list): the heap of (due time, item id), including the returned loans
+        __due_by_item (dict): item id => due time (just the borrowed items)
+        __lock (threading.Lock): held while changing, or reading the heap (many desks borrow together)
+
+    Methods:
+        add: Add the due time of a borrowed item
+        remove: Forget the due time of a returned item
+        get_due: Returns the due time of a borrowed item, or None
+        overdue: Returns the overdue loans ordered by their due time
+    """
+    __slots__ = ('__heap', '__due_by_item', '__lock')
+
+    def __init__(self, loans=()):
+        """
+        DueIndex constructor
+
+        Args:
+            loans (iterable): (due time, item id) of the borrowed items
+        """
+        self.__due_by_item = {item_id: due for due, item_id in loans}
+        # heapify => O(n) building, not n pushes
+        self.__heap = [(due, item_id) for item_id, due in self.__due_by_item.items()]
+        heapq.heapify(self.__heap)
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        """Returns how many borrowed items have a due time"""
+        return len(self.__due_by_item)
+
+    def add(self, item_id, due):
+        """
+        Add the due time of a borrowed item (or change it)
+
+        Args:
+            item_id (str): the borrowed item id
+            due (float): the due time (seconds, like `time.time()`)
+        """
+        with self.__lock:
+            self.__due_by_item[item_id] = due
+            heapq.heappush(self.__heap, (due, item_id))
+            self.__drop_old()
+
+    def remove(self, item_id):
+        """Forget the due time of a returned item"""
+        with self.__lock:
+            if self.__due_by_item.pop(item_id, None) is not None:
+                self.__drop_old()
+
+    def get_due(self, item_id):
+        """Returns the due time of the borrowed item, or None"""
+        return self.__due_by_item.get(item_id)
+
+    def __is_current(self, entry):
+        """Returns true if the heap entry is still a borrowed item with the same due time"""
+        return self.__due_by_item.get(entry[1]) == entry[0]
+
+    def __drop_old(self):
+        """
+        Drop the old entries (returned items) from the root,
+        and build the heap again when most of it is old entries (so it doesn't keep growing)
+        """
+        heap = self.__heap
+        while heap and not self.__is_current(heap[0]):
+            heapq.heappop(heap)
+        if len(heap) > 2 * len(self.__due_by_item) + 64:
+            self.__heap = [(due, item_id) for item_id, due in self.__due_by_item.items()]
+            heapq.heapify(self.__heap)
+
+    def overdue(self, now, limit=None):
+        """
+        Returns the loans that their due time passed, ordered by the due time (the oldest first)
+
+        the heap isn't changed, its tree is walked from the root,
+        a loan that isn't overdue yet stops its branch (its children are later than it).
+        with a limit the walk uses a second small heap, so it stops after the oldest `limit` loans.
+
+        Args:
+            now (float): the current time (seconds)
+            limit (int): the maximum loans to return (e.g, a batch of reminders), or None for all of them
+
+        Returns:
+            list: (due time, item id) of the overdue loans
+        """
+        result = []
+        with self.__lock:
+            heap = self.__heap
+            if limit is None:
+                # all of them => collect the overdue branches (no order), then one sort
+                # (local names => faster loop, it runs for each overdue loan)
+                due_by_item, size = self.__due_by_item, len(heap)
+                positions = [0] if heap and heap[0][0] <= now else []
+                while positions:
+                    position = positions.pop()
+                    entry = heap[position]
+                    if due_by_item.get(entry[1]) == entry[0]:
+                        result.append(entry)
+                    child = 2 * position + 1
+                    if child < size and heap[child][0] <= now:
+                        positions.append(child)
+                    child += 1
+                    if child < size and heap[child][0] <= now:
+                        positions.append(child)
+                result.sort()
+                return result
+
+            # the second heap => (entry, its position in the heap)
+            frontier = [(heap[0], 0)] if heap else []
+            while frontier and (limit is None or len(result) < limit):
+                entry, position = heapq.heappop(frontier)
+                if entry[0] > now:
+                    break
+                if self.__is_current(entry):
+                    result.append(entry)
+                for child in (2 * position + 1, 2 * position + 2):
+                    if child < len(heap):
+                        heapq.heappush(frontier, (heap[child], child))
+        return result
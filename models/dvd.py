@@ -1,3 +1,4 @@
+from .copies import Copies
 from .libraryitem import LibraryItem
 from .reservable import Reservable
 
@@ -12,7 +13,8 @@ class DVD(LibraryItem, Reservable):
     and make reservation.
     
     Attributes:
-        __type (str): Type of the instances will create using this constructor default 'DVD'
+        __type (str): Type of the instances will create using this constructor 'DVD'
+            (class attribute => one string for all the instances)
         
     Methods:
         display_info: Displays all the DVD information (override the abstractmethod)
@@ -21,6 +23,9 @@ class DVD(LibraryItem, Reservable):
         dict_to_instance: `Class method` to create a DVD instance from a dictionary after load items from JSON as dict
         instance_to_dict: Converts the DVD object to a `dictionary` to store it inside the items JSON File
     """
+    __slots__ = ('_reserved_by',)
+    __type = 'DVD'
+
     def __init__(self, title, author, available):
         """
         Initialize a new DVD instance.
@@ -32,7 +37,6 @@ class DVD(LibraryItem, Reservable):
         """
         LibraryItem.__init__(self, title, author, available)  # Explicit call to LibraryItem constructor
         Reservable.__init__(self)   
-        self.__type = 'DVD'
 
     @classmethod
     def dict_to_instance(cls, dvd_dict):
@@ -47,32 +51,31 @@ class DVD(LibraryItem, Reservable):
         Returns:
             DVD: Returns an instance from the DVD class
         """
-        dvd = cls(dvd_dict['title'], dvd_dict['author'], dvd_dict.get('available', True))
-        dvd._LibraryItem__item_id = dvd_dict['item_id']  # to prevent name-mangling (in python)
-        dvd.__type = dvd_dict['type']
+        # `from_values()` => without the constructor (no new uuid4 to replace it)
+        dvd = cls.from_values(dvd_dict['item_id'], dvd_dict['title'], dvd_dict['author'], dvd_dict.get('available', True))
         dvd._reserved_by = dvd_dict.get('reserved_by', None)  # Use get() with default None
+        dvd.set_copies(Copies.from_dict(dvd_dict))
         return dvd
 
-    def display_info(self, users):
+    def display_info(self, library_manager):
         borrowed_by_name = None
         reserved_by_name = None
-        
-        # Check the borrowed status
-        for user in users:
-            user_borrowed_items = user.get_borrowed_items()
-            # loop over each item in the user borrowed list
-            for item in user_borrowed_items:
-                # if this item exist there so store the user name here `borrowed_by_name`
-                if self.get_item_id() == item['item_id']:
-                    borrowed_by_name = user.get_name()
-            
-            # Check the reserved status
-            # if the user id matches this item id store the user as reserved here `reserved_by_name`
-            if user.get_user_id() == self._reserved_by:
-                reserved_by_name = user.get_name()
-        
+
+        # Check the borrowed status and the reserved status
+        # using the library indexes (item id => user) without looping over the users
+        borrowers = library_manager.get_borrowers(self)
+        if borrowers:
+            borrowed_by_name = ', '.join(borrower.get_name() for borrower in borrowers)
+
+        reservers = library_manager.get_holders(self)
+        if reservers:
+            reserved_by_name = ', '.join(reserver.get_name() for reserver in reservers)
+
         # initial value 
         item_status = "available ✅" if self.check_availability() else "not available ❌"
+        # many copies => how many of them are free
+        if self.get_copies() is not None:
+            item_status = item_status + f" ({self.get_free_copies()} of {self.get_copies_count()} copies free)"
         # if borrowed_by_name not None => add it to `item_status` str
         if borrowed_by_name:
             item_status = item_status + f", borrowed by {borrowed_by_name}"
@@ -93,13 +96,12 @@ class DVD(LibraryItem, Reservable):
         Returns:
             bool: True if reservation was successful, otherwise False
         """
+        # many copies => any free copy (see `reserve_copy()`)
+        if self.get_copies() is not None:
+            return self.reserve_copy(user)
         if self.check_availability() and self._reserved_by is None:
             self._reserved_by = user.get_user_id()
-            user.append_reserved_item({
-                'title': self.get_title(), 
-                'author': self.get_author(), 
-                'item_id': self.get_item_id()
-            })
+            user.append_reserved_item(self.get_item_id())
             self.set_available(False)
             return True
         return False
@@ -114,28 +116,26 @@ class DVD(LibraryItem, Reservable):
         Returns:
             bool: True if cancellation was successful, False otherwise
         """
+        if self.get_copies() is not None:
+            return self.cancel_copy_reserve(user)
         if self.get_reserved_by() == user.get_user_id():
             self.set_reserved_by(None)
             self.set_available(True)
-            user.remove_reserved_item({
-                'title': self.get_title(), 
-                'author': self.get_author(), 
-                'item_id': self.get_item_id()
-            })
+            user.remove_reserved_item(self.get_item_id())
             return True
         return False
 
     # Getters
     def instance_to_dict(self):
-        """Returns the item data as dictionary to store it in the JSON ITems file"""
-        return {
+        """Returns the item data as dictionary to store it in the JSON ITems file (with the copies if it has many)"""
+        return self.copies_to_dict({
             'title': self.get_title(),
             'author': self.get_author(),
             'item_id': self.get_item_id(),
             'type': self.__type,
             'reserved_by': self._reserved_by,
             'available': self.check_availability()
-        }
+        })
     
     def get_type(self):
         """Returns the type of the item"""
@@ -1,4 +1,23 @@
+import threading
+import time
+from contextlib import contextmanager
 from services import storage
+from services.columnar_catalog import MappedItems
+from .copies import BORROWED, Copies, entry_key, loan_key, split_loan_key
+from .due_index import DueIndex
+from .libraryitem import ITEM_CLASSES
+from .locks import StripedLocks
+from .user import User
+from .title_index import TitleIndex
+from .type_bucket import TypeBucket
+from .waitlist import Waitlist
+from Exceptions.exceptions import DisplayIdCollisionError
+
+# the items types (in the same order they are displayed)
+ITEM_TYPES = ('Book', 'Magazine', 'DVD')
+# how long a user can keep a borrowed item
+LOAN_DAYS = 14
+DAY_SECONDS = 24 * 60 * 60
 
 class Library:
     """
@@ -7,6 +26,31 @@ class Library:
     Attributes:
         __users (str): The list of all users instances
         __items (str): The list of all items instances
+        __users_by_id, __items_by_id (dict): full id => instance (to find them in O(1))
+        __users_by_display_id, __items_by_display_id (dict): display id (first 8 characters) => instance
+        __user_collisions, __item_collisions (set): the display ids that belong to more than one user / item
+        __title_index (TitleIndex): the trigram index of the items titles (for searching)
+        __borrower_by_item, __reserver_by_item (dict): item id => the user who borrowed / reserved it
+            (the items that have many copies => 'item id#copy' for the copies after the first, see `loan_key()`)
+        __due_index (DueIndex): the due times of the borrowed items (a heap, for the overdue loans)
+        __waitlists (dict): item id => the queue of the users waiting for it (Waitlist), just the items that have a queue
+        __next_ticket (int): the ticket of the next user who joins a queue (the saved order of the queues)
+        __items_by_type (dict): type => its bucket (TypeBucket), in the same order of the items list
+        __available_count, __not_available_count (dict): type => how many items are available / not available
+        __catalog (MappedItems): the mapped items catalog, or None if the items are a normal list
+            (the catalog has its own ids, display ids, titles, and types indexes,
+            so the library doesn't build them, and doesn't make the items instances)
+        __user_locks, __item_locks (StripedLocks): the locks of each user / item
+            (borrowing, returning, and reserving hold the user lock then the item lock)
+        __structure_lock (threading.RLock): held while adding, or removing users and items
+        __counter_lock (threading.Lock): held while changing the availability counters
+
+    Thread safety:
+        the changing methods can be called from many threads (many desks) together,
+        two threads can't borrow or reserve the same item, because the check and the change
+        happen while holding the item lock.
+        the reading methods (searching, finding, listing) don't take any lock,
+        they read the indexes directly, or a copy of them (tuple) while a thread changes them.
         
     Methods:
         display_info: `Abstract method` to display the item information
@@ -18,12 +62,224 @@ class Library:
         Library constructor to intializing a new Library
         Instancce
 
+        the items can be a list, or any iterable (e.g, the `storage.iter_items()` generator),
+        they are indexed in one pass while reading them, so the generator is read just one time.
+        or they can be the mapped catalog (`MappedItems`) which is not read at all here.
+
         Args:
             users (list): The list of all users instances
-            items (list): The list of all items instances
+            items (iterable): The list (or iterable) of all items instances, or the mapped catalog
         """
         self.__users = users
-        self.__items = items
+        self.__catalog = items if isinstance(items, MappedItems) else None
+
+        self.__user_locks = StripedLocks()
+        self.__item_locks = StripedLocks()
+        self.__structure_lock = threading.RLock()
+        self.__counter_lock = threading.Lock()
+        # a list stays the same list object, a generator is collected while indexing it
+        self.__items = items if isinstance(items, (list, MappedItems)) else []
+
+        # the indexes (dictionaries) to find users and items by their ids without looping
+        self.__users_by_id = {}
+        self.__users_by_display_id = {}
+        self.__items_by_id = {}
+        self.__items_by_display_id = {}
+        self.__user_collisions = set()
+        self.__item_collisions = set()
+
+        self.__title_index = TitleIndex([])
+
+        # the types buckets, and the availability counters
+        # (one bound method for all items, not a new one for each item)
+        self.__listener = self.__availability_changed
+        self.__items_by_type = {item_type: TypeBucket() for item_type in ITEM_TYPES}
+        self.__available_count = {item_type: 0 for item_type in ITEM_TYPES}
+        self.__not_available_count = {item_type: 0 for item_type in ITEM_TYPES}
+
+        # the reverse indexes (who has each item) from the users borrowed lists and the items reserved_by
+        self.__borrower_by_item = {}
+        self.__reserver_by_item = {}
+
+        # the waiting queues from the users waiting items (sorted by their tickets)
+        self.__waitlists = {}
+        self.__next_ticket = 1
+        waiting = {}
+        # the loans saved before the due dates don't have 'due'
+        loans = []
+
+        for user in users:
+            self.__index_user(user)
+            for item_id, loan in user.get_borrowed_items().items():
+                self.__borrower_by_item[entry_key(item_id, loan)] = user
+                if 'due' in loan:
+                    loans.append((loan['due'], entry_key(item_id, loan)))
+            for item_id, waiting_item in user.get_waiting_items().items():
+                waiting.setdefault(item_id, []).append((waiting_item['ticket'], user.get_user_id()))
+                self.__next_ticket = max(self.__next_ticket, waiting_item['ticket'] + 1)
+
+        for item_id, entries in waiting.items():
+            self.__waitlists[item_id] = Waitlist(entries)
+        self.__due_index = DueIndex(loans)
+
+        # the mapped catalog => take the counters and the reservations from it (no instances)
+        if self.__catalog is not None:
+            self.__catalog.set_listener(self.__listener)
+            for item_type, (available, not_available) in self.__catalog.counts().items():
+                self.__items_by_type.setdefault(item_type, TypeBucket())
+                self.__available_count[item_type] = available
+                self.__not_available_count[item_type] = not_available
+
+            for key, reserved_by in self.__catalog.reserved():
+                if reserved_by in self.__users_by_id:
+                    self.__reserver_by_item[key] = self.__users_by_id[reserved_by]
+            return
+
+        collect = items is not self.__items
+        for item in items:
+            if collect:
+                self.__items.append(item)
+            self.__index_item(item)
+            self.__title_index.add(item)
+            self.__add_to_bucket(item)
+
+            for key, reserved_by in self.__reservations(item).items():
+                if reserved_by in self.__users_by_id:
+                    self.__reserver_by_item[key] = self.__users_by_id[reserved_by]
+
+    # add the user / item to the indexes
+    def __index_user(self, user):
+        """Add the user to the users indexes, and check the display id collision"""
+        self.__users_by_id[user.get_user_id()] = user
+        self.__add_display_id(self.__users_by_display_id, self.__user_collisions, user.get_display_id(), user)
+
+    def __index_item(self, item):
+        """Add the item to the items indexes, and check the display id collision"""
+        self.__items_by_id[item.get_item_id()] = item
+        self.__add_display_id(self.__items_by_display_id, self.__item_collisions, item.get_display_id(), item)
+
+    def __add_display_id(self, index, collisions, display_id, value):
+        """Add the display id to the index, if it's already taken by another one mark it as a collision"""
+        current = index.get(display_id)
+        if current is not None and current is not value:
+            collisions.add(display_id)
+        index[display_id] = value
+
+    # add the item to its type bucket, and count it
+    def __add_to_bucket(self, item):
+        """Add the item to its type bucket, count it, and listen to its availability changes"""
+        item_type = item.get_type()
+        bucket = self.__items_by_type.setdefault(item_type, TypeBucket())
+        # the catalog has its own type buckets
+        if self.__catalog is None:
+            bucket.add(item)
+        self.__count(item_type, item.check_availability(), 1)
+        item._listener = self.__listener
+
+    def __remove_from_bucket(self, item):
+        """Remove the item from its type bucket, and from the counters"""
+        item_type = item.get_type()
+        self.__items_by_type[item_type].remove(item.get_item_id())
+        self.__count(item_type, item.check_availability(), -1)
+        item._listener = None
+
+    def __count(self, item_type, is_available, step):
+        """Add step (1, or -1) to the available or the not available counter of this type"""
+        counter = self.__available_count if is_available else self.__not_available_count
+        # read then write => two threads changing the same type together must wait each other
+        with self.__counter_lock:
+            counter[item_type] = counter.get(item_type, 0) + step
+
+    @contextmanager
+    def __locked(self, users=(), items=()):
+        """
+        Holds the locks of the users, then the locks of the items until the with block ends
+
+        always users first then items (and each group sorted inside `StripedLocks`),
+        so two threads never hold locks that the other one waits (no deadlock).
+        """
+        with self.__user_locks.holding(*[user.get_user_id() for user in users]):
+            with self.__item_locks.holding(*[item.get_item_id() for item in items]):
+                yield
+
+    def __first_waiting(self, items):
+        """Returns the first waiting user of each item that has a queue"""
+        users = []
+        for item in items:
+            waitlist = self.__waitlists.get(item.get_item_id())
+            user = self.__users_by_id.get(waitlist.first()) if waitlist else None
+            if user is not None:
+                users.append(user)
+        return users
+
+    @contextmanager
+    def __locked_with_next(self, user, items):
+        """
+        Holds the locks of the user, the first waiting user of each item, then the items
+
+        returning or canceling gives the item to the first waiting user, so their lock is needed too,
+        they are known just after reading the queues, so if a queue changed before holding the locks => try again.
+        """
+        while True:
+            waiting = self.__first_waiting(items)
+            with self.__locked([user] + waiting, items):
+                if self.__first_waiting(items) == waiting:
+                    yield
+                    return
+
+    # the copies of the items (one copy => copy 0, its key is the item id)
+    def __reservations(self, item):
+        """Returns key => the id of the user who reserved it, for each reserved copy of the item"""
+        copies = item.get_copies()
+        if copies is not None:
+            return {loan_key(item.get_item_id(), copy): user_id for copy, user_id in copies.get_holders().items()}
+        reserved_by = item.get_reserved_by() if hasattr(item, 'get_reserved_by') else None
+        return {item.get_item_id(): reserved_by} if reserved_by is not None else {}
+
+    def __held_copy(self, user, item):
+        """Returns the copy of the item that the user reserved, or None"""
+        copies = item.get_copies()
+        if copies is not None:
+            return copies.held_by(user.get_user_id())
+        if hasattr(item, 'get_reserved_by') and item.get_reserved_by() == user.get_user_id():
+            return 0
+        return None
+
+    def __availability_changed(self, item, is_available):
+        """Called by the item `set_available()` when its availability changed => move it between the counters"""
+        self.__count(item.get_type(), not is_available, -1)
+        self.__count(item.get_type(), is_available, 1)
+
+    # remove the user / item from the indexes
+    def __unindex_user(self, user):
+        """Remove the user from the users indexes"""
+        self.__users_by_id.pop(user.get_user_id(), None)
+        self.__remove_display_id(self.__users_by_display_id, self.__user_collisions, self.__users, user.get_display_id(), user)
+
+    def __unindex_item(self, item):
+        """Remove the item from the items indexes"""
+        self.__items_by_id.pop(item.get_item_id(), None)
+        self.__remove_display_id(self.__items_by_display_id, self.__item_collisions, self.__items, item.get_display_id(), item)
+
+    def __remove_display_id(self, index, collisions, values, display_id, value):
+        """
+        Remove the display id from the index
+
+        if this display id was a collision, give it back to the one who still has it
+        (this is the only case we need to loop, and it's very rare)
+        """
+        if display_id not in collisions:
+            if index.get(display_id) is value:
+                del index[display_id]
+            return
+
+        owners = [v for v in values if v is not value and v.get_display_id() == display_id]
+        if len(owners) <= 1:
+            collisions.discard(display_id)
+        if owners:
+            index[display_id] = owners[-1]
+        else:
+            index.pop(display_id, None)
 
     # Getters
     def get_users(self):
@@ -34,85 +290,546 @@ class Library:
         """Returns the list of items instances"""
         return self.__items
 
+    def get_user(self, user_id):
+        """Returns the user that has this full id, or None"""
+        return self.__users_by_id.get(user_id)
+
+    def get_item(self, item_id):
+        """Returns the item that has this full id, or None"""
+        if self.__catalog is not None:
+            return self.__catalog.get(item_id)
+        return self.__items_by_id.get(item_id)
+
+    def find_user(self, display_user_id):
+        """
+        Returns the user that has this display id (the first 8 characters), or None
+
+        Raises:
+            DisplayIdCollisionError: if more than one user has the same display id
+        """
+        if display_user_id in self.__user_collisions:
+            raise DisplayIdCollisionError(f"\n❌ More than one user has the id {display_user_id}...")
+        return self.__users_by_display_id.get(display_user_id)
+
+    def find_item(self, display_item_id):
+        """
+        Returns the item that has this display id (the first 8 characters), or None
+
+        Raises:
+            DisplayIdCollisionError: if more than one item has the same display id
+        """
+        if self.__catalog is not None:
+            found = self.__catalog.find(display_item_id)
+            if len(found) > 1:
+                raise DisplayIdCollisionError(f"\n❌ More than one item has the id {display_item_id}...")
+            return found[0] if found else None
+
+        if display_item_id in self.__item_collisions:
+            raise DisplayIdCollisionError(f"\n❌ More than one item has the id {display_item_id}...")
+        return self.__items_by_display_id.get(display_item_id)
+
+    def get_items_by_type(self, item_type):
+        """Returns the list of the items of this type (e.g, 'Book', 'DVD'), in the items list order"""
+        return list(self.iter_items_by_type(item_type))
+
+    def iter_items_by_type(self, item_type, after_item_id=None):
+        """
+        Returns an iterator over the items of this type (no copying, for the lazy listing)
+
+        Args:
+            item_type (str): the type name (e.g, 'Book')
+            after_item_id (str): resume right after this item (e.g, the last item of the previous page), or None
+
+        Raises:
+            ItemNotFoundError: (while iterating) if the after item is not in this type listing
+        """
+        if self.__catalog is not None:
+            return self.__catalog.iter_type(item_type, after_item_id)
+        # the bucket iterator => nothing is copied, and adding an item while listing doesn't break the listing
+        bucket = self.__items_by_type.get(item_type)
+        return bucket.iter_items(after_item_id) if bucket is not None else iter(())
+
+    def get_types(self):
+        """Returns the items types (the buckets names)"""
+        return list(self.__items_by_type)
+
+    def get_available_count(self, item_type):
+        """Returns how many items of this type are available"""
+        return self.__available_count.get(item_type, 0)
+
+    def get_not_available_count(self, item_type):
+        """Returns how many items of this type are not available"""
+        return self.__not_available_count.get(item_type, 0)
+
+    def get_borrower(self, item_id, copy=0):
+        """Returns the user who borrowed the item (or this copy of it), or None"""
+        return self.__borrower_by_item.get(loan_key(item_id, copy))
+
+    def get_reserver(self, item_id, copy=0):
+        """Returns the user who reserved the item (or this copy of it), or None"""
+        return self.__reserver_by_item.get(loan_key(item_id, copy))
+
+    def get_borrowers(self, item):
+        """Returns the users who borrowed the copies of the item (one user for the items that have one copy)"""
+        copies = item.get_copies()
+        if copies is None:
+            borrower = self.__borrower_by_item.get(item.get_item_id())
+            return [borrower] if borrower is not None else []
+        keys = [loan_key(item.get_item_id(), copy) for copy in range(copies.count()) if copies.get_status(copy) == BORROWED]
+        return [self.__borrower_by_item[key] for key in keys if key in self.__borrower_by_item]
+
+    def get_holders(self, item):
+        """Returns the users who reserved the copies of the item (one user for the items that have one copy)"""
+        return [self.__reserver_by_item[key] for key in self.__reservations(item) if key in self.__reserver_by_item]
+
+    def get_due(self, item_id, copy=0):
+        """Returns the due time (seconds, like `time.time()`) of the borrowed item (or this copy of it), or None"""
+        return self.__due_index.get_due(loan_key(item_id, copy))
+
+    def get_overdue(self, now=None, limit=None):
+        """
+        Returns the overdue loans (their due time passed), the oldest first
+
+        it costs just the overdue loans count (the due times heap), not all the users or the items.
+
+        Args:
+            now (float): the current time in seconds (`time.time()` by default)
+            limit (int): the maximum loans to return (e.g, a batch of reminders), or None for all of them
+
+        Returns:
+            list: list of {'user': User, 'item_id': str, 'copy': int, 'item': the item or None, 'due': float}
+        """
+        if now is None:
+            now = time.time()
+        loans = []
+        for due, key in self.__due_index.overdue(now, limit):
+            item_id, copy = split_loan_key(key)
+            loans.append({'user': self.__borrower_by_item.get(key), 'item_id': item_id, 'copy': copy,
+                          'item': self.get_item(item_id), 'due': due})
+        return loans
+
+    def get_waitlist_position(self, user, item):
+        """Returns the position of the user in the item queue (1 => the next one), or None if they are not waiting"""
+        waitlist = self.__waitlists.get(item.get_item_id())
+        return waitlist.position(user.get_user_id()) if waitlist else None
+
+    def get_waitlist_length(self, item_id):
+        """Returns how many users are waiting the item"""
+        waitlist = self.__waitlists.get(item_id)
+        return len(waitlist) if waitlist else 0
+
+    def get_waiting_users(self, item_id):
+        """Returns the users waiting the item in the queue order"""
+        waitlist = self.__waitlists.get(item_id)
+        if not waitlist:
+            return []
+        return [self.__users_by_id[user_id] for user_id in waitlist.user_ids() if user_id in self.__users_by_id]
+
+    # Searching by title using the trigram index
+    def search_by_title(self, search_query, limit=None):
+        """Returns the items that their title starts with, or contains the search query (at most limit items)"""
+        if self.__catalog is not None:
+            return self.__catalog.search(search_query, limit)
+        return self.__title_index.search(search_query, limit)
+
     #  Adding an item
     def add_item(self, item):
         """Add a new item for the items list"""
-        self.__items.append(item)
+        with self.__structure_lock:
+            self.__items.append(item)
+            if self.__catalog is None:
+                self.__index_item(item)
+                self.__title_index.add(item)
+            self.__add_to_bucket(item)
+
+    #  Adding copies of an existing item (the same title, author, and type)
+    def add_copies(self, item, count=1):
+        """
+        Add new copies of the item, and give them to the users waiting it (if there is a queue)
+
+        Args:
+            item (LibraryItem): the item that the library has more copies of now
+            count (int): how many new copies
+
+        Returns:
+            list: the users who got a reserved copy from the queue (their changes need saving too)
+        """
+        # all the waiting users may get a copy => hold their locks (the queue can't change while holding the item lock)
+        while True:
+            waiting = self.get_waiting_users(item.get_item_id())
+            with self.__locked(waiting, [item]):
+                if self.get_waiting_users(item.get_item_id()) != waiting:
+                    continue
+                item.add_copies(count)
+                self.__give_to_next(item)
+                return [user for user in waiting if self.__held_copy(user, item) is not None]
 
     # Removing an item from the items list
     def remove_item(self, item):
         """Removing an existing item from the items list"""
-        if item in self.__items:
-            self.__items.remove(item)
-            return True 
-        else:
-            return False
+        # the item lock too => it can't be borrowed while removing it
+        with self.__structure_lock, self.__locked(items=[item]):
+            if item in self.__items:
+                self.__items.remove(item)
+                if self.__catalog is None:
+                    self.__unindex_item(item)
+                    self.__title_index.remove(item)
+                self.__remove_from_bucket(item)
+                return True 
+            else:
+                return False
 
     #  Adding user
     def add_user(self, user):
         """Add a new User to the users list"""
-        self.__users.append(user)
+        with self.__structure_lock:
+            self.__users.append(user)
+            self.__index_user(user)
         return True
 
     #  Removing user
     def remove_user(self, user):
         """Remove an existing user from the users list"""
-        if user in self.__users:
-            self.__users.remove(user)
-            return True
-        else:
-            return False
+        with self.__structure_lock, self.__locked(users=[user]):
+            if user in self.__users:
+                self.__users.remove(user)
+                self.__unindex_user(user)
+                return True
+            else:
+                return False
 
-    #  Borrowing an item
-    def borrow_item(self, user, item):
-        """Borrowing an item if it's available"""
+    # the checks and the changes of borrowing, returning, and reserving (the locks are already held)
+    def __borrow_problem(self, user, item):
+        """Returns why the user can't borrow the item, or None if they can"""
         # Check if item is available and not already borrowed by this user
-        if not item.check_availability():
+        # (the user who reserved it can borrow it, e.g, it was given to them from the queue)
+        if not item.check_availability() and self.__held_copy(user, item) is None:
+            return f'{item.get_title()} is not available'
+
+        # Check if user already has this item borrowed (the same title is one item, see `Copies`)
+        if item.get_item_id() in user.get_borrowed_items():
+            return f'{user.get_name()} already borrowed {item.get_title()}'
+        return None
+
+    def __apply_borrow(self, user, item):
+        """Give the item to the user"""
+        # the reservation of the user ends when they borrow it
+        held_copy = self.__held_copy(user, item)
+        if held_copy is not None:
+            item.cancel_reserve(user)
+            self.__reserver_by_item.pop(loan_key(item.get_item_id(), held_copy), None)
+        # any free copy (the same copy they reserved, it's the last one that became free)
+        copy = item.take_copy()
+        due = time.time() + LOAN_DAYS * DAY_SECONDS
+        loan = {'due': due}
+        # copy 0 => no 'copy' (the same as the loans saved before the copies)
+        if copy:
+            loan['copy'] = copy
+        user.append_borrowed_item(item.get_item_id(), loan)
+        self.__borrower_by_item[loan_key(item.get_item_id(), copy)] = user
+        self.__due_index.add(loan_key(item.get_item_id(), copy), due)
+
+    def __return_problem(self, user, item):
+        """Returns why the user can't return the item, or None if they can"""
+        if item.get_item_id() in user.get_borrowed_items():
+            return None
+        return f'{item.get_title()} is not borrowed by {user.get_name()}'
+
+    def __apply_return(self, user, item):
+        """Take the item back from the user, and make it (their copy) available again"""
+        loan = user.get_borrowed_item(item.get_item_id()) or {}
+        key = entry_key(item.get_item_id(), loan)
+        item.give_back_copy(loan.get('copy', 0))
+        user.remove_borrowed_item(item.get_item_id())
+        self.__borrower_by_item.pop(key, None)
+        self.__due_index.remove(key)
+        self.__give_to_next(item)
+
+    def __reserve_problem(self, user, item):
+        """Returns why the user can't reserve the item, or None if they can"""
+        if not hasattr(item, 'reserve'):
+            return f"{item.get_type()} items can't be reserved"
+        # the same checks as `reserve()` (Book, DVD)
+        if not item.check_availability() or item.get_reserved_by() is not None or self.__held_copy(user, item) is not None:
+            return f'{item.get_title()} is not available to reserve'
+        return None
+
+    def __apply_reserve(self, user, item):
+        """Reserve the item (any free copy) for the user"""
+        item.reserve(user)
+        self.__reserver_by_item[loan_key(item.get_item_id(), self.__held_copy(user, item))] = user
+
+    # the waiting queues (the locks are already held)
+    def __new_ticket(self):
+        """Returns the ticket of a user who joins a queue (bigger than all the tickets before it)"""
+        with self.__counter_lock:
+            ticket = self.__next_ticket
+            self.__next_ticket += 1
+        return ticket
+
+    def __join_waitlist(self, user, item):
+        """Add the user at the end of the item queue, returns false if they can't wait it"""
+        item_id = item.get_item_id()
+        # they have it already (borrowed, or reserved a copy of it)
+        if item_id in user.get_borrowed_items() or self.__held_copy(user, item) is not None:
             return False
-            
-        # Check if user already has this item borrowed
-        for borrowed_item in user.get_borrowed_items():
-            if borrowed_item['title'] == item.get_title():
+
+        waitlist = self.__waitlists.setdefault(item_id, Waitlist())
+        ticket = self.__new_ticket()
+        if not waitlist.add(user.get_user_id(), ticket):
+            return False
+        user.append_waiting_item(item_id, ticket)
+        return True
+
+    def __leave_waitlist(self, user, item):
+        """Remove the user from the item queue, returns false if they weren't waiting it"""
+        item_id = item.get_item_id()
+        waitlist = self.__waitlists.get(item_id)
+        if not waitlist or not waitlist.remove(user.get_user_id()):
+            return False
+        if not waitlist:
+            del self.__waitlists[item_id]
+        user.remove_waiting_item(item_id)
+        return True
+
+    def __give_to_next(self, item):
+        """The item is available again => reserve it for the first waiting user (if there is a queue)"""
+        item_id = item.get_item_id()
+        waitlist = self.__waitlists.get(item_id)
+        while waitlist and item.check_availability():
+            user = self.__users_by_id.get(waitlist.pop())
+            if user is not None:
+                user.remove_waiting_item(item_id)
+                if item.reserve(user):
+                    self.__reserver_by_item[loan_key(item_id, self.__held_copy(user, item))] = user
+        if waitlist is not None and not waitlist:
+            del self.__waitlists[item_id]
+
+    # the changes saved by another process (see `storage.refresh()`)
+    def apply_record(self, kind, record):
+        """
+        Apply the newer saved state of a user or an item (a dictionary from the journal, or the files)
+
+        an unknown id is added as a new user / item, the reverse indexes and the counters are updated.
+
+        Args:
+            kind (str): 'user' or 'item'
+            record (dict): the user or the item as a dictionary (`instance_to_dict()`)
+
+        Returns:
+            bool: true if something changed, otherwise false
+        """
+        if kind == 'user':
+            # a record saved in the old format (e.g, by an older process) => the id sets format
+            record = User.migrate_dict(record)
+            user = self.get_user(record['user_id'])
+            if user is None:
+                user = User.dict_to_instance(record)
+                self.add_user(user)
+                for item_id, loan in user.get_borrowed_items().items():
+                    self.__borrower_by_item[entry_key(item_id, loan)] = user
+                    if 'due' in loan:
+                        self.__due_index.add(entry_key(item_id, loan), loan['due'])
+                for item_id, waiting_item in user.get_waiting_items().items():
+                    with self.__item_locks.holding(item_id):
+                        self.__waitlists.setdefault(item_id, Waitlist()).add(user.get_user_id(), waiting_item['ticket'])
+                    with self.__counter_lock:
+                        self.__next_ticket = max(self.__next_ticket, waiting_item['ticket'] + 1)
+                return True
+
+            # the items of the queues the user joined, or left
+            old_waiting = {item_id: waiting_item['ticket'] for item_id, waiting_item in user.get_waiting_items().items()}
+            new_waiting = {item_id: waiting_item['ticket'] for item_id, waiting_item in record['waiting_items'].items()}
+            changed_queues = old_waiting.keys() ^ new_waiting.keys()
+
+            with self.__user_locks.holding(user.get_user_id()), self.__item_locks.holding(*changed_queues):
+                if user.instance_to_dict() == record:
+                    return False
+                # the old borrowed items leave the reverse index, then the new ones enter it
+                for item_id, loan in user.get_borrowed_items().items():
+                    if self.__borrower_by_item.get(entry_key(item_id, loan)) is user:
+                        del self.__borrower_by_item[entry_key(item_id, loan)]
+                        self.__due_index.remove(entry_key(item_id, loan))
+                user.set_from_dict(record)
+                for item_id, loan in user.get_borrowed_items().items():
+                    self.__borrower_by_item[entry_key(item_id, loan)] = user
+                    if 'due' in loan:
+                        self.__due_index.add(entry_key(item_id, loan), loan['due'])
+
+                for item_id in changed_queues:
+                    if item_id in new_waiting:
+                        self.__waitlists.setdefault(item_id, Waitlist()).add(user.get_user_id(), new_waiting[item_id])
+                        with self.__counter_lock:
+                            self.__next_ticket = max(self.__next_ticket, new_waiting[item_id] + 1)
+                    elif item_id in self.__waitlists:
+                        self.__waitlists[item_id].remove(user.get_user_id())
+                        if not self.__waitlists[item_id]:
+                            del self.__waitlists[item_id]
+                return True
+
+        item = self.get_item(record['item_id'])
+        if item is None:
+            item_class = ITEM_CLASSES.get(record['type'])
+            if item_class is None:
                 return False
-                
-        # If we get here, item is available and user doesn't have it
-        item.set_available(False)
-        user.append_borrowed_item({
-            'title': item.get_title(), 
-            'author': item.get_author(),
-            'item_id': item.get_item_id()
-        })
+            item = item_class.dict_to_instance(record)
+            self.add_item(item)
+        else:
+            with self.__locked(items=[item]):
+                if item.instance_to_dict() == record:
+                    return False
+                # the old reservations (of each copy) leave the reverse index
+                for key in self.__reservations(item):
+                    self.__reserver_by_item.pop(key, None)
+                # the listener moves it between the counters
+                item.set_available(record.get('available', True))
+                item.set_copies(Copies.from_dict(record))
+                if hasattr(item, 'set_reserved_by'):
+                    item.set_reserved_by(record.get('reserved_by'))
+
+        for key, reserved_by in self.__reservations(item).items():
+            if reserved_by in self.__users_by_id:
+                self.__reserver_by_item[key] = self.__users_by_id[reserved_by]
         return True
 
+    #  Borrowing an item
+    def borrow_item(self, user, item):
+        """Borrowing an item if it's available (the loan ends after `LOAN_DAYS` days, see `get_due()`)"""
+        # hold the user and the item locks => two desks can't borrow the same item together
+        with self.__locked([user], [item]):
+            if self.__borrow_problem(user, item) is not None:
+                return False
+            
+            # If we get here, item is available and user doesn't have it
+            self.__apply_borrow(user, item)
+            return True
+
     #  Returning an item
     def return_item(self, user, item):
-        """Returning an item if it's already in the user borrowed_items list"""
-        for i in user.get_borrowed_items():
-            if i['title'] == item.get_title():
+        """
+        Returning an item if it's already in the user borrowed items
+
+        if other users are waiting the item, it's reserved for the first one of them
+        (`get_holders()` returns them after that, their changes need saving too)
+        """
+        with self.__locked_with_next(user, [item]):
+            if self.__return_problem(user, item) is not None:
+                return False
+
             # make it available again
-                item.set_available(True)
-                user.remove_borrowed_item({
-                    'title': item.get_title(),
-                    'author': item.get_author(),
-                    'item_id': item.get_item_id()        
-            })
-                return True
-        else:
-            return False
+            self.__apply_return(user, item)
+            return True
 
     #  Reserving items using the reserve function from Reservable interface
     def make_reservation(self, user, item):
-        """Reserve an item for a specific user"""
-        if item.reserve(user):
-            return True
-        else:
-            return False
+        """
+        Reserve an item for a specific user
+
+        if the item is not available (borrowed, or reserved) the user joins its queue,
+        and gets it when it's available again (see `get_waitlist_position()`)
+
+        Returns:
+            bool: true if the item was reserved, or the user joined the queue,
+                false if the user has it already, or waits it already
+        """
+        # `reserve()` checks then changes the item => hold the locks, so just one user gets it
+        with self.__locked([user], [item]):
+            if item.reserve(user):
+                self.__reserver_by_item[loan_key(item.get_item_id(), self.__held_copy(user, item))] = user
+                return True
+            else:
+                return self.__join_waitlist(user, item)
         
     #  Cancel reservation using cancel_reserve function from Reservable interface
     def cancel_reserve(self, user, item):
-        """Cancel the reservation for a specific item"""
-        if item.cancel_reserve(user):
-            return True
-        else:
-            return False
+        """
+        Cancel the reservation for a specific item, or leave its queue
+
+        canceling the reservation gives the item to the first waiting user (if there is a queue)
+        """
+        with self.__locked_with_next(user, [item]):
+            held_copy = self.__held_copy(user, item)
+            if held_copy is not None and item.cancel_reserve(user):
+                self.__reserver_by_item.pop(loan_key(item.get_item_id(), held_copy), None)
+                self.__give_to_next(item)
+                return True
+            else:
+                return self.__leave_waitlist(user, item)
+
+
+    # many items together (e.g, a self-checkout kiosk scans a stack of items)
+    def __apply_many(self, user, items, problem_of, apply, key_of):
+        """
+        Check all the items first, then apply all of them, or none of them
+
+        the user lock and all the items locks are held until the end (and the first waiting users locks,
+        returning gives them the items), so no other desk changes an item between checking it and applying it.
 
+        Args:
+            user (User): the user
+            items (iterable): the items
+            problem_of (function): (user, item) => why it can't be done, or None
+            apply (function): (user, item) => do it
+            key_of (function): item => the key that can't be repeated in the same batch
+
+        Returns:
+            tuple: (is_success, results) => results is a list of {'item': item, 'reason': str or None}
+                in the items order, the reason is None for the items that have no problem
+        """
+        items = list(items)
+        with self.__locked_with_next(user, items):
+            results = []
+            seen = set()
+            for item in items:
+                reason = problem_of(user, item)
+                if reason is None and key_of(item) in seen:
+                    reason = f'{item.get_title()} is repeated'
+                seen.add(key_of(item))
+                results.append({'item': item, 'reason': reason})
+
+            # one problem => nothing changes
+            is_success = all(result['reason'] is None for result in results)
+            if is_success:
+                for item in items:
+                    apply(user, item)
+            return is_success, results
+
+    def borrow_many(self, user, items):
+        """
+        Borrow many items for one user together (all of them, or none of them)
+
+        Args:
+            user (User): the user who borrows
+            items (list): the items to borrow
+
+        Returns:
+            tuple: (is_success, results) => see `__apply_many()`
+        """
+        # a user can't borrow the same item two times (the same as `borrow_item()`)
+        return self.__apply_many(user, items, self.__borrow_problem, self.__apply_borrow, lambda item: item.get_item_id())
+
+    def return_many(self, user, items):
+        """
+        Return many borrowed items of one user together (all of them, or none of them)
+
+        Args:
+            user (User): the user who returns
+            items (list): the items to return
+
+        Returns:
+            tuple: (is_success, results) => see `__apply_many()`
+        """
+        return self.__apply_many(user, items, self.__return_problem, self.__apply_return, lambda item: item.get_item_id())
+
+    def reserve_many(self, user, items):
+        """
+        Reserve many items for one user together (all of them, or none of them)
+
+        Args:
+            user (User): the user who reserves
+            items (list): the items to reserve (just Book, DVD)
+
+        Returns:
+            tuple: (is_success, results) => see `__apply_many()`
+        """
+        return self.__apply_many(user, items, self.__reserve_problem, self.__apply_reserve, lambda item: item.get_item_id())
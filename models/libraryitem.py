@@ -1,5 +1,11 @@
 from abc import ABC, abstractmethod
+import sys
 import uuid
+from .copies import Copies
+
+# the items classes registry: type name => class (e.g, 'Book' => Book)
+# each subclass adds itself here when it's defined (see `__init_subclass__`)
+ITEM_CLASSES = {}
 
 class LibraryItem(ABC):
     """
@@ -13,12 +19,22 @@ class LibraryItem(ABC):
         __title (str): The name of the item
         __author (str): The author of the item
         __available (bool): The availability status of the item
+        _listener (function): called with (item, new status) when the availability changes, or None
+            (the library uses it to keep its available / not available counters)
+        __copies (Copies): the copies of the item if the library has more than one copy, otherwise None
+            (the item is available while one of its copies is free)
         
     Methods:
         display_info: `Abstract method` to display the item information
         check_availability: check if the item is available, return bool (true, false)
         set_available: Setter method for availability status
+        take_copy: Take a free copy (borrowing, or reserving it)
+        give_back_copy: Make a copy free again
+        add_copies: Add new copies of the item
     """
+    # __slots__ => no __dict__ for each instance, (a lot of memory with millions of items)
+    __slots__ = ('__item_id', '__title', '__author', '__available', '_listener', '__copies')
+
     def __init__(self, title, author, available):
         """
         LibraryItem constructor to intializing items objects
@@ -34,11 +50,45 @@ class LibraryItem(ABC):
         """
         self.__item_id = str(uuid.uuid4())
         self.__title = title
-        self.__author = author
+        # the same author has many items, so keep one copy of the author string for all of them
+        self.__author = sys.intern(author)
         self.__available = available
+        self._listener = None
+        self.__copies = None
+
+    def __init_subclass__(cls, **kwargs):
+        """Register each subclass (Book, DVD, Magazine) by its name in `ITEM_CLASSES`"""
+        super().__init_subclass__(**kwargs)
+        ITEM_CLASSES[cls.__name__] = cls
+
+    @classmethod
+    def from_values(cls, item_id, title, author, available):
+        """
+        Make an item instance from values that were stored before (loaded from a file)
+
+        without calling the constructor, because the constructor makes a new uuid4
+        that we will replace it directly with the stored id (wasted time with millions of items)
+
+        Args:
+            item_id (str): the stored item id
+            title (str): The name of the item
+            author (str): the author of the item
+            available (bool): the availability status of the item
+
+        Returns:
+            LibraryItem: the instance of the class that called it (Book, DVD, Magazine)
+        """
+        item = cls.__new__(cls)
+        item.__item_id = item_id
+        item.__title = title
+        item.__author = sys.intern(author)
+        item.__available = available
+        item._listener = None
+        item.__copies = None
+        return item
 
     @abstractmethod
-    def display_info(self, users):
+    def display_info(self, library_manager):
         """
         I made this as an abstract method => To enforce the subclasses to override it
         Each subclass (Book, DVD, Magazine) needs to display information in different way
@@ -73,7 +123,95 @@ class LibraryItem(ABC):
         """Returns the display item id (just the first 8 characters)"""
         return self.__item_id[0:8]
 
+    def get_copies(self):
+        """Returns the copies of the item (Copies), or None if it has one copy"""
+        return self.__copies
+
+    def get_copies_count(self):
+        """Returns how many copies the library has of this item"""
+        return 1 if self.__copies is None else self.__copies.count()
+
+    def get_free_copies(self):
+        """Returns how many copies are free now"""
+        if self.__copies is None:
+            return 1 if self.check_availability() else 0
+        return self.__copies.free_count()
+
+    def copies_to_dict(self, item_dict):
+        """Add the copies to the item dictionary (just if it has more than one copy), returns the dictionary"""
+        if self.__copies is not None:
+            item_dict.update(self.__copies.to_dict())
+        return item_dict
+
     # setters [To set private attributes]
     def set_available(self, value):
-        """set the availability status of the item"""
-        self.__available = value
\ No newline at end of file
+        """set the availability status of the item, and tell the listener if it changed"""
+        was_available = self.check_availability()
+        self.__available = value
+
+        if self._listener is not None and was_available != self.check_availability():
+            self._listener(self, self.check_availability())
+
+    def set_copies(self, copies):
+        """Replace the copies of the item (Copies, or None), e.g, loaded from a dictionary"""
+        was_available = self.check_availability()
+        self.__copies = copies
+        self.__copies_changed(was_available)
+
+    def __copies_changed(self, was_available):
+        """The copies changed => the item is available while a copy is free, tell the listener if it changed"""
+        if self.__copies is not None:
+            self.__available = self.__copies.free_count() > 0
+        if self._listener is not None and was_available != self.check_availability():
+            self._listener(self, self.check_availability())
+
+    # the copies (one copy => the item availability itself)
+    def take_copy(self, holder=None):
+        """
+        Take any free copy of the item in O(1)
+
+        Args:
+            holder (str): the id of the user who reserves it, or None if it's borrowed
+
+        Returns:
+            int: the copy number (0 for the items that have one copy), or None if no copy is free
+        """
+        if self.__copies is None:
+            if not self.check_availability():
+                return None
+            self.set_available(False)
+            return 0
+
+        was_available = self.check_availability()
+        copy = self.__copies.take(holder)
+        self.__copies_changed(was_available)
+        return copy
+
+    def give_back_copy(self, copy):
+        """Make the copy free again (returned, or its reservation canceled)"""
+        if self.__copies is None:
+            self.set_available(True)
+            return
+
+        was_available = self.check_availability()
+        self.__copies.give_back(copy)
+        self.__copies_changed(was_available)
+
+    def add_copies(self, count):
+        """
+        Add `count` new free copies of the item
+
+        the first time the item gets copies, its current state becomes the first copy (copy 0)
+        """
+        was_available = self.check_availability()
+        if self.__copies is None:
+            self.__copies = Copies('0')
+            reserved_by = self.get_reserved_by() if hasattr(self, 'get_reserved_by') else None
+            if reserved_by is not None:
+                # the reservation moves to the copy
+                self.__copies.take(reserved_by)
+                self.set_reserved_by(None)
+            elif not was_available:
+                self.__copies.take()
+        self.__copies.add(count)
+        self.__copies_changed(was_available)
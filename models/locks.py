@@ -0,0 +1,55 @@
+import threading
+from contextlib import contextmanager
+
+class StripedLocks:
+    """
+    Class representing a fixed group of locks shared by many keys (lock striping).
+
+    a lock for each item would need millions of locks (and memory) with a big catalog,
+    so each key (item id, or user id) uses the lock number hash(key) % stripes.
+    two different keys rarely share the same lock, so it works like a lock for each key.
+
+    Attributes:
+        __locks (list): the locks (threading.Lock)
+
+    Methods:
+        lock_for: Returns the lock of a key
+        holding: Context manager that holds the locks of many keys together
+    """
+    def __init__(self, stripes=1024):
+        """
+        StripedLocks constructor
+
+        Args:
+            stripes (int): how many locks
+        """
+        self.__locks = [threading.Lock() for _ in range(stripes)]
+
+    def __stripe(self, key):
+        """Returns the lock number of the key"""
+        return hash(key) % len(self.__locks)
+
+    def lock_for(self, key):
+        """Returns the lock of the key (item id, or user id)"""
+        return self.__locks[self.__stripe(key)]
+
+    @contextmanager
+    def holding(self, *keys):
+        """
+        Holds the locks of all keys until the with block ends
+
+        the locks are taken in the same order every time (sorted by their numbers),
+        and each lock one time (two keys can share the same lock),
+        so two threads holding many keys never wait each other forever (no deadlock).
+
+        Args:
+            *keys (str): the ids to lock
+        """
+        stripes = sorted({self.__stripe(key) for key in keys})
+        for stripe in stripes:
+            self.__locks[stripe].acquire()
+        try:
+            yield
+        finally:
+            for stripe in reversed(stripes):
+                self.__locks[stripe].release()
@@ -1,3 +1,4 @@
+from .copies import Copies
 from .libraryitem import LibraryItem
 
 class Magazine(LibraryItem):
@@ -8,13 +9,17 @@ class Magazine(LibraryItem):
     for magazine items including display item information.
     
     Attributes:
-        __type (str): Type of the instances will create using this constructor default 'Magazine'
+        __type (str): Type of the instances will create using this constructor 'Magazine'
+            (class attribute => one string for all the instances)
         
     Methods:
         display_info: Displays all the magazine information (override the abstractmethod)
         dict_to_instance: `Class method` to create a Magazine instance from a dictionary after load items from JSON as dict
         instance_to_dict: Converts the magazine object to a `dictionary` to store it inside the items JSON File
     """
+    __slots__ = ()
+    __type = 'Magazine'
+
     def __init__(self, title, author, available):
         """
         Initialize a new Magazine instance.
@@ -25,7 +30,6 @@ class Magazine(LibraryItem):
             available (bool): The availability status of the magazine
         """
         super().__init__(title, author, available)
-        self.__type = 'Magazine'
 
     @classmethod
     def dict_to_instance(cls, magazine_dict):
@@ -40,34 +44,33 @@ class Magazine(LibraryItem):
         Returns:
             Magazine: Returns an instance from the Magazine class
         """
-        magazine = cls(magazine_dict['title'], magazine_dict['author'], magazine_dict.get('available', True))
-        magazine._LibraryItem__item_id = magazine_dict['item_id'] # to prevent name-mangling (in python)
-        magazine.__type = magazine_dict['type']
+        # `from_values()` => without the constructor (no new uuid4 to replace it)
+        magazine = cls.from_values(magazine_dict['item_id'], magazine_dict['title'], magazine_dict['author'], magazine_dict.get('available', True))
+        magazine.set_copies(Copies.from_dict(magazine_dict))
         return magazine
 
     # implement the abstract method
-    def display_info(self, users):
+    def display_info(self, library_manager):
         """
         Display information about the magazine including its status and borrowed by or reserved by if exist.
 
         Args:
-            users (list): List of User objects to check for borrowed status
+            library_manager (Library): the library object to get who borrowed the magazine
 
         Returns:
             str: Formatted string of magazine information
         """
         borrowed_by_name = None
-        # Check the borrowed status
-        for user in users:
-            user_borrowed_items = user.get_borrowed_items()
-            # loop over each item in the user borrowed list
-            for item in user_borrowed_items:
-                # if this item exist there so store the user name here `borrowed_by_name`
-                if self.get_item_id() == item['item_id']:
-                    borrowed_by_name = user.get_name()
+        # Check the borrowed status using the library index (item id => user)
+        borrowers = library_manager.get_borrowers(self)
+        if borrowers:
+            borrowed_by_name = ', '.join(borrower.get_name() for borrower in borrowers)
 
         # initial value
         item_status = "available ✅" if self.check_availability() else "not available ❌"
+        # many copies => how many of them are free
+        if self.get_copies() is not None:
+            item_status = item_status + f" ({self.get_free_copies()} of {self.get_copies_count()} copies free)"
         # if borrowed_by_name not None => add it to `item_status` str
         if borrowed_by_name:
             item_status = item_status + f", borrowed by {borrowed_by_name}"    
@@ -76,14 +79,14 @@ class Magazine(LibraryItem):
         return f"\n📝 Magazine: {self.get_title()}\n👲 Author By: {self.get_author()}\n🌍 Status: {item_status}\n🆔 Item ID: {self.get_display_id()}"
 
     def instance_to_dict(self):
-        """Returns the item data as dictionary to store it in the JSON ITems file"""
-        return {
+        """Returns the item data as dictionary to store it in the JSON ITems file (with the copies if it has many)"""
+        return self.copies_to_dict({
             'title': self.get_title(),
             'author': self.get_author(),
             'item_id': self.get_item_id(),
             'type': self.__type,
             'available': self.check_availability()
-        }
+        })
 
     def get_type(self):
         """Returns the type of the item"""
@@ -14,7 +14,12 @@ class Reservable(ABC):
     Methods:
         reserve: `Abstract method` to reserve the item for a user
         cancel_reserve: `Abstract method` to cancel a reservation
+        reserve_copy: Reserve any free copy for a user (the items that have many copies)
+        cancel_copy_reserve: Cancel the reserved copy of a user (the items that have many copies)
     """
+    # empty __slots__ (the _reserved_by slot is in Book, DVD)
+    # because python doesn't allow two parents with slots
+    __slots__ = ()
 
     def __init__(self):
         """
@@ -32,3 +37,32 @@ class Reservable(ABC):
         """must implement it in the subclasses Book, DVD"""
         pass
 
+    # the items that have many copies => each copy has its own reservation (see `Copies`)
+    def reserve_copy(self, user):
+        """
+        Reserve any free copy of the item for the user (one copy for each user)
+
+        Returns:
+            bool: True if a copy was reserved, otherwise return false
+        """
+        if self.get_copies().held_by(user.get_user_id()) is not None:
+            return False
+        copy = self.take_copy(user.get_user_id())
+        if copy is None:
+            return False
+        user.append_reserved_item(self.get_item_id(), {'copy': copy})
+        return True
+
+    def cancel_copy_reserve(self, user):
+        """
+        Cancel the copy that the user reserved, it becomes free again
+
+        Returns:
+            bool: true if the user had a reserved copy, otherwise return false
+        """
+        copy = self.get_copies().held_by(user.get_user_id())
+        if copy is None:
+            return False
+        self.give_back_copy(copy)
+        user.remove_reserved_item(self.get_item_id())
+        return True
@@ -0,0 +1,164 @@
+from array import array
+
+class TitleIndex:
+    """
+    Class representing the trigram index of the items titles (inverted index).
+
+    Each title (lower case) is split into trigrams (every 3 characters next to each other),
+    e.g, 'atomic' => 'ato', 'tom', 'omi', 'mic'
+    and each trigram keeps a posting list of the items that have it in their title.
+    so searching about 'tomi' just checks the items in the smallest posting list of ('tom', 'omi'),
+    not all the items in the library.
+
+    the result is the same as the old search:
+        - title starts with the search query
+        - or the search query is longer than 2 characters and it's inside the title
+    and in the same order of the items list.
+
+    Attributes:
+        __next_seq (int): the order number of the next added item (each item has one)
+        __seq_by_id (dict): item id => the item order number
+        __state (tuple): (entries, postings, prefixes) swapped as one value when the index is built again,
+            so a search (no lock) reads the three of them from the same build
+            - entries (dict): the item order number => (lower title, item)
+            - postings (dict): trigram => array of the order numbers of the items that have it
+            - prefixes (dict): the first 1 and 2 characters of the title => array of the order numbers
+        __stale (int): how many order numbers in the arrays belong to removed items
+
+    Methods:
+        add: Add an item to the index
+        remove: Remove an item from the index
+        search: Returns the items that match the search query
+    """
+    def __init__(self, items):
+        """
+        TitleIndex constructor to build the index for all items
+
+        Args:
+            items (list): The list of all items instances
+        """
+        self.__next_seq = 0
+        self.__seq_by_id = {}
+        self.__state = ({}, {}, {})
+        self.__stale = 0
+
+        for item in items:
+            self.add(item)
+
+    @staticmethod
+    def trigrams(text):
+        """Returns a set of all trigrams inside the text"""
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    # add an item
+    def add(self, item):
+        """
+        Add a new item to the index
+
+        the order number always increases, so each posting list stays sorted
+        (the same order of the items list) without sorting it.
+
+        Args:
+            item (LibraryItem): The item to add
+        """
+        seq = self.__next_seq
+        self.__next_seq += 1
+
+        title = item.get_title().lower()
+        entries, postings, prefixes = self.__state
+        self.__seq_by_id[item.get_item_id()] = seq
+        entries[seq] = (title, item)
+        self.__index_title(postings, prefixes, seq, title)
+
+    @classmethod
+    def __index_title(cls, postings, prefixes, seq, title):
+        """Add the order number to the posting lists of the title trigrams, and of its prefixes"""
+        for trigram in cls.trigrams(title):
+            postings.setdefault(trigram, array('I')).append(seq)
+
+        for prefix in {title[:1], title[:2]}:
+            prefixes.setdefault(prefix, array('I')).append(seq)
+
+    # remove an item
+    def remove(self, item):
+        """
+        Remove an item from the index
+
+        the posting lists are not changed here (it needs looping over them),
+        the order number just removed from the entries so search skips it,
+        and when the removed numbers become too many the index will rebuild itself.
+
+        Args:
+            item (LibraryItem): The item to remove
+
+        Returns:
+            bool: True if the item was in the index, otherwise False
+        """
+        seq = self.__seq_by_id.pop(item.get_item_id(), None)
+        if seq is None:
+            return False
+
+        entries = self.__state[0]
+        del entries[seq]
+        self.__stale += 1
+
+        # more removed than existing items => clean the posting lists
+        if self.__stale > len(entries):
+            self.__rebuild()
+        return True
+
+    def __rebuild(self):
+        """
+        Build the posting lists again from the existing items only (the same order numbers),
+        into new dictionaries, then swap them in one assignment
+        (a search that runs meanwhile keeps using the old complete index)
+        """
+        entries, postings, prefixes = dict(self.__state[0]), {}, {}
+        for seq, (title, _) in entries.items():
+            self.__index_title(postings, prefixes, seq, title)
+        self.__state = (entries, postings, prefixes)
+        self.__stale = 0
+
+    # search
+    def search(self, search_query, limit=None):
+        """
+        Returns the items that their title starts with the search_query,
+        or contains it if the search_query is longer than 2 characters
+
+        Args:
+            search_query (str): the lower case title to search based on it
+            limit (int): the maximum items to return (None => all of them)
+
+        Returns:
+            list: the matched items in the same order of the items list
+        """
+        # one read of the state => the entries and the posting lists of the same build
+        entries, postings, prefixes = self.__state
+
+        # every title starts with the empty string
+        # (a copy of the entries first, so adding an item from another thread doesn't break the loop)
+        if not search_query:
+            return [item for _, item in list(entries.values())[:limit]]
+
+        # short query => just the titles that start with it
+        if len(search_query) <= 2:
+            candidates = prefixes.get(search_query, ())
+        else:
+            # the smallest posting list of the query trigrams, if one trigram doesn't exist => no result
+            candidates = None
+            for trigram in self.trigrams(search_query):
+                posting = postings.get(trigram)
+                if posting is None:
+                    return []
+                if candidates is None or len(posting) < len(candidates):
+                    candidates = posting
+
+        # confirm each candidate (the posting list means it has one trigram not all the query)
+        result = []
+        for seq in candidates:
+            entry = entries.get(seq)
+            if entry is not None and search_query in entry[0]:
+                result.append(entry[1])
+                if len(result) == limit:
+                    break
+        return result
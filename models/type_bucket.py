@@ -0,0 +1,138 @@
+from array import array
+from bisect import bisect_right
+from Exceptions.exceptions import ItemNotFoundError
+
+class TypeBucket:
+    """
+    Class representing the items of one type in the order they were added (a library type bucket).
+
+    the listing reads the bucket while other threads add and remove items, without copying it:
+        - adding => append to the order list O(1)
+        - removing => its place in the order list becomes None O(1) (skipped by the listing)
+        - listing => an iterator on the current order list, starting it is O(1) (nothing is copied),
+          it reads the list by positions, so adding, or removing items while listing doesn't break it
+        - resuming a listing after an item (the last item of the previous page) => its place O(1)
+    when most of the order list are removed places, a new state is made without them,
+    and the listings that already started move to it after the last item they gave (each item has an order number).
+
+    Attributes:
+        __state (tuple): (order, seqs, positions) swapped as one value when it's made again
+            - order (list): the items in the order they were added, None for the removed ones
+            - seqs (array): the order number of each place in the order list (increasing)
+            - positions (dict): item id => its place in the order list
+              (the removed items too, until the state is made again => a page can resume after a removed item)
+        __count (int): how many items are in the bucket
+        __next_seq (int): the order number of the next added item
+
+    the changing methods are called while holding the library structure lock (one thread at a time).
+
+    Methods:
+        add: Add an item at the end of the bucket
+        remove: Remove an item from the bucket
+        get: Returns the item that has this id, or None
+        iter_items: Returns an iterator over the items in the bucket order
+    """
+    __slots__ = ('__state', '__count', '__next_seq')
+
+    def __init__(self):
+        """TypeBucket constructor (an empty bucket)"""
+        self.__state = ([], array('Q'), {})
+        self.__count = 0
+        self.__next_seq = 0
+
+    def __len__(self):
+        """Returns how many items are in the bucket"""
+        return self.__count
+
+    def add(self, item):
+        """
+        Add the item at the end of the bucket (an item that is already in it keeps its place)
+
+        Args:
+            item (LibraryItem): the item to add
+        """
+        order, seqs, positions = self.__state
+        position = positions.get(item.get_item_id())
+        if position is not None and order[position] is not None:
+            order[position] = item
+            return
+
+        # the order number first => a listing that sees the new place always finds its number
+        seqs.append(self.__next_seq)
+        self.__next_seq += 1
+        positions[item.get_item_id()] = len(order)
+        order.append(item)
+        self.__count += 1
+
+    def remove(self, item_id):
+        """
+        Remove the item from the bucket
+
+        Args:
+            item_id (str): the id of the item to remove
+
+        Returns:
+            bool: True if the item was in the bucket, otherwise False
+        """
+        order, seqs, positions = self.__state
+        position = positions.get(item_id)
+        if position is None or order[position] is None:
+            return False
+
+        order[position] = None
+        self.__count -= 1
+        # most of the order list are removed places => make it again without them
+        if len(order) > 2 * self.__count + 64:
+            self.__compact()
+        return True
+
+    def __compact(self):
+        """Make the state again from the items in the bucket (same order), then swap it in one assignment"""
+        old_order, old_seqs, _ = self.__state
+        order, seqs, positions = [], array('Q'), {}
+        for item, seq in zip(old_order, old_seqs):
+            if item is not None:
+                positions[item.get_item_id()] = len(order)
+                order.append(item)
+                seqs.append(seq)
+        self.__state = (order, seqs, positions)
+
+    def get(self, item_id):
+        """Returns the item that has this id, or None"""
+        order, _, positions = self.__state
+        position = positions.get(item_id)
+        return order[position] if position is not None else None
+
+    def iter_items(self, after_item_id=None):
+        """
+        Yields the items in the bucket order (lazy, starting it doesn't copy the bucket)
+
+        Args:
+            after_item_id (str): start right after this item (the cursor), or None to start from the first item
+
+        Yields:
+            LibraryItem: the items in the order they were added
+
+        Raises:
+            ItemNotFoundError: if the after item was never in the bucket (or removed before the bucket was made again)
+        """
+        order, seqs, positions = self.__state
+        position = 0
+        if after_item_id is not None:
+            if after_item_id not in positions:
+                raise ItemNotFoundError(f'\n❌ Item {after_item_id} is not in the listing...')
+            position = positions[after_item_id] + 1
+
+        while True:
+            # the state was made again => continue in the new one after the last given place
+            if self.__state[0] is not order:
+                last_seq = seqs[position - 1] if position else -1
+                order, seqs, _ = self.__state
+                position = bisect_right(seqs, last_seq)
+
+            if position >= len(order):
+                return
+            item = order[position]
+            position += 1
+            if item is not None:
+                yield item
@@ -1,12 +1,23 @@
 import uuid
 
+# the keys of the items dictionaries in the users saved before the id sets (see `User.migrate_dict()`)
+OLD_ENTRY_KEYS = ('item_id', 'title', 'author')
+
 class User:
     """
         Represents a user class in the application.
 
         A user can have unique id, email, name, and
-        the list of the borrowed items
+        the borrowed, reserved, and waiting items as id sets => dictionaries (item id => its details)
+        in the order they were added, so checking and removing an item are O(1) (no looping over a list),
+        and the title and the author are not copied into each user (they are in the item itself):
+            - borrowed item => its due time 'due' (see `Library.borrow_item()`)
+            - waiting item => its ticket 'ticket' => the order of joining the queue (see `Waitlist`)
+            - the borrowed and the reserved items of the titles that have many copies have 'copy' too (see `Copies`)
         """
+    # __slots__ => no __dict__ for each instance
+    __slots__ = ('__user_id', '__name', '__email', '__borrowed_items', '__reserved_items', '__waiting_items')
+
     def __init__(self, name, email):
         """
         Initialize a new User instance.
@@ -18,8 +29,9 @@ class User:
         self.__user_id = str(uuid.uuid4())
         self.__name = name
         self.__email = email
-        self.__borrowed_items = []
-        self.__reserved_items = []
+        self.__borrowed_items = {}
+        self.__reserved_items = {}
+        self.__waiting_items = {}
     
     @classmethod
     def dict_to_instance(cls, user_dict):
@@ -34,11 +46,50 @@ class User:
         Returns:
             User: Returns an instance from the User class
         """
-        user = cls(user_dict['name'],user_dict['email'])
+        user_dict = cls.migrate_dict(user_dict)
+        # without the constructor, because it makes a new uuid4 that will be replaced directly
+        user = cls.__new__(cls)
         user.__user_id = user_dict['user_id']
+        user.__name = user_dict['name']
+        user.__email = user_dict['email']
         user.__borrowed_items = user_dict['borrowed_items']
         user.__reserved_items = user_dict['reserved_items']
+        user.__waiting_items = user_dict['waiting_items']
         return user
+
+    # the users saved in the old format
+    @staticmethod
+    def is_old_format(user_dict):
+        """Returns true if the user was saved before the id sets (lists of the items dictionaries)"""
+        return any(isinstance(user_dict.get(name), list) for name in ('borrowed_items', 'reserved_items', 'waiting_items'))
+
+    @staticmethod
+    def migrate_dict(user_dict):
+        """
+        Returns the user dictionary in the id sets format
+
+        the old format has lists of {'title', 'author', 'item_id', ...} => {item id: {...}} without the title and the author
+        (the users saved before the waitlists don't have 'waiting_items')
+
+        Args:
+            user_dict (dict): the saved user dictionary (the old or the new format)
+
+        Returns:
+            dict: the same dictionary if it's already in the new format, otherwise a converted copy
+        """
+        if not User.is_old_format(user_dict) and 'waiting_items' in user_dict:
+            return user_dict
+
+        user_dict = dict(user_dict)
+        for name in ('borrowed_items', 'reserved_items', 'waiting_items'):
+            entries = user_dict.get(name, {})
+            if isinstance(entries, list):
+                entries = {
+                    entry['item_id']: {key: value for key, value in entry.items() if key not in OLD_ENTRY_KEYS}
+                    for entry in entries
+                }
+            user_dict[name] = entries
+        return user_dict
     
     def instance_to_dict(self):
         """Convert the User object to a dictionary to 
@@ -48,7 +99,8 @@ class User:
         "name": self.__name,
         "email": self.__email,
         "borrowed_items": self.__borrowed_items,
-        "reserved_items": self.__reserved_items
+        "reserved_items": self.__reserved_items,
+        "waiting_items": self.__waiting_items
     }
 
     # Getters
@@ -68,13 +120,21 @@ class User:
         return self.__user_id
     
     def get_borrowed_items(self):
-        """Returns the user borrowed list of items"""
+        """Returns the user borrowed items => item id => {'due', 'copy'} (iterating it gives the items ids)"""
         return self.__borrowed_items
     
+    def get_borrowed_item(self, item_id):
+        """Returns the details of the borrowed item (its due time, and its copy if it has many), or None"""
+        return self.__borrowed_items.get(item_id)
+
     def get_reserved_items(self):
-        """Returns the user list of reserved items"""
+        """Returns the user reserved items => item id => {'copy'} (iterating it gives the items ids)"""
         return self.__reserved_items
     
+    def get_waiting_items(self):
+        """Returns the items the user waits => item id => {'ticket'}"""
+        return self.__waiting_items
+
     def get_name(self):
         """Returns the user name"""
         return self.__name
@@ -84,18 +144,35 @@ class User:
         return self.__email
     
     # setters
-    def append_borrowed_item(self, item):
-        """Add a new item to the user borrowed items list"""
-        self.__borrowed_items.append(item)
+    def append_borrowed_item(self, item_id, loan):
+        """Add a new item to the user borrowed items (loan => {'due', 'copy'})"""
+        self.__borrowed_items[item_id] = loan
+
+    def remove_borrowed_item(self, item_id):
+        """Removing the item that has this id from the user borrowed items (if it's there)"""
+        self.__borrowed_items.pop(item_id, None)
+
+    def append_reserved_item(self, item_id, reservation=None):
+        """Add a new item to the user reserved items (reservation => {'copy'} for the titles that have many copies)"""
+        self.__reserved_items[item_id] = reservation if reservation is not None else {}
+
+    def remove_reserved_item(self, item_id):
+        """Removing the item that has this id from the user reserved items (if it's there)"""
+        self.__reserved_items.pop(item_id, None)
 
-    def remove_borrowed_item(self, item):
-        """Removing an existing item from the user borrowed items list"""
-        self.__borrowed_items.remove(item)
+    def append_waiting_item(self, item_id, ticket):
+        """Add a new item to the user waiting items with its ticket (the order of joining its queue)"""
+        self.__waiting_items[item_id] = {'ticket': ticket}
 
-    def append_reserved_item(self, item):
-        """Add a new item to the user list of reserved items"""
-        self.__reserved_items.append(item)
+    def remove_waiting_item(self, item_id):
+        """Removing the item that has this id from the user waiting items (if it's there)"""
+        self.__waiting_items.pop(item_id, None)
 
-    def remove_reserved_item(self, item):
-        """Removing an existing item from the user list of reserved items"""
-        self.__reserved_items.remove(item)
+    def set_from_dict(self, user_dict):
+        """Replace the user information with a newer saved state of the same user (e.g, saved by another process)"""
+        user_dict = self.migrate_dict(user_dict)
+        self.__name = user_dict['name']
+        self.__email = user_dict['email']
+        self.__borrowed_items = user_dict['borrowed_items']
+        self.__reserved_items = user_dict['reserved_items']
+        self.__waiting_items = user_dict['waiting_items']
@@ -0,0 +1,132 @@
+from bisect import bisect_left, insort
+from collections import deque
+
+class Waitlist:
+    """
+    Class representing the queue of the users waiting for one item (first come, first served).
+
+    each user in the queue has a number (seq) in the order they joined, so:
+        - joining => append to the deque O(1)
+        - the next user (after returning the item) => popleft O(1)
+        - the position of a user => their number - the first number - the left numbers before them O(log n)
+          (no looping over the queue)
+    a user who leaves from the middle stays in the deque, just their number is added to the left numbers,
+    and they are dropped when they reach the head (or when half of the deque are left users).
+
+    Attributes:
+        __entries (deque): (seq, ticket, user id) in the queue order, including the left users
+        __seq_by_user (dict): user id => seq (just the users still waiting)
+        __left (list): the sorted numbers (seq) of the users who left and still in the deque
+        __next_seq (int): the number of the next user who joins
+
+    the ticket is the saved order (see `User.get_waiting_items()`),
+    the queue is always sorted by it, so loading the users again gives the same queue.
+
+    Methods:
+        add: Add a user at the end of the queue
+        remove: Remove a user from the queue
+        first: Returns the user id of the next user, or None
+        pop: Remove and return the user id of the next user
+        position: Returns the position of a user (1 => the next one), or None
+        user_ids: Returns the waiting users ids in the queue order
+    """
+    __slots__ = ('__entries', '__seq_by_user', '__left', '__next_seq')
+
+    def __init__(self, entries=()):
+        """
+        Waitlist constructor
+
+        Args:
+            entries (iterable): (ticket, user id) of the waiting users
+        """
+        self.__entries = deque()
+        self.__seq_by_user = {}
+        self.__left = []
+        self.__next_seq = 0
+        for ticket, user_id in sorted(entries):
+            self.add(user_id, ticket)
+
+    def __len__(self):
+        """Returns how many users are waiting"""
+        return len(self.__seq_by_user)
+
+    def add(self, user_id, ticket):
+        """
+        Add a user at the end of the queue
+
+        Args:
+            user_id (str): the user id
+            ticket (int): the saved order of the user (bigger than the tickets of the users before them)
+
+        Returns:
+            bool: true if the user joined, false if they are already waiting
+        """
+        if user_id in self.__seq_by_user:
+            return False
+
+        # an older ticket (e.g, saved by another process) => its place is not the end, build the queue again
+        if self.__entries and ticket < self.__entries[-1][1]:
+            entries = [(old_ticket, old_user_id) for seq, old_ticket, old_user_id in self.__entries
+                       if self.__seq_by_user.get(old_user_id) == seq]
+            self.__init__(entries + [(ticket, user_id)])
+            return True
+
+        self.__entries.append((self.__next_seq, ticket, user_id))
+        self.__seq_by_user[user_id] = self.__next_seq
+        self.__next_seq += 1
+        return True
+
+    def remove(self, user_id):
+        """
+        Remove a user from the queue (they leave)
+
+        Returns:
+            bool: true if the user was waiting, otherwise false
+        """
+        seq = self.__seq_by_user.pop(user_id, None)
+        if seq is None:
+            return False
+
+        insort(self.__left, seq)
+        # too many left users => build the queue again without them
+        if len(self.__left) > len(self.__entries) // 2:
+            self.__init__([(ticket, old_user_id) for seq, ticket, old_user_id in self.__entries
+                           if self.__seq_by_user.get(old_user_id) == seq])
+        else:
+            self.__drop_left_head()
+        return True
+
+    def __drop_left_head(self):
+        """Drop the left users from the head of the deque (so the head is always a waiting user)"""
+        while self.__left and self.__entries and self.__entries[0][0] == self.__left[0]:
+            self.__entries.popleft()
+            self.__left.pop(0)
+
+    def first(self):
+        """Returns the user id of the next user, or None if nobody is waiting"""
+        if not self.__entries:
+            return None
+        return self.__entries[0][2]
+
+    def pop(self):
+        """Remove and return the user id of the next user, or None if nobody is waiting"""
+        if not self.__entries:
+            return None
+        _, _, user_id = self.__entries.popleft()
+        del self.__seq_by_user[user_id]
+        self.__drop_left_head()
+        return user_id
+
+    def position(self, user_id):
+        """
+        Returns the position of the user in the queue (1 => the next one), or None if they are not waiting
+        """
+        seq = self.__seq_by_user.get(user_id)
+        if seq is None:
+            return None
+        # the numbers before them - the left users before them
+        return seq - self.__entries[0][0] - bisect_left(self.__left, seq) + 1
+
+    def user_ids(self):
+        """Returns the waiting users ids in the queue order"""
+        return [user_id for seq, _, user_id in self.__entries if self.__seq_by_user.get(user_id) == seq]
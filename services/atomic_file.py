@@ -0,0 +1,104 @@
+"""
+This atomic_file module: writes the data files without truncating them if the program crashes.
+
+the new content is written into a temp file next to the real file,
+then the temp file replaces the real file (`os.replace()` is atomic),
+so the real file always has the old content, or the new content, never a half of them.
+
+the durability levels (how much we wait the disk to be sure the data is saved):
+    - 'fast' => temp file + rename, no fsync (a power cut may lose the last writes, the OS crash too)
+    - 'safe' => fsync the temp file before the rename, so the new file is complete on the disk
+    - 'paranoid' => 'safe' + fsync the folder after the rename (the rename itself is saved),
+                    and fsync each journal append
+"""
+import os
+
+DURABILITY_LEVELS = ('fast', 'safe', 'paranoid')
+
+# check the durability level
+def check_durability(durability):
+    """Raises ValueError if the durability level is unknown"""
+    if durability not in DURABILITY_LEVELS:
+        raise ValueError(f"Unknown durability level '{durability}', use one of {DURABILITY_LEVELS}")
+
+# save the folder entries (the new file name after the rename)
+def fsync_directory(file_name):
+    """
+    fsync the folder of the file, so the rename, or the creation of the file is saved on the disk
+
+    Args:
+        file_name (str): the file path inside the folder
+    """
+    # Windows doesn't allow opening a folder, and it saves the rename with the file
+    if os.name == 'nt':
+        return
+
+    directory = os.open(os.path.dirname(os.path.abspath(file_name)), os.O_RDONLY)
+    try:
+        os.fsync(directory)
+    finally:
+        os.close(directory)
+
+# write a whole file
+def write_atomic(file_name, data, durability='safe'):
+    """
+    Replace the file content with the data using a temp file and a rename
+
+    Args:
+        file_name (str): the file path
+        data (str | bytes): the new content (bytes are written in binary mode)
+        durability (str): 'fast', 'safe', or 'paranoid'
+
+    Raises:
+        ValueError: if the durability level is unknown
+        OSError: if writing, or renaming failed (the old file doesn't change)
+    """
+    check_durability(durability)
+
+    temp_file_name = file_name + '.tmp'
+    mode = 'wb' if isinstance(data, bytes) else 'w'
+    try:
+        with open(temp_file_name, mode) as f:
+            f.write(data)
+            if durability != 'fast':
+                # move the data from python, then from the OS to the disk
+                f.flush()
+                os.fsync(f.fileno())
+
+        os.replace(temp_file_name, file_name)
+
+    except BaseException:
+        # don't leave a half temp file next to the real file
+        if os.path.exists(temp_file_name):
+            os.remove(temp_file_name)
+        raise
+
+    if durability == 'paranoid':
+        fsync_directory(file_name)
+
+# append to the end of a file (the journal)
+def append(file_name, data, durability='safe'):
+    """
+    Append the text to the end of the file
+
+    just 'paranoid' waits the disk here, each append is small and frequent,
+    the journal reader ignores a cut last line, and the writer removes it before the next append
+    (see `storage.repair_journal()`).
+
+    Args:
+        file_name (str): the file path
+        data (str): the text to append
+        durability (str): 'fast', 'safe', or 'paranoid'
+    """
+    check_durability(durability)
+
+    is_new = not os.path.exists(file_name)
+    with open(file_name, 'a') as f:
+        f.write(data)
+        if durability == 'paranoid':
+            f.flush()
+            os.fsync(f.fileno())
+
+    # a new journal file => save its folder entry too
+    if is_new and durability == 'paranoid':
+        fsync_directory(file_name)
@@ -0,0 +1,629 @@
+"""
+This columnar_catalog module: keeps the items in a binary file (data/items.catalog) that is
+memory-mapped (mmap) when starting, instead of making an instance for each item.
+
+each column is stored alone (columnar), so reading one column doesn't touch the others:
+    - ids => 36 bytes for each item (fixed size, item i is at i * 36)
+    - order => the items numbers sorted by their ids (binary search by id, or display id)
+    - types, available => 1 byte for each item
+    - reserved_by => 36 bytes for each item (zeros => None), and the numbers of the reserved items
+    - copies => the numbers of the items that have many copies, and their copies as JSON (a string table)
+    - titles, lower titles, authors => string tables (offsets array + one UTF-8 blob)
+    - one numbers array for each type (the type buckets)
+
+the item instance is made (materialized) just when the item is needed (displayed, found, or changed),
+the searching scans the lower titles blob directly without making any instance.
+
+the file layout:
+    MAGIC (8 bytes) | JSON file mtime_ns (8 bytes) | JSON file size (8 bytes) | meta length (4 bytes) | meta (JSON) | columns
+the catalog is fresh just if the items JSON file still has the same modification time and size.
+"""
+import os
+import sys
+import json
+import mmap
+import struct
+import threading
+from array import array
+from bisect import bisect_right
+from models.title_index import TitleIndex
+# importing the items classes registers them in `ITEM_CLASSES`
+from models.book import Book
+from models.magazine import Magazine
+from models.dvd import DVD
+from models.libraryitem import ITEM_CLASSES
+from models.copies import loan_key
+from Exceptions.exceptions import ItemNotFoundError
+
+MAGIC = b'LIBCOL02'
+HEADER = struct.Struct('<8sqqI')
+
+# the item id is a uuid4 string => always 36 characters
+ID_SIZE = 36
+EMPTY_ID = bytes(ID_SIZE)
+
+# the catalog file name of a JSON file
+def catalog_file_name(json_file_name):
+    """Returns the catalog file name next to the JSON file (items.json => items.catalog)"""
+    return os.path.splitext(json_file_name)[0] + '.catalog'
+
+def encode_id(item_id):
+    """Returns the id as 36 bytes, or None if it's not a 36 characters ASCII id"""
+    if item_id is None:
+        return EMPTY_ID
+    encoded = item_id.encode('ascii', 'replace')
+    return encoded if len(encoded) == ID_SIZE else None
+
+def string_table(values):
+    """Returns (offsets array, blob) => value i is blob[offsets[i]:offsets[i + 1]]"""
+    offsets = array('Q', [0])
+    parts = []
+    position = 0
+    for value in values:
+        encoded = value.encode()
+        parts.append(encoded)
+        position += len(encoded)
+        offsets.append(position)
+    return offsets, b''.join(parts)
+
+# write the catalog
+def write_catalog(json_file_name, records):
+    """
+    Writes the items records into the catalog file of the JSON file
+
+    call it just after writing the JSON file, so the catalog has its modification time and size.
+
+    Args:
+        json_file_name (str): the items JSON file path that has the same records
+        records (list): list of items dictionaries (the same as the JSON file)
+
+    Returns:
+        bool: True if the catalog was written, False if it can't be written
+            (an id is not a uuid, an unknown type, or an OS error)
+    """
+    try:
+        count = len(records)
+        types = [item_type for item_type in ITEM_CLASSES]
+
+        ids = bytearray()
+        reserved_by = bytearray()
+        type_codes = bytearray(count)
+        available = bytearray(count)
+        reserved = array('I')
+        copied = array('I')
+        copies = []
+        buckets = {item_type: array('I') for item_type in types}
+        counts = {item_type: [0, 0] for item_type in types}
+
+        for number, record in enumerate(records):
+            item_id = encode_id(record['item_id'])
+            reserver_id = encode_id(record.get('reserved_by'))
+            if item_id is None or reserver_id is None or record['type'] not in buckets:
+                return False
+
+            ids += item_id
+            reserved_by += reserver_id
+            if reserver_id != EMPTY_ID:
+                reserved.append(number)
+            if 'copies' in record:
+                copied.append(number)
+                copies.append(json.dumps({'copies': record['copies'], 'holders': record.get('holders', {})}))
+
+            is_available = record.get('available', True)
+            type_codes[number] = types.index(record['type'])
+            available[number] = 1 if is_available else 0
+            buckets[record['type']].append(number)
+            counts[record['type']][0 if is_available else 1] += 1
+
+        order = array('I', sorted(range(count), key=lambda number: ids[number * ID_SIZE:(number + 1) * ID_SIZE]))
+        title_offsets, titles = string_table(record['title'] for record in records)
+        # '\0' after each lower title, so a searching match never continues into the next title
+        lower_offsets, lower_titles = string_table(record['title'].lower() + '\0' for record in records)
+        author_offsets, authors = string_table(record['author'] for record in records)
+        copies_offsets, copies = string_table(copies)
+
+        columns = [
+            ('ids', bytes(ids)), ('order', order), ('types', bytes(type_codes)),
+            ('available', bytes(available)), ('reserved_by', bytes(reserved_by)), ('reserved', reserved),
+            ('title_offsets', title_offsets), ('titles', titles),
+            ('lower_offsets', lower_offsets), ('lower_titles', lower_titles),
+            ('author_offsets', author_offsets), ('authors', authors),
+            ('copied', copied), ('copies_offsets', copies_offsets), ('copies', copies)
+        ] + [(f'type:{item_type}', buckets[item_type]) for item_type in types]
+
+        # the meta has the position of each column (the columns start after the header and the meta)
+        sections = {}
+        position = 0
+        for name, column in columns:
+            size = len(column) * (column.itemsize if isinstance(column, array) else 1)
+            sections[name] = [position, size]
+            # start each column at a multiple of 8 (the arrays are read directly from the mapped bytes)
+            position += size + (-size % 8)
+
+        meta = json.dumps({
+            'count': count,
+            'types': types,
+            'counts': counts,
+            'byteorder': sys.byteorder,
+            'sections': sections
+        }).encode()
+        meta += b' ' * (-(HEADER.size + len(meta)) % 8)
+
+        json_stat = os.stat(json_file_name)
+        file_name = catalog_file_name(json_file_name)
+        temp_file_name = file_name + '.tmp'
+        with open(temp_file_name, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, json_stat.st_mtime_ns, json_stat.st_size, len(meta)))
+            f.write(meta)
+            for name, column in columns:
+                data = column.tobytes() if isinstance(column, array) else column
+                f.write(data)
+                f.write(bytes(-len(data) % 8))
+        os.replace(temp_file_name, file_name)
+        return True
+
+    except (OSError, KeyError):
+        return False
+
+# open the catalog if it's fresh
+def open_catalog(json_file_name):
+    """
+    Maps the catalog file of the JSON file into the memory
+
+    Args:
+        json_file_name (str): the items JSON file path
+
+    Returns:
+        MappedItems: the mapped items, or None if there's no fresh catalog
+    """
+    file_name = catalog_file_name(json_file_name)
+    if not os.path.exists(file_name) or not os.path.exists(json_file_name):
+        return None
+
+    try:
+        with open(file_name, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        magic, mtime_ns, size, meta_size = HEADER.unpack_from(mapped, 0)
+        json_stat = os.stat(json_file_name)
+        if magic != MAGIC or mtime_ns != json_stat.st_mtime_ns or size != json_stat.st_size:
+            mapped.close()
+            return None
+
+        meta = json.loads(mapped[HEADER.size:HEADER.size + meta_size])
+        if meta['byteorder'] != sys.byteorder:
+            mapped.close()
+            return None
+
+        return MappedItems(mapped, meta, HEADER.size + meta_size)
+
+    except (struct.error, ValueError, KeyError):
+        mapped.close()
+        return None
+
+class MappedItems:
+    """
+    Class representing the items list on top of the mapped catalog file.
+
+    It acts like the items list (len, iterating, indexing, in, append, remove),
+    but each item instance is made just the first time it's needed, then it's kept (cached),
+    so the same item is always the same instance.
+
+    the changes are kept in the memory (the catalog file is read only):
+        - the changed items are the cached instances
+        - the added items are in a small list (with their own indexes)
+        - the removed items numbers are in a set
+
+    Attributes:
+        __mapped (mmap): the mapped catalog file
+        __count (int): how many items in the catalog file
+        __types (list): the types names (type code => type name)
+        __counts (dict): type => [available count, not available count] (with the journal changes)
+        __cache (dict): item number => the made instance
+        __removed (set): the numbers of the removed items
+        __added (list): the items added after the catalog was written
+        __added_by_id (dict), __added_by_display_id (dict): indexes of the added items
+        __added_titles (TitleIndex): the titles index of the added items
+        __listener (function): given to each made instance (the library availability counters)
+        __lock (threading.Lock): held while making an instance, so two threads never make two instances of one item
+
+    Methods:
+        get: Returns the item that has this full id
+        find: Returns the items that have this display id
+        search: Returns the items that match the title search query
+        iter_type: Yields the items of one type
+        apply_records: Applies the journal records on top of the catalog
+        iter_records: Yields the items as dictionaries (for storing them)
+    """
+    def __init__(self, mapped, meta, base):
+        """
+        MappedItems constructor (use `open_catalog()` to make it)
+
+        Args:
+            mapped (mmap): the mapped catalog file
+            meta (dict): the catalog meta (count, types, counts, sections)
+            base (int): where the columns start in the file
+        """
+        self.__mapped = mapped
+        self.__count = meta['count']
+        self.__types = meta['types']
+        self.__counts = {item_type: list(counts) for item_type, counts in meta['counts'].items()}
+
+        # each column as a memoryview on the mapped file (nothing is copied)
+        view = memoryview(mapped)
+        self.__columns = {}
+        for name, (offset, size) in meta['sections'].items():
+            self.__columns[name] = view[base + offset:base + offset + size]
+        self.__lower_start = base + meta['sections']['lower_titles'][0]
+        self.__lower_end = self.__lower_start + meta['sections']['lower_titles'][1]
+
+        self.__order = self.__columns['order'].cast('I')
+        self.__title_offsets = self.__columns['title_offsets'].cast('Q')
+        self.__lower_offsets = self.__columns['lower_offsets'].cast('Q')
+        self.__author_offsets = self.__columns['author_offsets'].cast('Q')
+        self.__copied = self.__columns['copied'].cast('I')
+        self.__copies_offsets = self.__columns['copies_offsets'].cast('Q')
+
+        self.__cache = {}
+        self.__removed = set()
+        self.__added = []
+        self.__added_by_id = {}
+        self.__added_by_display_id = {}
+        self.__added_titles = TitleIndex([])
+        self.__listener = None
+        self.__lock = threading.Lock()
+
+    # the columns values of one item
+    def __item_id(self, number):
+        """Returns the id of the item number (read from the ids column)"""
+        return self.__columns['ids'][number * ID_SIZE:(number + 1) * ID_SIZE].tobytes().decode('ascii')
+
+    def __string(self, name, offsets, number):
+        """Returns the string of the item number from a string table"""
+        return self.__columns[name][offsets[number]:offsets[number + 1]].tobytes().decode()
+
+    def __is_available(self, number):
+        """Returns the availability of the item number as stored in the catalog file"""
+        return self.__columns['available'][number] == 1
+
+    def __type(self, number):
+        """Returns the type name of the item number"""
+        return self.__types[self.__columns['types'][number]]
+
+    def __reserved_by(self, number):
+        """Returns the id of the user who reserved the item number (in the catalog file), or None"""
+        reserver_id = self.__columns['reserved_by'][number * ID_SIZE:(number + 1) * ID_SIZE].tobytes()
+        return None if reserver_id == EMPTY_ID else reserver_id.decode('ascii')
+
+    def __copies(self, number):
+        """Returns {'copies': ..., 'holders': ...} of the item number if it has many copies, otherwise None"""
+        # the copied numbers are sorted => binary search
+        position = bisect_right(self.__copied, number) - 1
+        if position < 0 or self.__copied[position] != number:
+            return None
+        return json.loads(self.__string('copies', self.__copies_offsets, position))
+
+    def __record(self, number):
+        """Returns the item number as a dictionary (the same as `instance_to_dict()`)"""
+        item_type = self.__type(number)
+        record = {
+            'title': self.__string('titles', self.__title_offsets, number),
+            'author': self.__string('authors', self.__author_offsets, number),
+            'item_id': self.__item_id(number),
+            'type': item_type
+        }
+        # just the reservable items (Book, DVD) have reserved_by
+        if hasattr(ITEM_CLASSES[item_type], 'get_reserved_by'):
+            record['reserved_by'] = self.__reserved_by(number)
+        record['available'] = self.__is_available(number)
+        copies = self.__copies(number)
+        if copies is not None:
+            record.update(copies)
+        return record
+
+    # make the instance of an item (just one time)
+    def __materialize(self, number):
+        """Returns the instance of the item number, make it the first time"""
+        item = self.__cache.get(number)
+        if item is not None:
+            return item
+
+        with self.__lock:
+            # another thread may made it while this thread was waiting the lock
+            item = self.__cache.get(number)
+            if item is None:
+                record = self.__record(number)
+                item = ITEM_CLASSES[record['type']].dict_to_instance(record)
+                item._listener = self.__listener
+                self.__cache[number] = item
+        return item
+
+    def __number_of(self, item_id):
+        """Returns the item number that has this id using binary search on the order column, or None"""
+        key = encode_id(item_id)
+        if key is None:
+            return None
+
+        number = self.__lower_bound(key)
+        if number < self.__count:
+            found = self.__order[number]
+            if self.__id_bytes(found) == key:
+                return found
+        return None
+
+    def __id_bytes(self, number):
+        """Returns the id of the item number as bytes (for comparing)"""
+        return self.__columns['ids'][number * ID_SIZE:(number + 1) * ID_SIZE].tobytes()
+
+    def __lower_bound(self, key):
+        """Returns the first position in the order column which its id is >= key"""
+        low, high = 0, self.__count
+        while low < high:
+            middle = (low + high) // 2
+            if self.__id_bytes(self.__order[middle])[:len(key)] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def __is_live(self, number):
+        """Returns True if the item number was not removed"""
+        return number not in self.__removed
+
+    def set_listener(self, listener):
+        """Give the listener (the library availability counters) to all instances, now and later"""
+        self.__listener = listener
+        for item in self.__cache.values():
+            item._listener = listener
+        for item in self.__added:
+            item._listener = listener
+
+    # the list methods
+    def __len__(self):
+        """Returns how many items (the catalog items - the removed items + the added items)"""
+        return self.__count - len(self.__removed) + len(self.__added)
+
+    def __iter__(self):
+        """Yields all items instances in order (makes the instances of all of them)"""
+        for number in range(self.__count):
+            if number not in self.__removed:
+                yield self.__materialize(number)
+        yield from list(self.__added)
+
+    def __getitem__(self, position):
+        """Returns the item at this position (like a list, the removed items are skipped)"""
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError('item index out of range')
+
+        in_catalog = self.__count - len(self.__removed)
+        if position >= in_catalog:
+            return self.__added[position - in_catalog]
+
+        # move the position after each removed item before it
+        number = position
+        for removed in sorted(self.__removed):
+            if removed > number:
+                break
+            number += 1
+        return self.__materialize(number)
+
+    def __contains__(self, item):
+        """Returns True if this item instance is in the items"""
+        number = self.__number_of(item.get_item_id())
+        if number is not None and self.__is_live(number):
+            return self.__cache.get(number) is item
+        return self.__added_by_id.get(item.get_item_id()) is item
+
+    def append(self, item):
+        """Add a new item (after the catalog items)"""
+        item._listener = self.__listener
+        self.__added.append(item)
+        self.__added_by_id[item.get_item_id()] = item
+        self.__added_by_display_id.setdefault(item.get_display_id(), []).append(item)
+        self.__added_titles.add(item)
+
+    def remove(self, item):
+        """
+        Remove an item
+
+        Raises:
+            ValueError: if the item is not in the items
+        """
+        number = self.__number_of(item.get_item_id())
+        if number is not None and self.__is_live(number) and self.__cache.get(number) is item:
+            self.__removed.add(number)
+            del self.__cache[number]
+            return
+
+        if self.__added_by_id.get(item.get_item_id()) is not item:
+            raise ValueError('the item is not in the items')
+
+        self.__added.remove(item)
+        del self.__added_by_id[item.get_item_id()]
+        self.__added_by_display_id[item.get_display_id()].remove(item)
+        self.__added_titles.remove(item)
+
+    # finding
+    def get(self, item_id):
+        """Returns the item that has this full id, or None"""
+        number = self.__number_of(item_id)
+        if number is not None and self.__is_live(number):
+            return self.__materialize(number)
+        return self.__added_by_id.get(item_id)
+
+    def find(self, display_id):
+        """
+        Returns all items that have this display id (more than one => a collision)
+
+        the ids are sorted in the order column, so the ids that start with the display id are next to each other.
+        """
+        found = []
+        key = display_id.encode('ascii', 'replace')
+        position = self.__lower_bound(key)
+        while position < self.__count:
+            number = self.__order[position]
+            if not self.__id_bytes(number).startswith(key):
+                break
+            if self.__is_live(number):
+                found.append(self.__materialize(number))
+            position += 1
+
+        return found + self.__added_by_display_id.get(display_id, [])
+
+    def search(self, search_query, limit=None):
+        """
+        Returns the items that their title starts with the search_query,
+        or contains it if the search_query is longer than 2 characters
+        (the same result as `TitleIndex.search()`)
+
+        scans the lower titles blob using `mmap.find()`, and makes just the matched items instances.
+        with a limit the scan stops after finding enough items.
+
+        Args:
+            search_query (str): the lower case title to search based on it
+            limit (int): the maximum items to return (None => all of them)
+
+        Returns:
+            list: the matched items in the items order
+        """
+        if not search_query:
+            return list(self)[:limit]
+
+        query = search_query.encode()
+        starts_with = len(search_query) <= 2
+        numbers = []
+
+        position = self.__lower_start
+        while len(numbers) != limit:
+            position = self.__mapped.find(query, position, self.__lower_end)
+            if position == -1:
+                break
+
+            # the title that has this match
+            number = bisect_right(self.__lower_offsets, position - self.__lower_start) - 1
+            if self.__is_live(number) and (not starts_with or self.__lower_offsets[number] == position - self.__lower_start):
+                numbers.append(number)
+            # continue from the next title (each title is added one time)
+            position = self.__lower_start + self.__lower_offsets[number + 1]
+
+        # the items added after writing the catalog are few (they are searched in the small title index)
+        found = [self.__materialize(number) for number in numbers] + self.__added_titles.search(search_query)
+        return found[:limit]
+
+    def types(self):
+        """Returns the types names in the catalog"""
+        return list(self.__types)
+
+    def iter_type(self, item_type, after_item_id=None):
+        """
+        Yields the items of this type in the items order (makes their instances while reading)
+
+        Args:
+            item_type (str): the type name (e.g, 'Book')
+            after_item_id (str): start right after this item (the cursor), or None to start from the first item
+                (a catalog item => binary search of its number in the type column, an added item => its place)
+
+        Raises:
+            ItemNotFoundError: if the after item is not in the catalog, or in the added items
+        """
+        column = self.__columns.get(f'type:{item_type}')
+        numbers = column.cast('I') if column is not None else ()
+        added = list(self.__added)
+        start, added_start = 0, 0
+        if after_item_id is not None:
+            number = self.__number_of(after_item_id)
+            if number is not None:
+                # the type column numbers are increasing (the items order)
+                start = bisect_right(numbers, number)
+            elif self.__added_by_id.get(after_item_id) in added:
+                start = len(numbers)
+                added_start = added.index(self.__added_by_id[after_item_id]) + 1
+            else:
+                raise ItemNotFoundError(f'\n❌ Item {after_item_id} is not in the listing...')
+
+        for position in range(start, len(numbers)):
+            if numbers[position] not in self.__removed:
+                yield self.__materialize(numbers[position])
+
+        for item in added[added_start:]:
+            if item.get_type() == item_type:
+                yield item
+
+    def counts(self):
+        """Returns type => [available count, not available count] (use it before any change)"""
+        return {item_type: list(counts) for item_type, counts in self.__counts.items()}
+
+    def reserved(self):
+        """
+        Yields (key, user id) of the reserved items, without making the not changed items instances
+
+        the key is the item id, or 'item id#copy' for the reserved copies of the items that have many copies (see `loan_key()`)
+        """
+        for number in self.__columns['reserved'].cast('I'):
+            if number not in self.__removed and number not in self.__cache:
+                yield self.__item_id(number), self.__reserved_by(number)
+
+        for position, number in enumerate(self.__copied):
+            if number not in self.__removed and number not in self.__cache:
+                holders = json.loads(self.__string('copies', self.__copies_offsets, position))['holders']
+                for copy, user_id in holders.items():
+                    yield loan_key(self.__item_id(number), int(copy)), user_id
+
+        for item in list(self.__cache.values()) + self.__added:
+            if item.get_copies() is not None:
+                for copy, user_id in item.get_copies().get_holders().items():
+                    yield loan_key(item.get_item_id(), copy), user_id
+                continue
+            reserved_by = item.get_reserved_by() if hasattr(item, 'get_reserved_by') else None
+            if reserved_by:
+                yield item.get_item_id(), reserved_by
+
+    # the journal
+    def apply_records(self, records):
+        """
+        Applies the journal records (the changes after the catalog was written)
+
+        each record is the full new state of an item:
+        the existing items get an instance from the record, the new ones are added.
+
+        Args:
+            records (list): list of items dictionaries
+        """
+        for record in records:
+            item_class = ITEM_CLASSES.get(record['type'])
+            if item_class is None:
+                continue
+
+            item = item_class.dict_to_instance(record)
+            is_available = item.check_availability()
+            number = self.__number_of(record['item_id'])
+
+            if number is None:
+                self.append(item)
+                self.__counts.setdefault(item.get_type(), [0, 0])[0 if is_available else 1] += 1
+                continue
+
+            # move the item between the counters if its availability changed
+            old = self.__cache[number].check_availability() if number in self.__cache else self.__is_available(number)
+            if old != is_available:
+                self.__counts[item.get_type()][0 if old else 1] -= 1
+                self.__counts[item.get_type()][0 if is_available else 1] += 1
+
+            item._listener = self.__listener
+            self.__cache[number] = item
+
+    def iter_records(self):
+        """Yields all items as dictionaries in order (the not changed items without making their instances)"""
+        for number in range(self.__count):
+            if number in self.__removed:
+                continue
+            item = self.__cache.get(number)
+            yield item.instance_to_dict() if item is not None else self.__record(number)
+
+        for item in list(self.__added):
+            yield item.instance_to_dict()
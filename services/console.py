@@ -0,0 +1,156 @@
+"""
+This console module: the input and the output of the CLI in one place,
+so the same handlers can talk with a person in the terminal, or run without a terminal.
+
+the handlers (track_process, display, validators modules) call `ask()`, `say()`, and `write()`
+instead of `input()`, `print()`, and `sys.stdout.write()`, and these functions use the current console:
+    - TerminalConsole => the terminal (the default)
+    - RecordingConsole => the terminal, and keeps what the user typed (to save the session as a trace)
+    - ScriptedConsole => the answers are given from a list (e.g, a saved trace), and the output is dropped
+"""
+import sys
+from collections import deque
+from contextlib import contextmanager
+from Exceptions.exceptions import ScriptEndedError
+
+class TerminalConsole:
+    """
+    Class representing the terminal console (the normal `input()` and `print()`)
+
+    Methods:
+        ask: Show the prompt, and returns what the user typed
+        say: Print the values
+        write: Write the text as it is
+    """
+    def ask(self, prompt=''):
+        """Show the prompt, and returns what the user typed"""
+        return input(prompt)
+
+    def say(self, *values, sep=' ', end='\n'):
+        """Print the values (the same as `print()`)"""
+        print(*values, sep=sep, end=end)
+
+    def write(self, text):
+        """Write the text as it is (e.g, a chunk of many lines)"""
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+class RecordingConsole(TerminalConsole):
+    """
+    Class representing the terminal console that keeps each answer of the user
+
+    Attributes:
+        __answers (list): what the user typed since the last `take_answers()`
+
+    Methods:
+        take_answers: Returns the kept answers, and starts a new list
+    """
+    def __init__(self):
+        """RecordingConsole constructor"""
+        self.__answers = []
+
+    def ask(self, prompt=''):
+        """Show the prompt, keep what the user typed, and returns it"""
+        answer = super().ask(prompt)
+        self.__answers.append(answer)
+        return answer
+
+    def take_answers(self):
+        """Returns the answers since the last call (e.g, the answers of one menu choice)"""
+        answers, self.__answers = self.__answers, []
+        return answers
+
+class ScriptedConsole:
+    """
+    Class representing a console without a terminal (the answers are given before)
+
+    Attributes:
+        __answers (deque): the answers that weren't asked yet
+        __keep_output (bool): true to keep the output (otherwise it's dropped)
+        __output (list): the output text (if `keep_output`)
+
+    Methods:
+        ask: Returns the next answer
+        say: Keep the values as text (or drop them)
+        write: Keep the text (or drop it)
+        remaining: Returns how many answers weren't asked
+        get_output: Returns the kept output
+    """
+    def __init__(self, answers, keep_output=False):
+        """
+        ScriptedConsole constructor
+
+        Args:
+            answers (iterable): the answers in the same order of the questions (strings)
+            keep_output (bool): true to keep the output to read it later using `get_output()`
+        """
+        self.__answers = deque(answers)
+        self.__keep_output = keep_output
+        self.__output = []
+
+    def ask(self, prompt=''):
+        """
+        Returns the next answer
+
+        Raises:
+            ScriptEndedError: if the handler asks more questions than the answers
+                (e.g, a validator asks again because the answer was wrong)
+        """
+        if not self.__answers:
+            raise ScriptEndedError(f'no answer for: {prompt.strip()}')
+        if self.__keep_output:
+            self.__output.append(prompt)
+        return self.__answers.popleft()
+
+    def say(self, *values, sep=' ', end='\n'):
+        """Keep the values as text like `print()` (or drop them)"""
+        if self.__keep_output:
+            self.__output.append(sep.join(str(value) for value in values) + end)
+
+    def write(self, text):
+        """Keep the text (or drop it)"""
+        if self.__keep_output:
+            self.__output.append(text)
+
+    def remaining(self):
+        """Returns how many answers weren't asked"""
+        return len(self.__answers)
+
+    def get_output(self):
+        """Returns the kept output as one text"""
+        return ''.join(self.__output)
+
+# the console that `ask()`, `say()`, and `write()` use now
+_console = TerminalConsole()
+
+def get_console():
+    """Returns the current console"""
+    return _console
+
+def set_console(console):
+    """Use the console from now, returns the console that was used before"""
+    global _console
+
+    old_console, _console = _console, console
+    return old_console
+
+@contextmanager
+def using(console):
+    """Use the console inside the `with` block, then go back to the old one"""
+    old_console = set_console(console)
+    try:
+        yield console
+    finally:
+        set_console(old_console)
+
+def ask(prompt=''):
+    """Show the prompt, and returns the answer (instead of `input()`)"""
+    return _console.ask(prompt)
+
+def say(*values, sep=' ', end='\n'):
+    """Show the values (instead of `print()`)"""
+    _console.say(*values, sep=sep, end=end)
+
+def write(text):
+    """Write the text as it is (instead of `sys.stdout.write()`)"""
+    _console.write(text)
@@ -2,9 +2,15 @@
 This display module: has all methods related to display messages
 and data to the screen with a nice formatting
 """
-from services import validators
+from itertools import islice
+from services import console, validators
 from Exceptions.exceptions import FileIsEmptyError, ItemNotAvailableError, ItemNotFoundError
 
+# how many items to display before asking to continue
+PAGE_SIZE = 20
+# write the output to the screen in chunks of this size (characters), not one print for each item
+OUTPUT_CHUNK_SIZE = 64 * 1024
+
 # display welcome message, and the menu
 def display_welcome_message():
     """
@@ -16,43 +22,34 @@ def display_welcome_message():
     Returns:
         `int`: Returns The Choice (1 - 7)
     """
-    print()
-    print('='  * 30)
-    choice = input('👋 Welcome to the Library System\n1. View all available items ✅ \n2. Search item by title or type 🔍 \n3. Register as a new user 🆕 \n4. Borrow / Return an item 📚 \n5. Reserve / cancel reservation an item 🪧 \n6. Admin: Add/Remove Items/Users ⚙️ \n7. Exit 🙋 \n> ')
+    console.say()
+    console.say('='  * 30)
+    choice = console.ask('👋 Welcome to the Library System\n1. View all available items ✅ \n2. Search item by title or type 🔍 \n3. Register as a new user 🆕 \n4. Borrow / Return an item 📚 \n5. Reserve / cancel reservation an item 🪧 \n6. Admin: Add/Remove Items/Users ⚙️ \n7. Exit 🙋 \n> ')
     choice = validators.int_validation(choice, 1, 7, 'choice')
 
     return choice
 
 # Display the avaliable items
-def display_available_items(users, items):
+def display_available_items(library_manager):
     """
     Displays all items with it's status (available or, not) 
 
-    Receives all items as an argument, then print the avaliable items 
+    Receives the library as an argument, then print the avaliable items 
     based on `check_availability()` value Which is each item can access it from 
     the parent LibraryItem
 
     Args:
-        users (list): Receives list of users instances
-        items (list): Receives list of items instances
+        library_manager (Library): Receives the library object which has the items,
+            and who borrowed / reserved each item
     """
-
     try:
         # if the list of items is empty raise custom exception => `FileIsEmptyError`
-        if not items:
+        if not library_manager.get_items():
             raise FileIsEmptyError('\n❌ No items data yet, items file is empty...')
 
         # make dictionary to keep tracking the number of the avaliable items for each Type
-        items_dict = {'Book': 0, 'Magazine': 0, 'DVD': 0}
-
-        # count the avaliable items for each type and store them in the dictionary above `item_dict`
-        for item in items:
-            is_avaliable = item.check_availability()
-            item_type = item.get_type()
-
-            # if available please add one in items_dict for this type
-            if is_avaliable:
-                items_dict[item_type] += 1
+        # the library keeps these counters updated so no need to count them here
+        items_dict = {item_type: library_manager.get_available_count(item_type) for item_type in library_manager.get_types()}
 
         # if there is no any available item, raise custom Error =>  `ItemNotAvailableError`
         is_no_items_available = True
@@ -65,32 +62,135 @@ def display_available_items(users, items):
             raise ItemNotAvailableError('\n❌ No items available at the moment')
 
 
-        print("\n--- The avaliable Items is ---\n")
+        console.say("\n--- The avaliable Items is ---\n")
         # loop over the dict `item_dict` print how many items avaliable of each type
         for key, value in items_dict.items():
-            print(f"\n{'📚' if key == 'Book' else '📝' if key == 'Magazine' else '📀'} {value} {key}{"s" if value > 1  else ""} is available: ")
-            print('=' * 30)
+            console.say(f"\n{'📚' if key == 'Book' else '📝' if key == 'Magazine' else '📀'} {value} {key}{"s" if value > 1  else ""} is available: ")
+            console.say('=' * 30)
             # Here I don't raise an error to continue the application flow, and just print a message
             if value == 0:
-                print(f"\n❌ There's no any {key} Avaliable!")
+                console.say(f"\n❌ There's no any {key} Avaliable!")
 
-            # then inside each loop on dict, loop over the items in items_data
-            # I know it's a nested loop with O(n^2) but 😅
-            # and if the item is avaliable at the same time the type same as dict-key
-            # call => `display_info(users)` method that each item override this abstract method
+            # then display the items of this type only (the library type bucket) page by page,
+            # each item rendered when its page is displayed using => `display_info(library_manager)`
             else:
-                for item in items:
-                    is_avaliable = item.check_availability()
-                    item_type = item.get_type()
-
-                    if item_type == key:
-                        print(item.display_info(users))
+                for page, has_more in iter_pages(iter_rendered_items(library_manager, key), PAGE_SIZE):
+                    write_buffered(page)
+                    # stop the listing if the user doesn't want more
+                    if has_more and console.ask('\n⏬ Press Enter to see more, or q to stop: ').strip().lower() == 'q':
+                        return
 
     except FileIsEmptyError as e:
-        print(e)
+        console.say(e)
 
     except ItemNotAvailableError as e:
-        print(e)
+        console.say(e)
+
+# the lazy listing pipeline (items => rendered items => pages => screen)
+def iter_items(library_manager, item_type=None, after_item_id=None):
+    """
+    Yields the items one by one (lazy) from the library type buckets
+
+    Args:
+        library_manager (Library): the library object which has the type buckets
+        item_type (str): just the items of this type (e.g, 'Book'), or None for all types
+        after_item_id (str): the cursor => start right after this item (the last item of the previous page),
+            it's found in its type bucket directly (no skipping the items before it)
+
+    Yields:
+        LibraryItem: the items in the same order of the listing
+
+    Raises:
+        ItemNotFoundError: if the after item is not in the listing
+    """
+    item_types = [item_type] if item_type else library_manager.get_types()
+    if after_item_id is not None and not item_type:
+        # all types => continue from the type of the after item, then the types after it
+        after_item = library_manager.get_item(after_item_id)
+        if after_item is None or after_item.get_type() not in item_types:
+            raise ItemNotFoundError(f'\n❌ Item {after_item_id} is not in the listing...')
+        item_types = item_types[item_types.index(after_item.get_type()):]
+
+    for position, current_type in enumerate(item_types):
+        yield from library_manager.iter_items_by_type(current_type, after_item_id if position == 0 else None)
+
+def iter_rendered_items(library_manager, item_type=None, after_item_id=None):
+    """
+    Yields the items information as strings using `display_info()` (just when they are needed)
+
+    Args:
+        library_manager (Library): the library object to pass it to `display_info()` method
+        item_type (str): just the items of this type, or None for all types
+        after_item_id (str): start right after this item (see `iter_items()`)
+
+    Yields:
+        str: the item information
+    """
+    for item in iter_items(library_manager, item_type, after_item_id):
+        yield item.display_info(library_manager)
+
+def iter_pages(rows, page_size):
+    """
+    Groups the rows into pages (lists), and tells if there's more pages after each one
+
+    Args:
+        rows (iterable): the rows to group
+        page_size (int): how many rows in each page
+
+    Yields:
+        tuple: (page (list), has_more (bool))
+    """
+    rows = iter(rows)
+    page = list(islice(rows, page_size))
+    while page:
+        next_page = list(islice(rows, page_size))
+        yield page, bool(next_page)
+        page = next_page
+
+def get_items_page(library_manager, item_type=None, after_item_id=None, page_size=PAGE_SIZE):
+    """
+    Returns one page of the rendered items starting right after the cursor item
+
+    Args:
+        library_manager (Library): the library object
+        item_type (str): just the items of this type, or None for all types
+        after_item_id (str): the last item id of the previous page (the cursor), or None for the first page
+        page_size (int): how many items in the page
+
+    Returns:
+        tuple: (rows (list of str), next_after_item_id (the cursor of the next page, or None if it's the last page))
+
+    Raises:
+        ItemNotFoundError: if the cursor item is not in the listing
+    """
+    items = list(islice(iter_items(library_manager, item_type, after_item_id), page_size + 1))
+    rows = [item.display_info(library_manager) for item in items[:page_size]]
+    next_after_item_id = items[page_size - 1].get_item_id() if len(items) > page_size else None
+    return rows, next_after_item_id
+
+def write_buffered(rows, chunk_size=OUTPUT_CHUNK_SIZE):
+    """
+    Writes the rows to the screen (each row in a line like print),
+    collecting them in chunks and writing each chunk one time
+
+    Args:
+        rows (iterable): the strings to write
+        chunk_size (int): how many characters to collect before writing them
+    """
+    buffer = []
+    size = 0
+    for row in rows:
+        buffer.append(row)
+        buffer.append('\n')
+        size += len(row) + 1
+
+        if size >= chunk_size:
+            console.write(''.join(buffer))
+            buffer = []
+            size = 0
+
+    if buffer:
+        console.write(''.join(buffer))
 
 # display methods to let the user choose one of them
 def display_methods(first_choice, second_choice, message):
@@ -109,11 +209,11 @@ def display_methods(first_choice, second_choice, message):
     Returns:
         int: Returns The Choice (1 - 2)
     """
-    search_type =  input(f'\nDo you like to {message}:\n1. {first_choice}\n2. {second_choice}\n> ')
+    search_type =  console.ask(f'\nDo you like to {message}:\n1. {first_choice}\n2. {second_choice}\n> ')
     return validators.int_validation(search_type, 1, 2, 'choice')
 
 # display the searching result
-def display_search_result(search_query, search_result, users):
+def display_search_result(search_query, search_result, library_manager):
     """
     Displays the searching result
 
@@ -122,11 +222,11 @@ def display_search_result(search_query, search_result, users):
 
     Args:
         search_reult (list): list contains all items matches the searching process
-        users (list): receive a list of users instances to pass it to `display_info()` method
+        library_manager (Library): receive the library object to pass it to `display_info()` method
     """
 
     try:
-        print(f'\n---🔎 the Searching result of ({search_query})---')
+        console.say(f'\n---🔎 the Searching result of ({search_query})---')
         # if there's no item with the same search_query raise custom Error => `ItemNotFoundError`
         if not search_result:
             raise ItemNotFoundError('\n❌ No Items found...')
@@ -134,10 +234,10 @@ def display_search_result(search_query, search_result, users):
         # else print the search reult with all items information
         # using `display_info()` item method
         for item in search_result:
-            print(item.display_info(users))
+            console.say(item.display_info(library_manager))
 
     except ItemNotFoundError as e:
-        print(e)
+        console.say(e)
 
 # Receives the new user information
 def get_new_user_info(users, as_who):
@@ -151,19 +251,19 @@ def get_new_user_info(users, as_who):
     Returns:
         tuple: returns a tuple contains the valid_email, and name
     """
-    print("please enter the following: ")
+    console.say("please enter the following: ")
 
-    email = input(f"\n- {as_who} Email: ").strip()
+    email = console.ask(f"\n- {as_who} Email: ").strip()
     # validate the email
     email = validators.email_validation(email, users)
-    name = input(f"\n- {as_who} Name: ").strip()
+    name = console.ask(f"\n- {as_who} Name: ").strip()
     # validate the name
     name = validators.empty_input_validation(name, 'name')
 
     return email, name
 
 # Receives the user id and the item id to make the brrowing process
-def get_user_item_info(users, items, message):
+def get_user_item_info(library_manager, message):
     """
     Receive the user id and the item id from the user.
 
@@ -172,8 +272,7 @@ def get_user_item_info(users, items, message):
     functions. if the the user id dosen't exist => return and stop the function
 
     Args:
-        users (list): list of users instances
-        items (list): list of items instances
+        library_manager (Library): the library object to find the user and the item by their ids
         message (str): the type of the process (e.g, borrow, reserve, return, ....)
 
     Returns:
@@ -181,20 +280,20 @@ def get_user_item_info(users, items, message):
                 - user (User): Returns the `user` if the ID is Exist, otherwise return `None`
                 - item (Item): Returns the `item` if the ID is Exist, otherwise return `None`
     """
-    print(f'To {message} an item you should enter the following: ')
+    console.say(f'To {message} an item you should enter the following: ')
 
-    user_id = input('- your user id: ').strip()
+    user_id = console.ask('- your user id: ').strip()
     # validate the user_id using `user_id_validation()`
-    user = validators.user_id_validation(user_id, users)
+    user = validators.user_id_validation(user_id, library_manager)
 
     # if there'e no exist user return None to stop implementing the function
     # to prevent receive the item_id
     if not user:
         return None, None
     
-    item_id = input('- the item id: ').strip()
+    item_id = console.ask('- the item id: ').strip()
     # validate the user_id using `item_id_validation()`
-    item = validators.item_id_validation(item_id, items)
+    item = validators.item_id_validation(item_id, library_manager)
 
     # if there'e no exist item return None to stop implementing the function
     if not item:
@@ -204,16 +303,15 @@ def get_user_item_info(users, items, message):
     return user, item
 
 # Displays message when the item reserved, or borrowed by another one
-def display_not_available_to_have(users, item, message):
+def display_not_available_to_have(library_manager, item, message):
     """
     Displays a message if the item is already taken by another user
 
-    Receiving the users list and the item, then loop over each user in the users list,
-    if the item id exists in the user borrowed_items list => get the usser name to print it
-    else if the user id exists in the item reserved by => get the user id to print it
+    Receiving the library and the item, then get who borrowed and who reserved the item
+    from the library indexes (item id => user) => get the users names to print them
 
     Args:
-        users (list): list of users to search based on it
+        library_manager (Library): the library object which knows who has each item
         item (LibraryItem): Receive the item to check if borrowed, or reserved by someone else
         message (str): The message to print "borrowed" or "reserved"
         
@@ -222,16 +320,16 @@ def display_not_available_to_have(users, item, message):
     """
     borrowed_by_name = None
     reserved_by_name = None
-    for user in users:
-        # check is the item borrowed by someone else
-        user_borrowed_items = user.get_borrowed_items()
-        for i in user_borrowed_items:
-            if i['item_id'] == item.get_item_id():
-                borrowed_by_name = user.get_name()
 
-        # Check for reserved status
-        if user.get_user_id() == item.get_reserved_by():
-            reserved_by_name = user.get_name()
+    # check is the item borrowed by someone else
+    borrowers = library_manager.get_borrowers(item)
+    if borrowers:
+        borrowed_by_name = ', '.join(borrower.get_name() for borrower in borrowers)
+
+    # Check for reserved status
+    reservers = library_manager.get_holders(item)
+    if reservers:
+        reserved_by_name = ', '.join(reserver.get_name() for reserver in reservers)
 
     # intial value
     item_status = "not available"
@@ -254,7 +352,7 @@ def get_admin_password():
     Returns:
         str: Returns 'admin', 'stop' based on the validator function `check_admin()`
     """
-    password = input('\n🔒 Please enter the admin password: ')
+    password = console.ask('\n🔒 Please enter the admin password: ')
     return validators.check_admin(password)
 
 # get the item info to add it or remove it from the admin
@@ -273,13 +371,13 @@ def get_admin_item_info(message):
                 - title: the title of the item 
                 - author: the author of the item 
     """
-    print(f'To {message} an item you should enter the following: ')
+    console.say(f'To {message} an item you should enter the following: ')
 
-    item_type = input('- The Type of the Item: ').strip().capitalize()
+    item_type = console.ask('- The Type of the Item: ').strip().capitalize()
     item_type = validators.type_validation(item_type)
-    title = input('- The Title of the Item: ').strip()
+    title = console.ask('- The Title of the Item: ').strip()
     title = validators.empty_input_validation(title, 'item title')
-    author = input('- The Author of the Item: ').strip()
+    author = console.ask('- The Author of the Item: ').strip()
     author = validators.empty_input_validation(author, 'item author')
 
     if item_type and title and author:
@@ -0,0 +1,183 @@
+"""
+This persistence module: collects the changed users and items (dirty records),
+and saves them together (group commit) instead of saving each change alone.
+
+a background thread saves the dirty records every `interval` seconds,
+or as soon as `batch_size` records are waiting.
+if the same record changed many times before saving, it's saved one time (coalesced).
+"""
+import threading
+from contextlib import contextmanager
+
+class GroupCommitScheduler:
+    """
+    Class representing the group commit scheduler.
+
+    Attributes:
+        __write_records (function): saves a list of (kind, dictionary) records together
+        __interval (float): the maximum seconds a change waits before saving it
+        __batch_size (int): save directly when this number of records are waiting
+        __dirty (dict): (kind, id) => the changed instance (the latest state is saved)
+        __condition (threading.Condition): to wake up the background thread
+        __write_lock (threading.RLock): just one writer at the same time (the holder can flush again)
+        __thread (threading.Thread): the background thread, or None if not started
+        __closed (bool): true after `close()`
+        __stats (dict): the counters (mutations, coalesced, flushes, records_written, failures)
+
+    Methods:
+        mark: Mark a user or an item as changed
+        mark_many: Mark many users and items as changed together
+        flush: Save all the waiting records now
+        holding: Context manager to save the waiting records and stop the background saving for a while
+        close: Save the waiting records and stop the background thread
+        stats: Returns the counters
+    """
+    def __init__(self, write_records, interval=1.0, batch_size=100):
+        """
+        GroupCommitScheduler constructor
+
+        Args:
+            write_records (function): receives a list of (kind, dictionary) and saves them together
+            interval (float): the maximum seconds a change waits before saving it
+            batch_size (int): save directly when this number of records are waiting
+        """
+        self.__write_records = write_records
+        self.__interval = interval
+        self.__batch_size = batch_size
+        self.__dirty = {}
+        self.__condition = threading.Condition()
+        self.__write_lock = threading.RLock()
+        self.__thread = None
+        self.__closed = False
+        self.__stats = {'mutations': 0, 'coalesced': 0, 'flushes': 0, 'records_written': 0, 'failures': 0}
+
+    # mark a record as changed
+    def mark(self, kind, key, instance):
+        """
+        Mark a user or an item as changed to save it with the next flush
+
+        Args:
+            kind (str): 'user' or 'item'
+            key (str): the user id or the item id
+            instance (User | LibraryItem): the changed instance (`instance_to_dict()` is called when saving)
+        """
+        self.mark_many([(kind, key, instance)])
+
+    def mark_many(self, changes):
+        """
+        Mark many records as changed together, they are saved in the same flush
+        (the background thread can't take just some of them)
+
+        Args:
+            changes (list): list of (kind, key, instance) => the same as `mark()`
+        """
+        with self.__condition:
+            if self.__closed:
+                raise RuntimeError('the persistence scheduler is closed')
+
+            for kind, key, instance in changes:
+                self.__stats['mutations'] += 1
+                if (kind, key) in self.__dirty:
+                    # already waiting => this change will be saved with it
+                    self.__stats['coalesced'] += 1
+                self.__dirty[(kind, key)] = instance
+
+            if self.__thread is None:
+                self.__thread = threading.Thread(target=self.__run, name='group-commit', daemon=True)
+                self.__thread.start()
+
+            if len(self.__dirty) >= self.__batch_size:
+                self.__condition.notify()
+
+    # the background thread loop
+    def __run(self):
+        """Wait until the interval passes, or the batch is full, then flush"""
+        failed = False
+        while True:
+            with self.__condition:
+                # after a failed flush always wait the interval (don't retry in a busy loop)
+                if not self.__closed and (failed or len(self.__dirty) < self.__batch_size):
+                    self.__condition.wait(self.__interval)
+                closed = self.__closed
+
+            with self.__condition:
+                failures = self.__stats['failures']
+            self.flush()
+            with self.__condition:
+                failed = self.__stats['failures'] != failures
+            if closed:
+                return
+
+    def __take_dirty(self):
+        """Returns the waiting instances ((kind, id) => instance) and empty the waiting list"""
+        with self.__condition:
+            dirty = self.__dirty
+            self.__dirty = {}
+        return dirty
+
+    def __put_back(self, dirty):
+        """Returns the not saved instances to the waiting list (the newer changes stay)"""
+        with self.__condition:
+            for key, instance in dirty.items():
+                self.__dirty.setdefault(key, instance)
+            self.__stats['failures'] += 1
+
+    # save the waiting records now
+    def flush(self):
+        """
+        Save all the waiting records together now
+
+        Returns:
+            int: how many records were saved
+        """
+        with self.__write_lock:
+            return self.__flush_locked()
+
+    def __flush_locked(self):
+        """Save the waiting records (the write lock is already taken)"""
+        dirty = self.__take_dirty()
+        if not dirty:
+            return 0
+
+        records = [(kind, instance.instance_to_dict()) for (kind, _), instance in dirty.items()]
+        # not saved => keep them waiting to try again with the next flush
+        if not self.__write_records(records):
+            self.__put_back(dirty)
+            return 0
+
+        with self.__condition:
+            self.__stats['flushes'] += 1
+            self.__stats['records_written'] += len(records)
+        return len(records)
+
+    @contextmanager
+    def holding(self):
+        """
+        Save the waiting records, and keep the write lock until the with block ends
+
+        used when rewriting the whole files, so the background thread
+        doesn't write to the journal in the middle of that.
+        the with block receives the flush function, to save the records marked inside it
+        before the block ends (e.g, `storage.shared_transaction()`).
+        """
+        with self.__write_lock:
+            self.__flush_locked()
+            yield self.flush
+
+    # stop the scheduler
+    def close(self):
+        """Save all the waiting records, then stop the background thread (blocks until done)"""
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify()
+            thread = self.__thread
+
+        if thread is not None:
+            thread.join()
+        # anything marked before closing and not saved by the thread
+        self.flush()
+
+    def stats(self):
+        """Returns a copy of the counters (mutations, coalesced, flushes, records_written, failures)"""
+        with self.__condition:
+            return dict(self.__stats)
@@ -0,0 +1,145 @@
+"""
+This process_lock module: one lock file shared by all the processes that use the same data folder
+(e.g, two terminals running main.py, and the library service).
+
+- the readers (loading, refreshing) hold the shared lock => many readers together
+- the writers (journal appends, rewriting the files) hold the exclusive lock => one writer, no readers
+
+the locking uses `fcntl.flock()`, the OS removes the lock if the process dies (no stale locks).
+on systems without `fcntl` (Windows) the lock works just between the threads of the same process.
+
+the lock file has a small header (3 numbers) that the writers change while holding the exclusive lock:
+    - sequence => the number of the last commit (each save of records is one commit)
+    - generation => increases each time a whole data file is rewritten
+    - rewrite sequence => the commit number when a whole file was rewritten the last time,
+      the processes that didn't read all the commits before it must reload everything
+"""
+import os
+import struct
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# the header => (sequence, generation, rewrite sequence) as 64-bit numbers
+HEADER = struct.Struct('<qqq')
+
+class ProcessLock:
+    """
+    Class representing the lock file of the data folder.
+
+    the same process can take the lock again inside the with block (re-entrant),
+    and the threads of the process wait each other (one thread holds the lock at the same time).
+
+    Attributes:
+        __file_name (str): the lock file path
+        __fd (int): the opened lock file, or None if it's not opened yet
+        __thread_lock (threading.RLock): the lock between the threads of this process
+        __depth (int): how many times the holder thread took the lock (0 => not held)
+        __exclusive (bool): true if the lock file is held exclusive
+
+    Methods:
+        shared: Context manager that holds the shared (readers) lock
+        exclusive: Context manager that holds the exclusive (writer) lock
+        read_header: Returns (sequence, generation, rewrite sequence)
+        write_header: Changes the header (while holding the exclusive lock)
+    """
+    def __init__(self, file_name):
+        """
+        ProcessLock constructor
+
+        Args:
+            file_name (str): the lock file path (it's made if it doesn't exist)
+        """
+        self.__file_name = file_name
+        self.__fd = None
+        self.__thread_lock = threading.RLock()
+        self.__depth = 0
+        self.__exclusive = False
+
+    def get_file_name(self):
+        """Returns the lock file path"""
+        return self.__file_name
+
+    def __open(self):
+        """Opens the lock file the first time, returns None if its folder doesn't exist"""
+        if self.__fd is None and os.path.isdir(os.path.dirname(os.path.abspath(self.__file_name))):
+            self.__fd = os.open(self.__file_name, os.O_RDWR | os.O_CREAT, 0o644)
+        return self.__fd
+
+    def __acquire(self, exclusive):
+        """Take the lock (shared or exclusive)"""
+        self.__thread_lock.acquire()
+        try:
+            fd = self.__open()
+            if fd is not None and fcntl is not None:
+                # the first time, or a reader inside the with block needs to write => make it exclusive
+                if self.__depth == 0 or (exclusive and not self.__exclusive):
+                    fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            if exclusive:
+                self.__exclusive = True
+            self.__depth += 1
+        except BaseException:
+            self.__thread_lock.release()
+            raise
+
+    def __release(self):
+        """Release the lock one time (the lock file is unlocked when the outer with block ends)"""
+        self.__depth -= 1
+        if self.__depth == 0:
+            if self.__fd is not None and fcntl is not None:
+                fcntl.flock(self.__fd, fcntl.LOCK_UN)
+            self.__exclusive = False
+        self.__thread_lock.release()
+
+    @contextmanager
+    def shared(self):
+        """Holds the shared lock until the with block ends (many readers together)"""
+        self.__acquire(False)
+        try:
+            yield
+        finally:
+            self.__release()
+
+    @contextmanager
+    def exclusive(self):
+        """Holds the exclusive lock until the with block ends (one writer, no readers)"""
+        self.__acquire(True)
+        try:
+            yield
+        finally:
+            self.__release()
+
+    # the header
+    def read_header(self):
+        """
+        Returns the header numbers (call it while holding the lock)
+
+        Returns:
+            tuple: (sequence, generation, rewrite sequence) => zeros for a new lock file
+        """
+        fd = self.__open()
+        if fd is None:
+            return 0, 0, 0
+        os.lseek(fd, 0, os.SEEK_SET)
+        data = os.read(fd, HEADER.size)
+        if len(data) < HEADER.size:
+            return 0, 0, 0
+        return HEADER.unpack(data)
+
+    def write_header(self, sequence, generation, rewrite_sequence):
+        """
+        Changes the header numbers (call it while holding the exclusive lock)
+
+        Args:
+            sequence (int): the last commit number
+            generation (int): the number of the whole files rewrites
+            rewrite_sequence (int): the commit number when a whole file was rewritten the last time
+        """
+        fd = self.__open()
+        if fd is not None:
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.write(fd, HEADER.pack(sequence, generation, rewrite_sequence))
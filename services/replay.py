@@ -0,0 +1,205 @@
+"""
+This replay module: runs saved sessions (traces) through the real handlers without a terminal,
+and measures how fast each handler is.
+
+a trace is a JSON lines file, one menu choice in each line:
+    {"op": "borrow", "answers": ["4", "1", "a1b2c3d4", "e5f6a7b8"]}
+    - answers => everything the user typed for this menu choice (the menu choice first)
+    - op => the name of the operation in the report (made from the answers if it's missing)
+    - new_ids => the display ids of the users / items this choice added (e.g, registering), if any.
+      the replay makes other random ids for them, so the next answers that have the recorded ids get the new ones
+
+record a session => `python main.py session.jsonl`
+replay it => `python -m services.replay session.jsonl [data folder]`
+(the replay changes the data like the real session did => replay it on a copy of the data folder)
+"""
+import json
+import os
+import statistics
+import sys
+import time
+from services import console, display, storage, track_process
+from Exceptions.exceptions import ScriptEndedError
+
+# the menu choice (the first answer) => the operation name
+MENU_OPERATIONS = {'1': 'view', '2': 'search', '3': 'register', '4': 'borrow_return', '5': 'reserve_cancel', '6': 'admin'}
+# the choices that have two ways (the second answer) => the operation name of each way
+SUB_OPERATIONS = {'4': {'1': 'borrow', '2': 'return'}, '5': {'1': 'reserve', '2': 'cancel'}}
+
+# the name of a recorded operation
+def operation_name(answers):
+    """
+    Returns the operation name of the answers of one menu choice (e.g, ['4', '1', ...] => 'borrow')
+
+    Args:
+        answers (list): the answers (the menu choice first)
+
+    Returns:
+        str: the operation name, or 'other' if the menu choice isn't known
+    """
+    menu_choice = answers[0].strip() if answers else ''
+    name = MENU_OPERATIONS.get(menu_choice, 'other')
+    if menu_choice in SUB_OPERATIONS and len(answers) > 1:
+        name = SUB_OPERATIONS[menu_choice].get(answers[1].strip(), name)
+    return name
+
+def new_display_ids(records, count):
+    """Returns the display ids of the users / items added after the first `count` of them"""
+    return [records[position].get_display_id() for position in range(count, len(records))]
+
+# save one menu choice into the trace file
+def append_trace(file_name, answers, new_ids=None):
+    """
+    Adds the answers of one menu choice to the end of the trace file (a JSON line)
+
+    Args:
+        file_name (str): the trace file
+        answers (list): what the user typed for this menu choice (the menu choice first)
+        new_ids (list): the display ids of the users / items this choice added (see `new_display_ids()`)
+    """
+    if not answers:
+        return
+    operation = {'op': operation_name(answers), 'answers': answers}
+    if new_ids:
+        operation['new_ids'] = new_ids
+    with open(file_name, 'a') as f:
+        f.write(json.dumps(operation) + '\n')
+
+# read the trace file
+def load_trace(file_name):
+    """
+    Reads the operations of the trace file
+
+    Args:
+        file_name (str): the trace file (JSON lines)
+
+    Returns:
+        list: the operations => {'op', 'answers', 'new_ids'}, or [] if the file can't be read
+    """
+    operations = []
+    try:
+        with open(file_name, 'r') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                operation = json.loads(line)
+                answers = [str(answer) for answer in operation['answers']]
+                operations.append({
+                    'op': operation.get('op') or operation_name(answers), 'answers': answers,
+                    'new_ids': [str(new_id) for new_id in operation.get('new_ids', [])]
+                })
+    except FileNotFoundError:
+        console.say(f"\n❌ Trace file {file_name} doesn't exist...")
+        return []
+    except (json.decoder.JSONDecodeError, KeyError, TypeError):
+        console.say(f'\n❌ Trace file {file_name} is not formatted correctly')
+        return []
+    return operations
+
+def percentile(values, percent):
+    """Returns the percent percentile of the values (e.g, 50, 99)"""
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method='inclusive')[percent - 1]
+
+# run the operations through the real handlers
+def replay(operations, users, items, library_manager):
+    """
+    Runs each operation like the main loop does (read the other processes changes, the menu, the handler)
+    with a scripted console that gives the recorded answers, one operation after one without waiting
+
+    an operation fails if the handler asks more questions than its answers, or doesn't ask all of them
+    (the data isn't the same as when it was recorded, e.g, the item was removed)
+
+    Args:
+        operations (list): the operations from `load_trace()`
+        users (list): the list of all users instances
+        items (list): the list of all items instances
+        library_manager (Library): the library object
+
+    Returns:
+        dict: the report => operations, seconds, ops_per_second, flush_seconds,
+            and handlers (operation name => count, failed, mean / p50 / p90 / p99 / max in ms)
+    """
+    latencies = {}
+    failures = {}
+    # the recorded display id => the display id of the same user / item in this replay
+    replayed_ids = {}
+
+    start = time.perf_counter()
+    for operation in operations:
+        answers = [replayed_ids.get(answer.strip(), answer) for answer in operation['answers']]
+        scripted = console.ScriptedConsole(answers)
+        users_count, items_count = len(users), len(items)
+        operation_start = time.perf_counter()
+        try:
+            with console.using(scripted):
+                storage.refresh(library_manager)
+                choice = display.display_welcome_message()
+                # the exit choice isn't replayed (the replay saves at the end)
+                if choice != 7:
+                    track_process.handle_choice(choice, users, items, library_manager)
+            failed = scripted.remaining() > 0
+        except ScriptEndedError:
+            failed = True
+        latencies.setdefault(operation['op'], []).append(time.perf_counter() - operation_start)
+        if operation['new_ids']:
+            new_ids = new_display_ids(users, users_count) + new_display_ids(items, items_count)
+            replayed_ids.update(zip(operation['new_ids'], new_ids))
+        if failed:
+            failures[operation['op']] = failures.get(operation['op'], 0) + 1
+    seconds = time.perf_counter() - start
+
+    # save the waiting changes (group commit)
+    flush_start = time.perf_counter()
+    storage.close_storage()
+    flush_seconds = time.perf_counter() - flush_start
+
+    handlers = {}
+    for name, values in sorted(latencies.items()):
+        handlers[name] = {
+            'count': len(values), 'failed': failures.get(name, 0),
+            'mean_ms': statistics.fmean(values) * 1000, 'p50_ms': percentile(values, 50) * 1000,
+            'p90_ms': percentile(values, 90) * 1000, 'p99_ms': percentile(values, 99) * 1000, 'max_ms': max(values) * 1000
+        }
+
+    return {
+        'operations': len(operations), 'seconds': seconds,
+        'ops_per_second': len(operations) / seconds if seconds else 0.0,
+        'flush_seconds': flush_seconds, 'handlers': handlers
+    }
+
+# print the report of `replay()`
+def print_report(report):
+    """Prints the operations per second, and the latency of each handler"""
+    console.say(f"\n{report['operations']:,} operations in {report['seconds']:.2f}s => {report['ops_per_second']:,.0f} ops/s"
+                f" (saving the waiting changes at the end: {report['flush_seconds']:.2f}s)")
+    console.say(f'{"operation":<16}{"count":>8}{"failed":>8}{"mean ms":>10}{"p50 ms":>10}{"p90 ms":>10}{"p99 ms":>10}{"max ms":>10}')
+    for name, handler in report['handlers'].items():
+        console.say(f"{name:<16}{handler['count']:>8,}{handler['failed']:>8,}{handler['mean_ms']:>10.3f}{handler['p50_ms']:>10.3f}"
+                    f"{handler['p90_ms']:>10.3f}{handler['p99_ms']:>10.3f}{handler['max_ms']:>10.3f}")
+
+def use_data_folder(folder):
+    """Makes the storage use the data files of the folder (instead of `data/`)"""
+    storage.ITEMS_FILE_NAME = os.path.join(folder, 'items.json')
+    storage.USERS_FILE_NAME = os.path.join(folder, 'users.json')
+    storage.JOURNAL_FILE_NAME = os.path.join(folder, 'journal.log')
+
+def main(trace_file_name, data_folder=None):
+    if data_folder:
+        use_data_folder(data_folder)
+
+    operations = load_trace(trace_file_name)
+    if not operations:
+        return None
+
+    users, items, library_manager = track_process.initialize_library()
+    report = replay(operations, users, items, library_manager)
+    print_report(report)
+    return report
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print('Usage: python -m services.replay <trace file> [data folder]')
+    else:
+        main(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
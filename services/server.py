@@ -0,0 +1,559 @@
+"""
+This server module: a local asyncio service, so many desks (clients) use one shared Library
+instead of each terminal running its own process on the same JSON files.
+
+the protocol is JSON lines over TCP: each request is one JSON object in one line,
+and the server answers each request with one JSON object in one line (in the same order).
+    request  => {"op": "borrow", "user_id": "1a2b3c4d", "item_id": "5e6f7a8b"}
+    response => {"ok": true, ...} or {"ok": false, "error": "..."}
+an optional "id" in the request is sent back in its response.
+
+the operations (the same as the menu in `track_process` module):
+    - search      => "by": "title" or "type", "query", "limit" (optional, 20 by default)
+                     the response has the first items, and "more" => true if more items matched
+    - available   => the available / not available counts of each type
+    - register    => "name", "email"
+    - borrow, return, reserve, cancel => "user_id", "item_id" (the display ids, 8 characters)
+                     reserving a not available item joins its queue => the response has "position"
+    - borrow_many, return_many, reserve_many => "user_id", "item_ids" (a list)
+                     all the items or none of them, the response has "results" => one result for each item
+    - add_item    => "password", "type", "title", "author" (an existing item => one more copy of it)
+    - remove_item => "password", "item_id"
+    - add_user    => "password", "name", "email"
+    - remove_user => "password", "user_id"
+    - overdue     => "password", "limit" (optional, 20 by default) => the overdue loans, the oldest first
+                     (e.g, a batch of reminders)
+
+the reading operations (search, available, overdue) run inside the event loop (fast, and the Library is thread safe),
+the changes run in one background thread (executor), each one as one step between the processes
+(see `storage.shared_transaction()`): it holds the writer lock, reads the other processes changes first
+(e.g, a terminal borrowed the same item), then changes the library and saves it before they continue.
+so a slow disk doesn't stop the other clients, and the changes happen one after one (in the requests order).
+
+Run it from the project folder:
+    python -m services.server [port]
+"""
+import re
+import sys
+import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from models.user import User
+from models.libraryitem import ITEM_CLASSES
+from Exceptions.exceptions import (
+    EmailIsNotValid, EmailAlreadyExistsError, InputFieldEmptyError, UserNotFoundError, ItemNotFoundError,
+    ItemNotAvailableError, ItemCanNotReserve, AdminPasswordWrongError, TypeIsNotValidError, DisplayIdCollisionError,
+    OperationNotAllowedError
+)
+from . import sqlite_storage, storage, track_process, validators
+
+# USE CONSTANTS
+HOST = '127.0.0.1'
+PORT = 8765
+# the waiting connections queue (many clients connect together)
+BACKLOG = 2048
+# the longest request line (bytes)
+MAX_LINE_SIZE = 64 * 1024
+# the maximum items in one search response
+SEARCH_LIMIT = 20
+
+# the errors that are the client mistakes (answered with their message)
+CLIENT_ERRORS = (
+    EmailIsNotValid, EmailAlreadyExistsError, InputFieldEmptyError, UserNotFoundError, ItemNotFoundError,
+    ItemNotAvailableError, ItemCanNotReserve, AdminPasswordWrongError, TypeIsNotValidError, DisplayIdCollisionError,
+    OperationNotAllowedError
+)
+
+def item_to_response(item):
+    """Returns the item as a dictionary for the response (the stored dictionary + the display id)"""
+    item_dict = item.instance_to_dict()
+    item_dict['display_id'] = item.get_display_id()
+    return item_dict
+
+def clean_message(error):
+    """Returns the error message without the new lines, and the emoji the menu prints"""
+    return str(error).replace('❌', '').strip()
+
+class LibraryServer:
+    """
+    Class representing the library service (one shared Library for all clients).
+
+    Attributes:
+        __users (list): the list of all users instances
+        __library (Library): the shared library object
+        __disk (ThreadPoolExecutor): one thread for the changes and saving them to the disk (in the requests order)
+        __operations (dict): the reading operation name => the method that handles it (inside the event loop)
+        __changes (dict): the changing operation name => the method that handles it (inside the disk thread)
+        __server (asyncio.Server): the listening server, or None before `start()`
+
+    Methods:
+        start: Start listening
+        close: Stop listening, and wait the waiting saves
+        dispatch: Handle one request and returns its response
+    """
+    def __init__(self, users, library_manager):
+        """
+        LibraryServer constructor
+
+        Args:
+            users (list): the list of all users instances
+            library_manager (Library): the library object (from `initialize_library()`)
+        """
+        self.__users = users
+        self.__library = library_manager
+        self.__disk = ThreadPoolExecutor(max_workers=1, thread_name_prefix='library-disk')
+        self.__server = None
+        self.__operations = {
+            'search': self.search,
+            'available': self.available,
+            'overdue': self.overdue
+        }
+        self.__changes = {
+            'register': self.register,
+            'borrow': self.borrow,
+            'return': self.return_item,
+            'reserve': self.reserve,
+            'cancel': self.cancel,
+            'borrow_many': partial(self.apply_many, self.__library.borrow_many),
+            'return_many': partial(self.apply_many, self.__library.return_many),
+            'reserve_many': partial(self.apply_many, self.__library.reserve_many),
+            'add_item': self.add_item,
+            'remove_item': self.remove_item,
+            'add_user': self.add_user,
+            'remove_user': self.remove_user
+        }
+
+    # start / stop
+    async def start(self, host=HOST, port=PORT):
+        """
+        Start listening for the clients
+
+        Args:
+            host (str): the address to listen on (local by default)
+            port (int): the port (0 => any free port)
+
+        Returns:
+            asyncio.Server: the listening server (its sockets have the real port)
+        """
+        self.__server = await asyncio.start_server(
+            self.handle_client, host, port, limit=MAX_LINE_SIZE, backlog=BACKLOG
+        )
+        return self.__server
+
+    async def close(self):
+        """Stop listening, then wait the saves that are still waiting"""
+        if self.__server is not None:
+            self.__server.close()
+            await self.__server.wait_closed()
+        self.__disk.shutdown(wait=True)
+
+    # one client connection
+    async def handle_client(self, reader, writer):
+        """Read the requests lines of one client and write a response line for each one"""
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    writer.write(self.encode({'ok': False, 'error': 'the request is too long'}))
+                    break
+
+                # the client closed the connection
+                if not line:
+                    break
+
+                writer.write(self.encode(await self.dispatch_line(line)))
+                await writer.drain()
+
+        except ConnectionError:
+            pass
+
+        finally:
+            writer.close()
+
+    @staticmethod
+    def encode(response):
+        """Returns the response as one JSON line (bytes)"""
+        return json.dumps(response, ensure_ascii=False).encode() + b'\n'
+
+    async def dispatch_line(self, line):
+        """Decode the request line, then handle it"""
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return {'ok': False, 'error': 'the request is not valid JSON'}
+
+        if not isinstance(request, dict):
+            return {'ok': False, 'error': 'the request must be a JSON object'}
+        return await self.dispatch(request)
+
+    async def dispatch(self, request):
+        """
+        Handle one request
+
+        Args:
+            request (dict): the request (must have "op")
+
+        Returns:
+            dict: the response => {"ok": true, ...} or {"ok": false, "error": "..."}
+        """
+        operation = self.__operations.get(request.get('op'))
+        change = self.__changes.get(request.get('op'))
+        if operation is None and change is None:
+            response = {'ok': False, 'error': f"unknown operation {request.get('op')!r}"}
+        else:
+            try:
+                response = {'ok': True}
+                response.update(await operation(request) if operation is not None else await self.transact(change, request))
+
+            except CLIENT_ERRORS as e:
+                response = {'ok': False, 'error': clean_message(e)}
+
+            except IOError as e:
+                response = {'ok': False, 'error': clean_message(e)}
+
+            except Exception:
+                response = {'ok': False, 'error': 'the server failed to handle the request'}
+
+        if 'id' in request:
+            response['id'] = request['id']
+        return response
+
+    # helpers
+    async def transact(self, change, request):
+        """
+        Runs a changing operation in the disk thread as one step between the processes (see `storage.shared_transaction()`),
+        so it checks the latest data (the other processes changes), and its saving can't conflict with them
+
+        Args:
+            change (function): the method that handles the request (e.g, `borrow`)
+            request (dict): the request
+
+        Returns:
+            dict: what the method returned
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.__disk, partial(self.run_change, change, request))
+
+    def run_change(self, change, request):
+        """Handles the request inside `storage.shared_transaction()` (called in the disk thread)"""
+        with storage.shared_transaction(self.__library):
+            return change(request)
+
+    @staticmethod
+    def save(function, *args):
+        """
+        Runs a storage function (e.g, `storage.update_items`), inside `run_change()`
+
+        Raises:
+            IOError: if the storage function returned false
+        """
+        if not function(*args):
+            raise IOError('failed to save the changes')
+
+    def save_loan(self, user, item):
+        """
+        Saves the user and the item of a borrow / return / reserve / cancel (one trip to the disk thread),
+        and the users who reserved the item (returning, or canceling gives it to the first waiting user)
+        """
+        users = [user]
+        for next_user in self.__library.get_holders(item):
+            if next_user is not user:
+                users.append(next_user)
+        self.save(storage.update_many, self.__library, users, [item])
+
+    @staticmethod
+    def field(request, name):
+        """
+        Returns a not empty text field of the request
+
+        Raises:
+            InputFieldEmptyError: if the field is missing, or empty
+        """
+        value = request.get(name)
+        if not isinstance(value, str) or not value.strip():
+            raise InputFieldEmptyError(f"You can't left the {name.replace('_', ' ')} empty!")
+        return value.strip()
+
+    def check_admin(self, request):
+        """
+        Raises:
+            AdminPasswordWrongError: if the request password is not the admin password
+        """
+        if request.get('password') != validators.ADMIN_PASSWORD:
+            raise AdminPasswordWrongError('Please input the correct password.')
+
+    def find_user(self, request):
+        """
+        Returns the user of the request "user_id" (display id)
+
+        Raises:
+            UserNotFoundError: if no user has this id
+            DisplayIdCollisionError: if more than one user has this id
+        """
+        user = self.__library.find_user(self.field(request, 'user_id'))
+        if user is None:
+            raise UserNotFoundError('User not found.')
+        return user
+
+    def find_item(self, request):
+        """
+        Returns the item of the request "item_id" (display id)
+
+        Raises:
+            ItemNotFoundError: if no item has this id
+            DisplayIdCollisionError: if more than one item has this id
+        """
+        item = self.__library.find_item(self.field(request, 'item_id'))
+        if item is None:
+            raise ItemNotFoundError('Item not found.')
+        return item
+
+    def new_user(self, request):
+        """
+        Returns a new User from the request name and email (after validating them)
+
+        Raises:
+            InputFieldEmptyError, EmailIsNotValid, EmailAlreadyExistsError
+        """
+        name = self.field(request, 'name')
+        email = self.field(request, 'email').lower()
+
+        if not re.match(validators.EMAIL_PATTERN, email):
+            raise EmailIsNotValid('Email Formmating is not valid...')
+
+        for user in self.__users:
+            if user.get_email().lower() == email:
+                raise EmailAlreadyExistsError('This email already linked with another user')
+
+        return User(name, email)
+
+    # the operations
+    async def search(self, request):
+        """Search the items by title, or by type"""
+        query = self.field(request, 'query').lower()
+        limit = request.get('limit', SEARCH_LIMIT)
+        if not isinstance(limit, int) or limit < 1:
+            raise InputFieldEmptyError('The limit must be a positive number')
+
+        if request.get('by', 'title') == 'type':
+            # SQLite backend => the query uses the type index (reading the disk => the disk thread)
+            if storage.use_sqlite():
+                result = await asyncio.get_running_loop().run_in_executor(
+                    self.__disk, sqlite_storage.search_by_type, query, limit + 1)
+            else:
+                # the type iterator => just the first items are made (the mapped catalog makes each instance when it's read)
+                result = []
+                for item_type in self.__library.get_types():
+                    if item_type.lower() == query:
+                        result = list(islice(self.__library.iter_items_by_type(item_type), limit + 1))
+        else:
+            if storage.use_sqlite():
+                result = await asyncio.get_running_loop().run_in_executor(
+                    self.__disk, sqlite_storage.search_by_title, query, limit + 1)
+            else:
+                # one more item than the limit => we know if there are more items (without making all of them)
+                result = self.__library.search_by_title(query, limit + 1)
+
+        return {'more': len(result) > limit, 'items': [item_to_response(item) for item in result[:limit]]}
+
+    async def available(self, request):
+        """The available / not available counts of each type"""
+        return {'types': {
+            item_type: {
+                'available': self.__library.get_available_count(item_type),
+                'not_available': self.__library.get_not_available_count(item_type)
+            }
+            for item_type in self.__library.get_types()
+        }}
+
+    def register(self, request):
+        """Register a new user"""
+        user = self.new_user(request)
+        self.__library.add_user(user)
+        self.save(storage.store_users, self.__users)
+        return {'user_id': user.get_display_id()}
+
+    def borrow(self, request):
+        """Borrow an item"""
+        user, item = self.find_user(request), self.find_item(request)
+        if not self.__library.borrow_item(user, item):
+            raise ItemNotAvailableError(f'{item.get_title()} is not available to borrow')
+
+        self.save_loan(user, item)
+        return {'item': item_to_response(item), 'due': user.get_borrowed_item(item.get_item_id())['due']}
+
+    def return_item(self, request):
+        """Return a borrowed item"""
+        user, item = self.find_user(request), self.find_item(request)
+        if not self.__library.return_item(user, item):
+            raise ItemNotFoundError(f'{item.get_title()} is not borrowed by {user.get_name()}')
+
+        self.save_loan(user, item)
+        return {'item': item_to_response(item)}
+
+    def reserve(self, request):
+        """Reserve an item (just Book, DVD)"""
+        user, item = self.find_user(request), self.find_item(request)
+        if not hasattr(item, 'reserve'):
+            raise ItemCanNotReserve(f"{item.get_type()} items can't be reserved")
+        if not self.__library.make_reservation(user, item):
+            raise ItemNotAvailableError(f'{item.get_title()} is already reserved, or waited by {user.get_name()}')
+
+        self.save_loan(user, item)
+        return {'item': item_to_response(item), 'position': self.__library.get_waitlist_position(user, item)}
+
+    def cancel(self, request):
+        """Cancel a reservation"""
+        user, item = self.find_user(request), self.find_item(request)
+        if not hasattr(item, 'cancel_reserve') or not self.__library.cancel_reserve(user, item):
+            raise ItemNotFoundError(f'{item.get_title()} is not reserved, or waited by {user.get_name()}')
+
+        self.save_loan(user, item)
+        return {'item': item_to_response(item)}
+
+    def apply_many(self, library_method, request):
+        """
+        Borrow / return / reserve many items of one user together (all of them, or none of them),
+        then save the user and the items one time
+
+        Args:
+            library_method (function): `borrow_many`, `return_many`, or `reserve_many` of the library
+            request (dict): the request => "user_id", "item_ids"
+        """
+        user = self.find_user(request)
+        display_ids = request.get('item_ids')
+        if not isinstance(display_ids, list) or not display_ids:
+            raise InputFieldEmptyError("You can't left the item ids empty!")
+
+        # find all the items first, an unknown id fails the whole request
+        items, errors = [], []
+        for display_id in display_ids:
+            try:
+                items.append(self.find_item({'item_id': display_id}))
+                errors.append(None)
+            except CLIENT_ERRORS as e:
+                errors.append(clean_message(e))
+
+        if not any(errors):
+            is_success, results = library_method(user, items)
+            errors = [result['reason'] for result in results]
+            if is_success:
+                # the users who got the returned items from the queues too
+                users = [user]
+                for item in items:
+                    for next_user in self.__library.get_holders(item):
+                        if next_user not in users:
+                            users.append(next_user)
+                self.save(storage.update_many, self.__library, users, items)
+                return {'results': [
+                    {'item_id': display_id, 'ok': True, 'item': item_to_response(item)}
+                    for display_id, item in zip(display_ids, items)
+                ]}
+
+        return {'ok': False, 'error': 'nothing changed, some items have problems', 'results': [
+            {'item_id': display_id, 'ok': error is None, 'error': error}
+            for display_id, error in zip(display_ids, errors)
+        ]}
+
+    async def overdue(self, request):
+        """The overdue loans, the oldest first (admin)"""
+        self.check_admin(request)
+        limit = request.get('limit', SEARCH_LIMIT)
+        if not isinstance(limit, int) or limit < 1:
+            raise InputFieldEmptyError('The limit must be a positive number')
+
+        return {'loans': [
+            {
+                'user_id': loan['user'].get_display_id() if loan['user'] else None,
+                'item': item_to_response(loan['item']) if loan['item'] else None,
+                'due': loan['due']
+            }
+            for loan in self.__library.get_overdue(limit=limit)
+        ]}
+
+    def add_item(self, request):
+        """Add a new item (admin)"""
+        self.check_admin(request)
+        item_type = self.field(request, 'type')
+        title, author = self.field(request, 'title'), self.field(request, 'author')
+
+        # the same type names as `type_validation()` (Book, Magazine, DVD)
+        item_type = 'DVD' if item_type.lower() == 'dvd' else item_type.capitalize()
+        if item_type not in ITEM_CLASSES:
+            raise TypeIsNotValidError('Item type must be Book, Magazine, or DVD')
+
+        # the same item => one more copy of it (and the first waiting user gets it)
+        for item in self.__library.search_by_title(title.lower()):
+            if item.get_type() == item_type and item.get_title().lower() == title.lower() and item.get_author().lower() == author.lower():
+                users = self.__library.add_copies(item)
+                self.save(storage.update_many, self.__library, users, [item])
+                return {'item': item_to_response(item)}
+
+        new_item = ITEM_CLASSES[item_type](title, author, True)
+        self.__library.add_item(new_item)
+        self.save(storage.store_items, self.__library.get_items())
+        return {'item': item_to_response(new_item)}
+
+    def remove_item(self, request):
+        """Remove an item that is not borrowed, or reserved (admin)"""
+        self.check_admin(request)
+        item = self.find_item(request)
+
+        for who, users in (('reserved', self.__library.get_holders(item)), ('borrowed', self.__library.get_borrowers(item))):
+            for user in users:
+                raise OperationNotAllowedError(f'Cannot remove item: {item.get_title()} is {who} by {user.get_name()}')
+        if self.__library.get_waitlist_length(item.get_item_id()):
+            raise OperationNotAllowedError(f'Cannot remove item: users are waiting {item.get_title()}')
+
+        if not self.__library.remove_item(item):
+            raise ItemNotFoundError('Item does not exist...')
+        self.save(storage.store_items, self.__library.get_items())
+        return {'item': item_to_response(item)}
+
+    def add_user(self, request):
+        """Add a new user (admin)"""
+        self.check_admin(request)
+        return self.register(request)
+
+    def remove_user(self, request):
+        """Remove a user that has no borrowed, or reserved items (admin)"""
+        self.check_admin(request)
+        user = self.find_user(request)
+
+        if user.get_borrowed_items() or user.get_reserved_items() or user.get_waiting_items():
+            raise OperationNotAllowedError(f'Cannot remove user: {user.get_name()} has borrowed, reserved, or waited items')
+
+        if not self.__library.remove_user(user):
+            raise UserNotFoundError('User not found.')
+        self.save(storage.store_users, self.__users)
+        return {'user_id': user.get_display_id()}
+
+# run the service
+async def serve(port=PORT, host=HOST):
+    """
+    Load the library, then serve the clients until the program is stopped (Ctrl + C)
+
+    Args:
+        port (int): the port to listen on
+        host (str): the address to listen on
+    """
+    users, items, library_manager = track_process.initialize_library()
+    server = LibraryServer(users, library_manager)
+    listening = await server.start(host, port)
+    print(f'📚 The library service is listening on {host}:{listening.sockets[0].getsockname()[1]}')
+
+    try:
+        await listening.serve_forever()
+    finally:
+        await server.close()
+        # save the waiting changes (group commit) before exit
+        storage.close_storage()
+
+if __name__ == '__main__':
+    try:
+        asyncio.run(serve(int(sys.argv[1]) if len(sys.argv) > 1 else PORT))
+    except KeyboardInterrupt:
+        print('\n💡 The library service stopped.')
@@ -0,0 +1,243 @@
+"""
+This sharded_storage module: keeps the items and users split into many small JSON files (shards)
+instead of one big file for each, e.g, data/shards/items-007.json
+
+the shard of each record is the crc32 of its id % the shards count,
+so updating one item rewrites just its shard (1 / SHARD_COUNT of the catalog),
+and the loading reads the shards together using a thread pool.
+
+each shard is a JSON list of [order number, dictionary],
+the order number keeps the records in the same order they were added (the shards are merged using it).
+the storage module calls these functions when `STORAGE_BACKEND` is 'sharded'.
+"""
+import os
+import json
+import heapq
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from . import atomic_file
+
+# USE CONSTANTS (THE SHARDS FOLDER)
+SHARDS_FOLDER = 'data/shards'
+MANIFEST_FILE_NAME = os.path.join(SHARDS_FOLDER, 'manifest.json')
+
+# the shards count of a new layout (an existing layout keeps its count from the manifest)
+SHARD_COUNT = 16
+
+# how many shards are read at the same time
+LOAD_WORKERS = 8
+
+# the id key of each kind
+ID_KEYS = {'item': 'item_id', 'user': 'user_id'}
+
+# kind => {id: order number}, and kind => the next order number
+# (filled while loading, so storing keeps the same order numbers)
+_order_numbers = {'item': {}, 'user': {}}
+_next_order_number = {'item': 0, 'user': 0}
+
+# (kind, shard) => crc32 of the last written / loaded text, to skip the shards that didn't change
+_checksums = {}
+
+# check if the sharded layout was created before
+def layout_exists():
+    """Returns true if the shards folder has a manifest, otherwise false"""
+    return os.path.exists(MANIFEST_FILE_NAME)
+
+# the shards count of the existing layout
+def get_shard_count():
+    """Returns the shards count from the manifest (or `SHARD_COUNT` for a new layout)"""
+    if not layout_exists():
+        return SHARD_COUNT
+
+    with open(MANIFEST_FILE_NAME, 'r') as f:
+        return json.load(f)['shard_count']
+
+# which shard has the record
+def shard_of(record_id, shard_count):
+    """
+    Returns the shard number of an id
+
+    crc32 not `hash()`, because python changes the strings hash each run
+
+    Args:
+        record_id (str): the item id or the user id
+        shard_count (int): the shards count
+
+    Returns:
+        int: the shard number (0 => shard_count - 1)
+    """
+    return zlib.crc32(record_id.encode()) % shard_count
+
+def shard_file_name(kind, shard):
+    """Returns the shard file path, e.g, ('item', 7) => data/shards/items-007.json"""
+    return os.path.join(SHARDS_FOLDER, f'{kind}s-{shard:03d}.json')
+
+# read and write one shard
+def read_shard(kind, shard):
+    """
+    Returns the entries of one shard as a list of [order number, dictionary]
+
+    Args:
+        kind (str): 'item' or 'user'
+        shard (int): the shard number
+
+    Returns:
+        list: the shard entries sorted by the order number ([] if the shard file doesn't exist)
+    """
+    file_name = shard_file_name(kind, shard)
+    if not os.path.exists(file_name):
+        return []
+
+    with open(file_name, 'r') as f:
+        text = f.read()
+    _checksums[(kind, shard)] = zlib.crc32(text.encode())
+    return json.loads(text)
+
+def write_shard(kind, shard, entries, durability):
+    """
+    Writes the entries of one shard (temp file + rename), if they changed after the last write
+
+    Args:
+        kind (str): 'item' or 'user'
+        shard (int): the shard number
+        entries (list): list of [order number, dictionary] sorted by the order number
+        durability (str): 'fast', 'safe', or 'paranoid' (see atomic_file module)
+
+    Returns:
+        bool: True if the shard file was written, False if it didn't change
+    """
+    text = json.dumps(entries, indent=4)
+    checksum = zlib.crc32(text.encode())
+    if _checksums.get((kind, shard)) == checksum:
+        return False
+
+    atomic_file.write_atomic(shard_file_name(kind, shard), text, durability)
+    _checksums[(kind, shard)] = checksum
+    return True
+
+def remember_order_numbers(kind, entries):
+    """Keep the order numbers of the loaded entries, so storing them doesn't change their order"""
+    order_numbers = _order_numbers[kind]
+    id_key = ID_KEYS[kind]
+    for order_number, record in entries:
+        order_numbers[record[id_key]] = order_number
+        if order_number >= _next_order_number[kind]:
+            _next_order_number[kind] = order_number + 1
+
+# load all the records of a kind
+def load(kind):
+    """
+    Reads all shards of a kind together (thread pool), and merge them by the order number
+
+    Args:
+        kind (str): 'item' or 'user'
+
+    Returns:
+        list: list of dictionaries in the same order they were added
+    """
+    shard_count = get_shard_count()
+    with ThreadPoolExecutor(max_workers=LOAD_WORKERS) as pool:
+        shards = list(pool.map(lambda shard: read_shard(kind, shard), range(shard_count)))
+
+    _order_numbers[kind] = {}
+    _next_order_number[kind] = 0
+    for entries in shards:
+        remember_order_numbers(kind, entries)
+
+    # each shard is sorted by the order number => merge them without sorting all records again
+    return [record for _, record in heapq.merge(*shards, key=lambda entry: entry[0])]
+
+# store all the records of a kind
+def store(kind, records, durability='safe'):
+    """
+    Makes the shards the same as the records list, writes just the shards that changed
+
+    (adding one item rewrites just its shard, the others have the same text as before)
+
+    Args:
+        kind (str): 'item' or 'user'
+        records (list): list of all dictionaries of this kind (in order)
+        durability (str): 'fast', 'safe', or 'paranoid'
+
+    Returns:
+        int: how many shard files were written
+    """
+    shard_count = get_shard_count()
+    id_key = ID_KEYS[kind]
+    old_order_numbers = _order_numbers[kind]
+    new_order_numbers = {}
+    shards = [[] for _ in range(shard_count)]
+
+    for record in records:
+        record_id = record[id_key]
+        order_number = old_order_numbers.get(record_id)
+        # a new record => goes after all the existing records
+        if order_number is None:
+            order_number = _next_order_number[kind]
+            _next_order_number[kind] += 1
+        new_order_numbers[record_id] = order_number
+        shards[shard_of(record_id, shard_count)].append([order_number, record])
+
+    written = 0
+    for shard, entries in enumerate(shards):
+        entries.sort(key=lambda entry: entry[0])
+        if write_shard(kind, shard, entries, durability):
+            written += 1
+
+    _order_numbers[kind] = new_order_numbers
+    return written
+
+# update some records (the group commit, or one update)
+def update_records(records, durability='safe'):
+    """
+    Replace the changed records inside their shards, each changed shard is written one time
+
+    Args:
+        records (list): list of (kind, dictionary) => kind is 'user' or 'item'
+        durability (str): 'fast', 'safe', or 'paranoid'
+
+    Returns:
+        int: how many records were found and updated
+    """
+    shard_count = get_shard_count()
+
+    # (kind, shard) => {id: dictionary}
+    changes = {}
+    for kind, record in records:
+        record_id = record[ID_KEYS[kind]]
+        changes.setdefault((kind, shard_of(record_id, shard_count)), {})[record_id] = record
+
+    updated = 0
+    for (kind, shard), shard_changes in changes.items():
+        id_key = ID_KEYS[kind]
+        entries = read_shard(kind, shard)
+        for entry in entries:
+            record = shard_changes.get(entry[1][id_key])
+            if record is not None:
+                entry[1] = record
+                updated += 1
+        write_shard(kind, shard, entries, durability)
+
+    return updated
+
+# the one-shot migrator from the JSON files
+def migrate(items_data, users_data, durability='safe'):
+    """
+    Writes the items and users dictionaries (loaded from the JSON files) into the shards
+
+    the manifest is written last, so if the migration stops in the middle
+    it will start again the next time.
+
+    Args:
+        items_data (list): list of items dictionaries
+        users_data (list): list of users dictionaries
+        durability (str): 'fast', 'safe', or 'paranoid'
+    """
+    os.makedirs(SHARDS_FOLDER, exist_ok=True)
+    _checksums.clear()
+    for kind, records in (('item', items_data), ('user', users_data)):
+        _order_numbers[kind] = {}
+        _next_order_number[kind] = 0
+        store(kind, records, durability)
+
+    atomic_file.write_atomic(MANIFEST_FILE_NAME, json.dumps({'shard_count': SHARD_COUNT}), durability)
@@ -0,0 +1,89 @@
+"""
+This snapshot module: keeps a binary copy (pickle protocol 5) of each JSON file next to it,
+e.g, data/items.json => data/items.snapshot
+
+loading the binary copy is faster than parsing the JSON text,
+so the storage module uses it when it's fresh (the JSON file didn't change after writing it),
+and falls back to the JSON file otherwise.
+
+the snapshot file layout:
+    MAGIC (8 bytes) | JSON file mtime_ns (8 bytes) | JSON file size (8 bytes) | crc32 of the payload (4 bytes) | payload
+"""
+import os
+import pickle
+import struct
+import zlib
+
+MAGIC = b'LIBSNAP1'
+HEADER = struct.Struct('<8sqqI')
+
+# the snapshot file name of a JSON file
+def snapshot_file_name(json_file_name):
+    """Returns the snapshot file name next to the JSON file (items.json => items.snapshot)"""
+    return os.path.splitext(json_file_name)[0] + '.snapshot'
+
+# read the snapshot if it's fresh
+def read_snapshot(json_file_name):
+    """
+    Returns the records (list of dictionaries) from the snapshot of the JSON file
+
+    the snapshot is fresh just if the JSON file has the same modification time and size
+    that were saved in the snapshot header, and the payload checksum is correct.
+
+    Args:
+        json_file_name (str): the JSON file path (e.g, 'data/items.json')
+
+    Returns:
+        list: the records, or None if there's no fresh snapshot
+    """
+    file_name = snapshot_file_name(json_file_name)
+    if not os.path.exists(file_name) or not os.path.exists(json_file_name):
+        return None
+
+    try:
+        with open(file_name, 'rb') as f:
+            magic, mtime_ns, size, checksum = HEADER.unpack(f.read(HEADER.size))
+            payload = f.read()
+    except (OSError, struct.error):
+        return None
+
+    json_stat = os.stat(json_file_name)
+    if magic != MAGIC or mtime_ns != json_stat.st_mtime_ns or size != json_stat.st_size:
+        return None
+
+    # the file was cut, or changed after writing it
+    if zlib.crc32(payload) != checksum:
+        return None
+
+    return pickle.loads(payload)
+
+# write (refresh) the snapshot
+def write_snapshot(json_file_name, records):
+    """
+    Writes the records into the snapshot of the JSON file
+
+    call it just after writing the JSON file, so the snapshot has its modification time and size.
+    it writes to a temp file first then replace the snapshot with it.
+
+    Args:
+        json_file_name (str): the JSON file path that has the same records
+        records (list): list of dictionaries (the same as the JSON file)
+
+    Returns:
+        bool: True if the snapshot was written, otherwise False
+    """
+    try:
+        payload = pickle.dumps(records, protocol=5)
+        json_stat = os.stat(json_file_name)
+        header = HEADER.pack(MAGIC, json_stat.st_mtime_ns, json_stat.st_size, zlib.crc32(payload))
+
+        file_name = snapshot_file_name(json_file_name)
+        temp_file_name = file_name + '.tmp'
+        with open(temp_file_name, 'wb') as f:
+            f.write(header)
+            f.write(payload)
+        os.replace(temp_file_name, file_name)
+        return True
+
+    except OSError:
+        return False
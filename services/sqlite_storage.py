@@ -0,0 +1,415 @@
+"""
+This sqlite_storage module: keeps the items and users inside a local SQLite file
+instead of the JSON files.
+
+It has the same functions as the storage module (load, store, update, search),
+but each update changes just one row, and the searching uses the table indexes.
+the storage module calls these functions when `STORAGE_BACKEND` is 'sqlite'.
+"""
+import os
+import json
+import sqlite3
+from models.user import User
+# importing the items classes registers them in `ITEM_CLASSES`
+from models.book import Book
+from models.magazine import Magazine
+from models.dvd import DVD
+from models.libraryitem import ITEM_CLASSES
+
+# USE CONSTANTS (THE DATABASE FILE NAME)
+DATABASE_FILE_NAME = 'data/library.db'
+
+# the tables, and the indexes
+# - item_id, user_id are primary keys so they are indexed already
+# - substr(id, 1, 8) is the display id (the first 8 characters) that the user inputs
+# - type => the stored type name (e.g, 'Book'), the search gives the same name (the old lower(type) index is dropped)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    item_id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    title TEXT NOT NULL,
+    title_lower TEXT NOT NULL,
+    author TEXT NOT NULL,
+    reserved_by TEXT,
+    available INTEGER NOT NULL,
+    copies TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_items_display_id ON items(substr(item_id, 1, 8));
+DROP INDEX IF EXISTS idx_items_type;
+CREATE INDEX IF NOT EXISTS idx_items_type_name ON items(type);
+CREATE INDEX IF NOT EXISTS idx_items_title_lower ON items(title_lower);
+
+CREATE TABLE IF NOT EXISTS users (
+    user_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    borrowed_items TEXT NOT NULL,
+    reserved_items TEXT NOT NULL,
+    waiting_items TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_users_display_id ON users(substr(user_id, 1, 8));
+CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
+"""
+
+ITEM_COLUMNS = 'item_id, type, title, title_lower, author, reserved_by, available, copies'
+USER_COLUMNS = 'user_id, name, email, borrowed_items, reserved_items, waiting_items'
+
+# one connection for all the application
+_connection = None
+
+# open the database (just the first time)
+def get_connection():
+    """
+    Returns the connection of the database file, and create the tables if they don't exist
+
+    Returns:
+        sqlite3.Connection: the opened connection
+    """
+    global _connection
+
+    if _connection is None:
+        # check_same_thread=False => the group commit thread saves the changes with the same connection
+        _connection = sqlite3.connect(DATABASE_FILE_NAME, check_same_thread=False)
+        # WAL => the readers don't wait the writer, and each commit is just appending to the WAL file
+        _connection.execute('PRAGMA journal_mode=WAL')
+        _connection.executescript(SCHEMA)
+        add_missing_columns(_connection)
+
+    return _connection
+
+# the database files made before a column was added
+def add_missing_columns(connection):
+    """Adds the columns that an older database file doesn't have (e.g, users waiting_items, items copies)"""
+    columns = {row[1] for row in connection.execute('PRAGMA table_info(users)')}
+    if 'waiting_items' not in columns:
+        with connection:
+            connection.execute("ALTER TABLE users ADD COLUMN waiting_items TEXT NOT NULL DEFAULT '{}'")
+    columns = {row[1] for row in connection.execute('PRAGMA table_info(items)')}
+    if 'copies' not in columns:
+        with connection:
+            connection.execute('ALTER TABLE items ADD COLUMN copies TEXT')
+
+# the users rows saved before the id sets (JSON lists instead of objects)
+def has_old_users():
+    """Returns true if some users rows have the old format (see `User.migrate_dict()`)"""
+    row = get_connection().execute(
+        "SELECT 1 FROM users WHERE borrowed_items LIKE '[%' OR reserved_items LIKE '[%' OR waiting_items LIKE '[%' LIMIT 1"
+    ).fetchone()
+    return row is not None
+
+# check if the database file was created before
+def database_exists():
+    """Returns true if the database file exists, otherwise false"""
+    return os.path.exists(DATABASE_FILE_NAME)
+
+# convert the table rows into instances
+def row_to_item(row):
+    """
+    Convert an items table row into an item instance (Book, Magazine, DVD)
+
+    Args:
+        row (tuple): the row values in the same order as `ITEM_COLUMNS`
+
+    Returns:
+        LibraryItem: the item instance, or None if the type is unknown
+    """
+    item_id, item_type, title, _, author, reserved_by, available, copies = row
+    item_dict = {
+        'title': title,
+        'author': author,
+        'item_id': item_id,
+        'type': item_type,
+        'reserved_by': reserved_by,
+        'available': bool(available)
+    }
+    # the items that have many copies => {'copies': ..., 'holders': ...}
+    if copies:
+        item_dict.update(json.loads(copies))
+
+    item_class = ITEM_CLASSES.get(item_type)
+    if item_class is not None:
+        return item_class.dict_to_instance(item_dict)
+
+def row_to_user(row):
+    """
+    Convert a users table row into a User instance
+
+    Args:
+        row (tuple): the row values in the same order as `USER_COLUMNS`
+
+    Returns:
+        User: the user instance
+    """
+    user_id, name, email, borrowed_items, reserved_items, waiting_items = row
+    return User.dict_to_instance({
+        'user_id': user_id,
+        'name': name,
+        'email': email,
+        'borrowed_items': json.loads(borrowed_items),
+        'reserved_items': json.loads(reserved_items),
+        'waiting_items': json.loads(waiting_items)
+    })
+
+# convert the dictionaries into table rows
+def item_dict_to_row(item_dict):
+    """Returns the item dictionary as a tuple in the same order as `ITEM_COLUMNS`"""
+    return (
+        item_dict['item_id'],
+        item_dict['type'],
+        item_dict['title'],
+        item_dict['title'].lower(),
+        item_dict['author'],
+        item_dict.get('reserved_by'),
+        1 if item_dict.get('available', True) else 0,
+        copies_to_column(item_dict)
+    )
+
+def copies_to_column(item_dict):
+    """Returns the copies of the item dictionary as JSON (the copies column), or None if it has one copy"""
+    if 'copies' not in item_dict:
+        return None
+    return json.dumps({'copies': item_dict['copies'], 'holders': item_dict.get('holders', {})})
+
+def user_dict_to_row(user_dict):
+    """Returns the user dictionary as a tuple in the same order as `USER_COLUMNS`"""
+    return (
+        user_dict['user_id'],
+        user_dict['name'],
+        user_dict['email'],
+        json.dumps(user_dict['borrowed_items']),
+        json.dumps(user_dict['reserved_items']),
+        json.dumps(user_dict.get('waiting_items', {}))
+    )
+
+# load all items from the database
+def load_items():
+    """
+    Load all items from the items table in the same order they were added
+
+    Returns:
+        list: Returns a list contains all items instances
+    """
+    rows = get_connection().execute(f'SELECT {ITEM_COLUMNS} FROM items ORDER BY rowid')
+    items = []
+    for row in rows:
+        item = row_to_item(row)
+        if item:
+            items.append(item)
+    return items
+
+# load all users from the database
+def load_users():
+    """
+    Load all users from the users table in the same order they were added
+
+    Returns:
+        list: Returns a list contains all users instances
+    """
+    rows = get_connection().execute(f'SELECT {USER_COLUMNS} FROM users ORDER BY rowid')
+    return [row_to_user(row) for row in rows]
+
+# insert or update rows (upsert) without changing their rowid (their order)
+def upsert_items(items_data):
+    """
+    Insert the items dictionaries, or update them if they already exist
+
+    Args:
+        items_data (list): list of items dictionaries
+    """
+    get_connection().executemany(
+        f'INSERT INTO items ({ITEM_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?) '
+        'ON CONFLICT(item_id) DO UPDATE SET type = excluded.type, title = excluded.title, '
+        'title_lower = excluded.title_lower, author = excluded.author, '
+        'reserved_by = excluded.reserved_by, available = excluded.available, copies = excluded.copies',
+        [item_dict_to_row(item_dict) for item_dict in items_data]
+    )
+
+def upsert_users(users_data):
+    """
+    Insert the users dictionaries, or update them if they already exist
+
+    Args:
+        users_data (list): list of users dictionaries
+    """
+    get_connection().executemany(
+        f'INSERT INTO users ({USER_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?) '
+        'ON CONFLICT(user_id) DO UPDATE SET name = excluded.name, email = excluded.email, '
+        'borrowed_items = excluded.borrowed_items, reserved_items = excluded.reserved_items, '
+        'waiting_items = excluded.waiting_items',
+        [user_dict_to_row(user_dict) for user_dict in users_data]
+    )
+
+# delete the rows that don't exist in the list anymore
+def delete_missing_rows(table, id_column, ids):
+    """
+    Deletes the rows which their ids are not in the given ids
+
+    Args:
+        table (str): the table name 'items' or 'users'
+        id_column (str): the id column name 'item_id' or 'user_id'
+        ids (set): the ids that should stay in the table
+    """
+    connection = get_connection()
+    stored_ids = [row[0] for row in connection.execute(f'SELECT {id_column} FROM {table}')]
+    removed_ids = [(stored_id,) for stored_id in stored_ids if stored_id not in ids]
+    if removed_ids:
+        connection.executemany(f'DELETE FROM {table} WHERE {id_column} = ?', removed_ids)
+
+# Stores the items list (after adding, or removing an item)
+def store_items(updated_items_list):
+    """
+    Makes the items table the same as the items list in one transaction
+
+    Args:
+        updated_items_list (list): The updating list of items
+    """
+    connection = get_connection()
+    with connection:
+        upsert_items([item.instance_to_dict() for item in updated_items_list])
+        delete_missing_rows('items', 'item_id', {item.get_item_id() for item in updated_items_list})
+
+# Stores the users list (after adding, or removing a user)
+def store_users(updated_users_list):
+    """
+    Makes the users table the same as the users list in one transaction
+
+    Args:
+        updated_users_list (list): The updating list of users
+    """
+    connection = get_connection()
+    with connection:
+        upsert_users([user.instance_to_dict() for user in updated_users_list])
+        delete_missing_rows('users', 'user_id', {user.get_user_id() for user in updated_users_list})
+
+# update just one item row
+def update_item(item):
+    """
+    Updates the availability and the reservation of one item
+
+    Args:
+        item (LibraryItem): Item to update
+
+    Returns:
+        bool: True if the item row exists and updated, otherwise False
+    """
+    item_dict = item.instance_to_dict()
+    connection = get_connection()
+    with connection:
+        cursor = connection.execute(
+            'UPDATE items SET available = ?, reserved_by = ?, copies = ? WHERE item_id = ?',
+            (1 if item_dict['available'] else 0, item_dict.get('reserved_by'), copies_to_column(item_dict), item_dict['item_id'])
+        )
+    return cursor.rowcount == 1
+
+# update just one user row
+def update_user(user):
+    """
+    Updates the borrowed, reserved, and waiting items of one user
+
+    Args:
+        user (User): User to update
+
+    Returns:
+        bool: True if the user row exists and updated, otherwise False
+    """
+    user_dict = user.instance_to_dict()
+    connection = get_connection()
+    with connection:
+        cursor = connection.execute(
+            'UPDATE users SET borrowed_items = ?, reserved_items = ?, waiting_items = ? WHERE user_id = ?',
+            (json.dumps(user_dict['borrowed_items']), json.dumps(user_dict['reserved_items']),
+             json.dumps(user_dict['waiting_items']), user_dict['user_id'])
+        )
+    return cursor.rowcount == 1
+
+# update many rows together (group commit)
+def update_records(records):
+    """
+    Updates many items and users rows in one transaction (one commit for all of them)
+
+    Args:
+        records (list): list of (kind, dictionary) => kind is 'user' or 'item'
+    """
+    items_rows = []
+    users_rows = []
+    for kind, record in records:
+        if kind == 'item':
+            items_rows.append((1 if record['available'] else 0, record.get('reserved_by'), copies_to_column(record), record['item_id']))
+        elif kind == 'user':
+            users_rows.append((json.dumps(record['borrowed_items']), json.dumps(record['reserved_items']),
+                               json.dumps(record.get('waiting_items', {})), record['user_id']))
+
+    connection = get_connection()
+    with connection:
+        connection.executemany('UPDATE items SET available = ?, reserved_by = ?, copies = ? WHERE item_id = ?', items_rows)
+        connection.executemany(
+            'UPDATE users SET borrowed_items = ?, reserved_items = ?, waiting_items = ? WHERE user_id = ?', users_rows)
+
+# Search for items based on title
+def search_by_title(search_query, limit=None):
+    """
+    Get the items that their title starts with the search_query,
+    or contains it if the search_query is longer than 2 characters
+
+    the starts with part is a range on the `title_lower` index,
+    (every title starts with 'abc' is between 'abc' and 'abc' + the biggest character)
+
+    Args:
+        search_query (str): The title (lower case) to search based on it
+        limit (int): the maximum rows to read (None => all of them)
+
+    Returns:
+        list: the matched items instances
+    """
+    # a negative LIMIT => no limit
+    limit = -1 if limit is None else limit
+    if len(search_query) > 2:
+        rows = get_connection().execute(
+            f'SELECT {ITEM_COLUMNS} FROM items WHERE instr(title_lower, ?) > 0 ORDER BY rowid LIMIT ?',
+            (search_query, limit)
+        )
+    else:
+        rows = get_connection().execute(
+            f'SELECT {ITEM_COLUMNS} FROM items WHERE title_lower >= ? AND title_lower < ? ORDER BY rowid LIMIT ?',
+            (search_query, search_query + '\U0010ffff', limit)
+        )
+    return [item for item in map(row_to_item, rows) if item]
+
+# Search for items based on type
+def search_by_type(search_query, limit=None):
+    """
+    Get the items that have the same type as the search_query using the type index
+
+    the query is changed to the stored type name first (e.g, 'dvd' => 'DVD'),
+    so the comparing is on the `type` column itself (the index), not on lower(type)
+
+    Args:
+        search_query (str): The type (lower case) to search based on it
+        limit (int): the maximum rows to read (None => all of them)
+
+    Returns:
+        list: the matched items instances
+    """
+    item_type = {name.lower(): name for name in ITEM_CLASSES}.get(search_query.lower())
+    if item_type is None:
+        return []
+
+    rows = get_connection().execute(
+        f'SELECT {ITEM_COLUMNS} FROM items WHERE type = ? ORDER BY rowid LIMIT ?',
+        (item_type, -1 if limit is None else limit)
+    )
+    return [item for item in map(row_to_item, rows) if item]
+
+# the one-shot migrator from the JSON files
+def migrate(items_data, users_data):
+    """
+    Copy the items and users dictionaries (loaded from the JSON files) into the database
+
+    Args:
+        items_data (list): list of items dictionaries
+        users_data (list): list of users dictionaries
+    """
+    connection = get_connection()
+    with connection:
+        upsert_items(items_data)
+        upsert_users(users_data)
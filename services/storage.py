@@ -4,16 +4,566 @@ load, search, or even save data from and to the JSON FILES
 """
 import os
 import json
+import atexit
+from contextlib import contextmanager, nullcontext
 from models.user import User
+# importing the items classes registers them in `ITEM_CLASSES`
 from models.book import Book
 from models.magazine import Magazine
 from models.dvd import DVD
+from models.libraryitem import ITEM_CLASSES
 from Exceptions.exceptions import FileIsEmptyError, UserNotFoundError, ItemNotFoundError
-from . import display
+from . import atomic_file, columnar_catalog, console, display, sharded_storage, snapshot, sqlite_storage
+from .persistence import GroupCommitScheduler
+from .process_lock import ProcessLock
 
 # USE CONSTANTS (THE FILES NAMES)
 ITEMS_FILE_NAME = 'data/items.json'
 USERS_FILE_NAME = 'data/users.json'
+JOURNAL_FILE_NAME = 'data/journal.log'
+
+# when the journal grows bigger than this size (in bytes)
+# fold it back into the JSON files (compaction)
+JOURNAL_COMPACT_SIZE = 1024 * 1024
+
+# how much to wait the disk when saving the files (see atomic_file module)
+#   - 'fast' => temp file + rename only
+#   - 'safe' => fsync the new file before the rename
+#   - 'paranoid' => fsync the folder after the rename, and each journal append
+DURABILITY = 'safe'
+
+# keep a binary copy (snapshot) next to each JSON file to load it faster (see snapshot module)
+USE_BINARY_SNAPSHOT = True
+
+# map the items catalog file (data/items.catalog) when starting, instead of making all items instances
+# (the instances are made just when they are needed, see columnar_catalog module)
+USE_COLUMNAR_CATALOG = True
+
+# items files bigger than this size (in bytes) are loaded record by record (see `iter_items()`)
+# instead of reading the whole file first, so the memory stays near the instances size
+STREAM_LOAD_SIZE = 256 * 1024 * 1024
+
+# how many characters the streaming loader reads each time
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# group commit: save the changed users / items together in the background (see persistence module)
+# every GROUP_COMMIT_INTERVAL seconds, or when GROUP_COMMIT_BATCH_SIZE records are waiting
+GROUP_COMMIT = True
+GROUP_COMMIT_INTERVAL = 1.0
+GROUP_COMMIT_BATCH_SIZE = 100
+
+# the scheduler (made with the first change, see `get_scheduler()`)
+_scheduler = None
+
+# where to keep the data:
+#   - 'json' => the JSON files above (with the journal)
+#   - 'sqlite' => the SQLite file `data/library.db` (see sqlite_storage module)
+#   - 'sharded' => many small JSON files in `data/shards` (see sharded_storage module)
+STORAGE_BACKEND = 'json'
+
+# several processes (e.g, two terminals running main.py) can use the same data folder together:
+# the files are locked while reading / writing them (see process_lock module),
+# each journal commit has a version, and each process reads just the new commits of the others (`refresh()`)
+SHARED_DATA = True
+# the lock file name (in the same folder of the items file)
+LOCK_FILE_NAME = '.lock'
+
+# the lock of the data folder (made the first time, see `get_process_lock()`)
+_process_lock = None
+# true if some users were loaded in the old format (see `migrate_old_users()`)
+_old_users_format = False
+# what this process read from the data folder:
+#   - library => the Library that receives the other processes changes
+#   - sequence => the last commit this process read (None => nothing loaded yet)
+#   - generation, position => the files generation, and the journal bytes read in it
+#   - versions => (kind, id) => the version (commit number) of the last saved state this process knows
+_sync = {
+    'library': None, 'sequence': None, 'generation': 0, 'position': 0, 'versions': {},
+    'refreshes': 0, 'applied': 0, 'full_reloads': 0, 'conflicts': 0
+}
+
+# the group commit scheduler
+def get_scheduler():
+    """
+    Returns the group commit scheduler (makes it the first time)
+
+    it's closed automatically when the program ends (atexit)
+    so the waiting changes are saved before exit.
+    """
+    global _scheduler
+
+    if _scheduler is None:
+        _scheduler = GroupCommitScheduler(write_records, GROUP_COMMIT_INTERVAL, GROUP_COMMIT_BATCH_SIZE)
+        atexit.register(_scheduler.close)
+    return _scheduler
+
+def hold_writes():
+    """
+    Returns a context manager that saves the waiting changes first,
+    and stops the background saving until the with block ends
+    (used before rewriting or reading the whole files)
+    """
+    if _scheduler is None:
+        return nullcontext()
+    return _scheduler.holding()
+
+# save a group of changed records
+def write_records(records):
+    """
+    Saves many changed records together (called by the group commit scheduler)
+
+    - JSON backend => one append to the journal with all the records
+    - SQLite backend => one transaction with all the rows updates
+    - sharded backend => each changed shard is written one time
+
+    Args:
+        records (list): list of (kind, dictionary) => kind is 'user' or 'item'
+
+    Returns:
+        bool: Returns true if the records were saved, otherwise false
+    """
+    try:
+        if use_sqlite():
+            with exclusive_lock():
+                sqlite_storage.update_records(records)
+            return True
+        if use_sharded():
+            with exclusive_lock():
+                sharded_storage.update_records(records, DURABILITY)
+            return True
+        return append_journal_records(records)
+
+    except Exception:
+        console.say("\n❌ Failed to save the changes...")
+        return False
+
+# save everything and stop the background saving (when exit)
+def close_storage():
+    """
+    Saves all the waiting changes and stops the group commit scheduler (blocks until done)
+
+    Returns:
+        dict: the scheduler counters (mutations, coalesced, flushes, records_written, failures), or None
+    """
+    if _scheduler is None:
+        return None
+    _scheduler.close()
+    return _scheduler.stats()
+
+def persistence_stats():
+    """Returns the group commit counters (mutations, coalesced, flushes, records_written, failures), or None"""
+    return _scheduler.stats() if _scheduler is not None else None
+
+# the lock file of the data folder (see `get_process_lock()`)
+def get_process_lock():
+    """
+    Returns the lock of the data folder (the lock file is next to the items file)
+
+    if the files names changed (e.g, a benchmark uses a temp folder) a new lock is made,
+    and this process forgets what it read from the old folder.
+    """
+    global _process_lock
+
+    lock_file_name = os.path.join(os.path.dirname(ITEMS_FILE_NAME), LOCK_FILE_NAME)
+    if _process_lock is None or _process_lock.get_file_name() != lock_file_name:
+        _process_lock = ProcessLock(lock_file_name)
+        _sync.update(library=None, sequence=None, generation=0, position=0, versions={})
+    return _process_lock
+
+def shared_lock():
+    """Returns a context manager that holds the readers lock of the data folder (if `SHARED_DATA`)"""
+    return get_process_lock().shared() if SHARED_DATA else nullcontext()
+
+def exclusive_lock():
+    """Returns a context manager that holds the writer lock of the data folder (if `SHARED_DATA`)"""
+    return get_process_lock().exclusive() if SHARED_DATA else nullcontext()
+
+def is_shared_json():
+    """Returns true if the other processes changes are read from the journal (`SHARED_DATA` and the JSON backend)"""
+    return SHARED_DATA and STORAGE_BACKEND == 'json'
+
+# remember the commit that the loaded data has
+def note_loaded():
+    """
+    Remembers the commit number of the data just loaded (call it while holding the lock)
+
+    the users and the items are loaded one after one, another process may save between them,
+    so the older commit number is kept, and `refresh()` reads the journal from it.
+    """
+    if not is_shared_json():
+        return
+
+    sequence, generation, _ = get_process_lock().read_header()
+    if _sync['sequence'] is None or sequence < _sync['sequence']:
+        _sync.update(sequence=sequence, generation=generation, position=0)
+
+# the id of a user / item dictionary
+def record_key(kind, record):
+    """Returns (kind, id) of the record => the key of `_sync['versions']`"""
+    return kind, record['item_id' if kind == 'item' else 'user_id']
+
+# read the journal records after a position
+def read_journal_entries(position):
+    """
+    Returns the journal entries written after the position (bytes), and the position of the end
+
+    the last line is ignored if it's not complete yet (no new line at its end).
+
+    Args:
+        position (int): the journal bytes that were read before
+
+    Returns:
+        tuple: (entries, position) => entries are dictionaries {"kind", "data", "version"}
+    """
+    if not os.path.exists(JOURNAL_FILE_NAME):
+        return [], 0
+
+    with open(JOURNAL_FILE_NAME, 'rb') as f:
+        f.seek(position)
+        data = f.read()
+
+    entries = []
+    for line in data.splitlines(keepends=True):
+        if not line.endswith(b'\n'):
+            break
+        try:
+            entries.append(json.loads(line))
+        except json.decoder.JSONDecodeError:
+            break
+        position += len(line)
+
+    return entries, position
+
+# read the changes of the other processes
+def catch_up():
+    """
+    Applies the commits of the other processes that this process didn't read yet
+    (call it while holding the lock)
+
+    - the same generation => read just the journal lines after the last read position
+    - a whole file was rewritten with new data (e.g, the admin added a user) => `reload_all()`
+    - the journal was just compacted => read the new journal, skip the commits that were read before
+
+    Returns:
+        set: the (kind, id) of the records that were changed by the other processes
+    """
+    if not is_shared_json():
+        return set()
+
+    library_manager = _sync['library']
+    sequence, generation, rewrite_sequence = get_process_lock().read_header()
+
+    # the data wasn't loaded using the storage module => start from now
+    if _sync['sequence'] is None:
+        _sync.update(sequence=sequence, generation=generation, position=journal_size())
+        return set()
+
+    seen = _sync['sequence']
+    if sequence == seen and generation == _sync['generation']:
+        return set()
+
+    changed = set()
+    if generation != _sync['generation'] and seen < rewrite_sequence:
+        changed = reload_all(library_manager)
+        position = journal_size()
+        _sync['full_reloads'] += 1
+    else:
+        position = _sync['position'] if generation == _sync['generation'] else 0
+        entries, position = read_journal_entries(position)
+        for entry in entries:
+            kind, record = entry['kind'], entry['data']
+            version = entry.get('version', 0)
+            key = record_key(kind, record)
+            _sync['versions'][key] = max(version, _sync['versions'].get(key, 0))
+            # the commits before the last one this process read are already in its memory
+            if version > seen:
+                changed.add(key)
+                if library_manager is not None:
+                    library_manager.apply_record(kind, record)
+
+    _sync.update(sequence=sequence, generation=generation, position=position)
+    _sync['applied'] += len(changed)
+    return changed
+
+def reload_all(library_manager):
+    """
+    Reads the whole files and the journal again, then applies just the records that changed
+    (a record changed if its saved version is newer than the version this process knows),
+    adds the new users / items, and removes the removed ones.
+
+    Args:
+        library_manager (Library): the library to update, or None (just find the changed records)
+
+    Returns:
+        set: the (kind, id) of the changed records
+    """
+    changed = set()
+    versions = _sync['versions']
+    entries, _ = read_journal_entries(0)
+
+    for kind, file_name in (('user', USERS_FILE_NAME), ('item', ITEMS_FILE_NAME)):
+        records = {}
+        for record in load_records(file_name) if os.path.exists(file_name) else []:
+            records[record_key(kind, record)] = (record.get('version', 0), record)
+        for entry in entries:
+            if entry['kind'] == kind:
+                records[record_key(kind, entry['data'])] = (entry.get('version', 0), entry['data'])
+
+        find = None
+        if library_manager is not None:
+            find = library_manager.get_user if kind == 'user' else library_manager.get_item
+
+        for key, (version, record) in records.items():
+            # the same version => this process has it (or changed it and didn't save it yet => keep its change)
+            is_newer = version > versions.get(key, 0)
+            if is_newer:
+                versions[key] = version
+            if not is_newer and (find is None or find(key[1]) is not None):
+                continue
+
+            changed.add(key)
+            if find is not None:
+                library_manager.apply_record(kind, {name: value for name, value in record.items() if name != 'version'})
+
+        if library_manager is None:
+            continue
+
+        # the removed users / items
+        if kind == 'user':
+            for user in list(library_manager.get_users()):
+                if (kind, user.get_user_id()) not in records:
+                    library_manager.remove_user(user)
+                    changed.add((kind, user.get_user_id()))
+        else:
+            for item in list(library_manager.get_items()):
+                if (kind, item.get_item_id()) not in records:
+                    library_manager.remove_item(item)
+                    changed.add((kind, item.get_item_id()))
+
+    return changed
+
+# reload just the changed records
+def refresh(library_manager):
+    """
+    Applies the changes that the other processes saved after this process loaded the data,
+    so a running program sees them without restarting (e.g, before showing the menu)
+
+    the first call also links the library to the storage module,
+    so the writes can apply the other processes changes before saving (see `append_journal_records()`).
+
+    Args:
+        library_manager (Library): the library object which has all users and items
+
+    Returns:
+        int: how many users and items changed
+    """
+    if not SHARED_DATA:
+        return 0
+
+    get_process_lock()
+    _sync['library'] = library_manager
+    try:
+        with shared_lock():
+            changed = catch_up()
+        _sync['refreshes'] += 1
+        return len(changed)
+
+    except Exception:
+        console.say("\n❌ Failed to read the other processes changes...")
+        return 0
+
+# one change between many processes
+@contextmanager
+def shared_transaction(library_manager):
+    """
+    Runs a library change as one step between the processes (e.g, borrowing an item)
+
+        with storage.shared_transaction(library_manager):
+            if library_manager.borrow_item(user, item):
+                storage.update_users(library_manager, user)
+                storage.update_items(library_manager, item)
+
+    1. holds the writer lock (the other processes wait)
+    2. applies the other processes changes, so the change checks the latest data
+       (two processes can't borrow the same item)
+    3. the with block changes the library and saves it
+    4. the group commit changes are saved before releasing the lock
+
+    Args:
+        library_manager (Library): the library object which has all users and items
+    """
+    if not SHARED_DATA:
+        yield
+        return
+
+    get_process_lock()
+    _sync['library'] = library_manager
+    scheduler = get_scheduler() if GROUP_COMMIT else None
+
+    with (scheduler.holding() if scheduler is not None else nullcontext()) as flush:
+        with exclusive_lock():
+            catch_up()
+            yield
+            if flush is not None:
+                flush()
+
+# rewriting a whole file between the processes
+def check_fresh(kind_name):
+    """
+    Applies the other processes changes before rewriting a whole file (call it while holding the writer lock)
+
+    Raises:
+        IOError: if another process changed the data, and no library is linked to apply it (see `refresh()`)
+    """
+    if is_shared_json() and catch_up() and _sync['library'] is None:
+        raise IOError(f"\n❌ Another process changed the {kind_name}, reload them first...")
+
+def add_versions(kind, records):
+    """Adds the known version to each dictionary that has one, before writing them to the file"""
+    versions = _sync['versions']
+    if not is_shared_json() or not versions:
+        return
+    for record in records:
+        version = versions.get(record_key(kind, record))
+        if version:
+            record['version'] = version
+
+def note_rewrite(compacting):
+    """
+    After rewriting a whole file (holding the writer lock): a new files generation in the lock file header
+
+    the processes that didn't read all the commits before the rewrite reload everything
+    (their missing journal lines are inside the file now), the others read just the new journal.
+    a rewrite with new data (not compacting) is a commit too, so all the other processes reload everything.
+    """
+    if not is_shared_json():
+        return
+
+    process_lock = get_process_lock()
+    sequence, generation, _ = process_lock.read_header()
+    if not compacting:
+        sequence += 1
+    process_lock.write_header(sequence, generation + 1, sequence)
+    _sync.update(sequence=sequence, generation=generation + 1, position=journal_size())
+
+def shared_stats():
+    """Returns the counters of reading the other processes changes (refreshes, applied, full_reloads, conflicts)"""
+    return {name: _sync[name] for name in ('refreshes', 'applied', 'full_reloads', 'conflicts')}
+
+# check if we should use the SQLite backend
+def use_sqlite():
+    """
+    Returns true if the storage backend is 'sqlite'
+
+    the first time the backend is used and the database file doesn't exist yet,
+    it will migrate the JSON files into it using `migrate_json_to_sqlite()`.
+    """
+    if STORAGE_BACKEND != 'sqlite':
+        return False
+
+    if not sqlite_storage.database_exists():
+        migrate_json_to_sqlite()
+    return True
+
+# the one-shot migrator (JSON files => SQLite)
+def migrate_json_to_sqlite():
+    """
+    Copy all items and users from the JSON files (and the journal) into the SQLite database
+
+    Returns:
+        bool: Returns true if the process done, otherwise False
+    """
+    try:
+        sqlite_storage.migrate(*read_json_files())
+        return True
+
+    except json.decoder.JSONDecodeError:
+        console.say('\n❌ JSON files are not formatted correctly')
+        return False
+
+    except Exception:
+        console.say("\n❌ Failed to migrate the JSON files...")
+        return False
+
+# check if we should use the sharded backend
+def use_sharded():
+    """
+    Returns true if the storage backend is 'sharded'
+
+    the first time the backend is used and the shards don't exist yet,
+    it will convert the JSON files into shards using `migrate_json_to_shards()`.
+    """
+    if STORAGE_BACKEND != 'sharded':
+        return False
+
+    if not sharded_storage.layout_exists():
+        migrate_json_to_shards()
+    return True
+
+# the one-shot converter (JSON files => shards)
+def migrate_json_to_shards():
+    """
+    Split all items and users from the JSON files (and the journal) into the shards files
+
+    Returns:
+        bool: Returns true if the process done, otherwise False
+    """
+    try:
+        sharded_storage.migrate(*read_json_files(), DURABILITY)
+        return True
+
+    except json.decoder.JSONDecodeError:
+        console.say('\n❌ JSON files are not formatted correctly')
+        return False
+
+    except Exception:
+        console.say("\n❌ Failed to convert the JSON files into shards...")
+        return False
+
+# the one-shot migrator (the users saved before the id sets => the id sets format)
+def migrate_old_users(users):
+    """
+    Stores all users again if some of them were saved in the old format
+    (lists of the items dictionaries with their titles and authors, see `User.migrate_dict()`)
+
+    the users are already converted while loading them, this writes them back in the new format
+    (a smaller users file, and the next loading doesn't convert them again).
+
+    Args:
+        users (list): list of all users instances
+
+    Returns:
+        bool: Returns true if the users were stored again, otherwise false
+    """
+    global _old_users_format
+
+    is_old = sqlite_storage.has_old_users() if use_sqlite() else _old_users_format
+    if not is_old:
+        return False
+
+    _old_users_format = False
+    # the same users as the file + the journal => the other processes don't need to reload them
+    return store_users(users, compacting=True)
+
+# read the JSON files for migrating them
+def read_json_files():
+    """
+    Returns the items and users dictionaries from the JSON files with the journal changes applied
+
+    Returns:
+        tuple: (items_data, users_data) => ([] for a missing file)
+    """
+    items_data, users_data = [], []
+
+    if os.path.exists(ITEMS_FILE_NAME):
+        with open(ITEMS_FILE_NAME, 'r') as f:
+            items_data = replay_journal('item', json.load(f))
+
+    if os.path.exists(USERS_FILE_NAME):
+        with open(USERS_FILE_NAME, 'r') as f:
+            users_data = replay_journal('user', json.load(f))
+
+    return items_data, users_data
 
 # load all items from the JSON File
 def load_items():
@@ -27,46 +577,49 @@ def load_items():
         list : Returns a list contains all items instances
     """
     try:
+        # SQLite backend => one query ordered by the rowid
+        if use_sqlite():
+            with hold_writes():
+                return sqlite_storage.load_items()
+
+        # sharded backend => read the shards together, then convert like the JSON file
+        if use_sharded():
+            with hold_writes():
+                items_data = sharded_storage.load('item')
+            return hydrate_items(items_data)
+
         # if the file doesn't exist make one with []
         if not os.path.exists(ITEMS_FILE_NAME):
             # if the file doesn't Exist IOError
             raise IOError("\n❌ Warning: Items File Dosen't Exist...")
         
-        with open(ITEMS_FILE_NAME, 'r') as f:
-            items = []
-            items_data = json.load(f)
-            if not items_data:  # Check if file is empty
-                raise FileIsEmptyError("\n❌ Warning: Items file is empty...")
-
-            # loop over items dictionaries and convert them back into
-            # instances using `dict_to_instance` `@classmethod` why!? => to use the item methods
-            for item in items_data:
-                item_type = item['type']
-
-                if item_type == 'Book':
-                    items.append(Book.dict_to_instance(item))
-                elif item_type == 'Magazine':
-                    items.append(Magazine.dict_to_instance(item))
-                elif item_type == 'DVD':
-                    items.append(DVD.dict_to_instance(item))
+        # save the waiting changes first, to load the latest data
+        # (the readers lock => another process can't rewrite the files while reading them)
+        with hold_writes(), shared_lock():
+            items_data = load_records(ITEMS_FILE_NAME)
+            # apply the changes that happened after the last snapshot
+            items_data = replay_journal('item', items_data)
+            note_loaded()
+        if not items_data:  # Check if file is empty
+            raise FileIsEmptyError("\n❌ Warning: Items file is empty...")
 
-            # return the list of items instances
-            return items
+        # convert the items dictionaries back into instances why!? => to use the item methods
+        return hydrate_items(items_data)
 
     except IOError as e:
-        print(e)
+        console.say(e)
         return []
     
     except FileIsEmptyError as e:
-        print(e)
+        console.say(e)
         return []
     
     except json.decoder.JSONDecodeError as e:
-        print('\n❌ Items file is not formatted correctly')
+        console.say('\n❌ Items file is not formatted correctly')
         return []
 
     except Exception:
-        print("\n❌ Failed to read items file...")
+        console.say("\n❌ Failed to read items file...")
         return []
 
 # load all users from the JSON File
@@ -81,98 +634,346 @@ def load_users():
         list : Returns a list contains all users instances
     """
     try:
+        # SQLite backend => one query ordered by the rowid
+        if use_sqlite():
+            with hold_writes():
+                return sqlite_storage.load_users()
+
+        # sharded backend => read the shards together, then convert like the JSON file
+        if use_sharded():
+            with hold_writes():
+                users_data = sharded_storage.load('user')
+            return hydrate_users(users_data)
+
         # if the file doesn't Exist IOError
         if not os.path.exists(USERS_FILE_NAME):
             raise IOError("\n❌ Warning: Users File Dosen't Exist...")
 
-        with open(USERS_FILE_NAME, 'r') as f:
-            users = []
-            users_data = json.load(f)
-            if not users_data:
-                raise FileIsEmptyError("\n❌ Warning: Users file is empty...")
-
-            # loop over users dictionaries and convert them back into
-            # instances using `dict_to_instance()` `@classmethod` why!? => to use the user methods
-            for user in users_data:
-                user = User.dict_to_instance(user)
-                users.append(user)
-
-            # return the list of items instances
-            return users
+        # save the waiting changes first, to load the latest data
+        # (the readers lock => another process can't rewrite the files while reading them)
+        with hold_writes(), shared_lock():
+            users_data = load_records(USERS_FILE_NAME)
+            # apply the changes that happened after the last snapshot
+            users_data = replay_journal('user', users_data)
+            note_loaded()
+        if not users_data:
+            raise FileIsEmptyError("\n❌ Warning: Users file is empty...")
+
+        # convert the users dictionaries back into instances why!? => to use the user methods
+        return hydrate_users(users_data)
     
     except IOError as e:
-        print(e)
+        console.say(e)
         return []
     
     except FileIsEmptyError as e:
-        print(e)
+        console.say(e)
         return []
     
     except json.decoder.JSONDecodeError as e:
-        print('\n❌ Users file is not formatted correctly')
+        console.say('\n❌ Users file is not formatted correctly')
         return []
 
     except Exception:
-        print("\n❌ Failed to read users file...")
+        console.say("\n❌ Failed to read users file...")
         return []
 
+# the items for the Library when starting
+def open_items():
+    """
+    Returns the items for the `Library` constructor
+
+    - the mapped catalog (`MappedItems`) if `USE_COLUMNAR_CATALOG` is true and the backend is 'json',
+      the catalog is written from the items file the first time (or after the file changed outside the app)
+    - otherwise the `iter_items()` generator
+
+    Returns:
+        MappedItems | generator: the items
+    """
+    if not USE_COLUMNAR_CATALOG or STORAGE_BACKEND != 'json' or not os.path.exists(ITEMS_FILE_NAME):
+        return iter_items()
+
+    # save the waiting changes first, to load the latest data
+    with hold_writes(), shared_lock():
+        catalog = columnar_catalog.open_catalog(ITEMS_FILE_NAME)
+
+        # no fresh catalog => make it from the items file (just one time)
+        if catalog is None:
+            try:
+                records = load_records(ITEMS_FILE_NAME)
+            except (OSError, json.decoder.JSONDecodeError):
+                return iter_items()
+
+            if columnar_catalog.write_catalog(ITEMS_FILE_NAME, records):
+                catalog = columnar_catalog.open_catalog(ITEMS_FILE_NAME)
+
+        # the ids are not uuids, or the catalog can't be written => the normal loading
+        if catalog is None:
+            return iter_items()
+
+        # apply the changes that happened after the last store
+        catalog.apply_records(read_journal('item'))
+        note_loaded()
+
+    if not len(catalog):
+        console.say("\n❌ Warning: Items file is empty...")
+    return catalog
+
+# load the items one by one (generator)
+def iter_items():
+    """
+    Yields the items instances one by one (the `Library` constructor reads it directly)
+
+    a big items file (bigger than `STREAM_LOAD_SIZE`) is read record by record
+    using `iter_json_array()`, so the whole text and the whole list of dictionaries
+    are never in the memory together with the instances.
+    the smaller files, and the other backends use `load_items()` (the snapshot is faster).
+
+    the journal changes are applied while reading:
+        - the changed items are replaced in their place
+        - the new items are yielded at the end
+
+    Yields:
+        LibraryItem: the items instances in the same order as the items file
+    """
+    if STORAGE_BACKEND != 'json' or not os.path.exists(ITEMS_FILE_NAME) \
+            or os.path.getsize(ITEMS_FILE_NAME) < STREAM_LOAD_SIZE:
+        yield from load_items()
+        return
+
+    try:
+        # save the waiting changes first, to load the latest data
+        with hold_writes(), shared_lock():
+            # the journal is small (it's compacted when it's bigger than JOURNAL_COMPACT_SIZE)
+            changes = {record['item_id']: record for record in read_journal('item')}
+            note_loaded()
+            versions = _sync['versions']
+
+            count = 0
+            for item_dict in iter_json_array(ITEMS_FILE_NAME):
+                if 'version' in item_dict:
+                    versions[('item', item_dict['item_id'])] = item_dict['version']
+                item_dict = changes.pop(item_dict['item_id'], item_dict)
+                item_class = ITEM_CLASSES.get(item_dict['type'])
+                if item_class is not None:
+                    count += 1
+                    yield item_class.dict_to_instance(item_dict)
+
+            # the items that were added after the last store
+            for item_dict in changes.values():
+                item_class = ITEM_CLASSES.get(item_dict['type'])
+                if item_class is not None:
+                    count += 1
+                    yield item_class.dict_to_instance(item_dict)
+
+        if not count:
+            raise FileIsEmptyError("\n❌ Warning: Items file is empty...")
+
+    except FileIsEmptyError as e:
+        console.say(e)
+
+    except (json.decoder.JSONDecodeError, ValueError):
+        console.say('\n❌ Items file is not formatted correctly')
+
+# read a JSON array one record at a time
+def iter_json_array(file_name, chunk_size=None):
+    """
+    Yields the values inside the top level JSON array of the file one by one
+
+    it reads the file in chunks, and decodes each value using `JSONDecoder.raw_decode()`
+    as soon as it's complete inside the buffer, then removes it from the buffer.
+    so the memory has just one chunk and one value at a time, not the whole file.
+
+    Args:
+        file_name (str): the JSON file path (its content must be an array => [...])
+        chunk_size (int): how many characters to read each time (default `STREAM_CHUNK_SIZE`)
+
+    Yields:
+        the array values (dictionaries for the items and users files)
+
+    Raises:
+        ValueError: if the file is not a JSON array
+    """
+    decoder = json.JSONDecoder()
+    chunk_size = chunk_size or STREAM_CHUNK_SIZE
+
+    with open(file_name, 'r') as f:
+        buffer = ''
+        position = 0
+        started = False
+        end_of_file = False
+
+        while True:
+            # skip the spaces, and the commas between the values
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+
+            # need more text
+            if position == len(buffer):
+                if end_of_file:
+                    raise ValueError('the JSON array is not closed')
+                chunk = f.read(chunk_size)
+                buffer = buffer[position:] + chunk
+                position = 0
+                end_of_file = not chunk
+                continue
+
+            if not started:
+                if buffer[position] != '[':
+                    raise ValueError('the JSON file is not an array')
+                started = True
+                position += 1
+                continue
+
+            if buffer[position] == ']':
+                return
+
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+                # a number at the end of the buffer may continue in the next chunk
+                if end == len(buffer) and not end_of_file:
+                    raise json.decoder.JSONDecodeError('the value may be cut', buffer, end)
+            except json.decoder.JSONDecodeError:
+                # the value is not complete yet => read more text and try again
+                if end_of_file:
+                    raise
+                chunk = f.read(chunk_size)
+                buffer = buffer[position:] + chunk
+                position = 0
+                end_of_file = not chunk
+                continue
+
+            position = end
+            yield value
+
+# read the records (dictionaries) of a JSON file
+def load_records(file_name):
+    """
+    Returns the list of dictionaries inside the JSON file
+
+    reads the binary snapshot if it's fresh (faster than parsing the JSON text),
+    otherwise reads the JSON file and refresh the snapshot for the next time.
+
+    Args:
+        file_name (str): the JSON file path (e.g, `ITEMS_FILE_NAME`)
+
+    Returns:
+        list: list of dictionaries
+    """
+    if USE_BINARY_SNAPSHOT:
+        records = snapshot.read_snapshot(file_name)
+        if records is not None:
+            return records
+
+    with open(file_name, 'r') as f:
+        records = json.load(f)
+
+    if USE_BINARY_SNAPSHOT:
+        snapshot.write_snapshot(file_name, records)
+    return records
+
+# the bulk converting (dictionaries => instances)
+def hydrate_items(items_data):
+    """
+    Converts all the items dictionaries into instances in one loop
+
+    each dictionary goes to its class using the `ITEM_CLASSES` registry (type => class)
+    not if/elif for each item, and `dict_to_instance()` doesn't call the constructor.
+    the unknown types are skipped.
+
+    Args:
+        items_data (list): list of items dictionaries
+
+    Returns:
+        list: list of items instances
+    """
+    items = []
+    append = items.append
+    # the saved versions (the other processes changes are compared with them, see `reload_all()`)
+    versions = _sync['versions']
+    for item_dict in items_data:
+        if 'version' in item_dict:
+            versions[('item', item_dict['item_id'])] = item_dict['version']
+        item_class = ITEM_CLASSES.get(item_dict['type'])
+        if item_class is not None:
+            append(item_class.dict_to_instance(item_dict))
+    return items
+
+def hydrate_users(users_data):
+    """
+    Converts all the users dictionaries into instances in one loop
+
+    Args:
+        users_data (list): list of users dictionaries
+
+    Returns:
+        list: list of users instances
+    """
+    global _old_users_format
+
+    versions = _sync['versions']
+    for user_dict in users_data:
+        if 'version' in user_dict:
+            versions[('user', user_dict['user_id'])] = user_dict['version']
+        if User.is_old_format(user_dict):
+            _old_users_format = True
+    return [User.dict_to_instance(user_dict) for user_dict in users_data]
+
 # Search for items based on title
-def search_by_title(search_query, items, users):
+def search_by_title(search_query, library_manager):
     """
     Get the items that has the same title as given
 
-    Receive a search_query => the title to search about, and items list => to search on it about similar results,
-    then add the matchs items to search_result list to display it later using `display_search_result()` function
+    Receive a search_query => the title to search about, and the library => to search about similar results
+    using its trigram title index (`search_by_title()` library method),
+    then display the matchs items later using `display_search_result()` function
 
     Args:
         search_query (str): The title to search based on it
-        items (list): list of all items
-        users (list): list of all users
+        library_manager (Library): the library object which has the title index
     """
-    search_result = []
+    # SQLite backend => the query uses the title index
+    if use_sqlite():
+        display.display_search_result(search_query, sqlite_storage.search_by_title(search_query), library_manager)
+        return
+
+    # the title index gives the same result as looping over all items and checking
+    # `startswith()`, or `in` (if the query longer than 2 characters), without the looping
+    search_result = library_manager.search_by_title(search_query)
 
-    # loop over items and add the matches items to the search_result
-    # I used `startswith()` not == to can found more results
-    for item in items:
-        item_title = item.get_title().lower()
-        # if user enter just the start of the title will works
-        if item_title.startswith(search_query):
-            search_result.append(item)
-        
-        # and if enter any word inside the title also will work
-        elif len(search_query) > 2 and search_query in item_title:
-            search_result.append(item)
-        
     # display the search result
-    display.display_search_result(search_query, search_result, users)
+    display.display_search_result(search_query, search_result, library_manager)
 
 # Search for items based on type
-def search_by_type(search_query, items, users):
+def search_by_type(search_query, library_manager):
     """
     Get the items that has the same type as given
 
-    Receive a search_query => the type to search about, and items list => to search on it about similar results,
-    then add the matchs items to search_result list to display it later using `display_search_result()` function
+    Receive a search_query => the type to search about, and the library => to get the items of this type
+    from its type buckets, then display them using `display_search_result()` function
 
     Args:
         search_query (str): The type to search based on it
-        items (list): list of all items
-        users (list): list of all users
+        library_manager (Library): the library object which has all the items
 
     """
+    # SQLite backend => the query uses the type index
+    if use_sqlite():
+        display.display_search_result(search_query, sqlite_storage.search_by_type(search_query), library_manager)
+        return
+
     search_result = []
-    
-    # loop over items_data and add the matches items to the search_result
-    for item in items:
-        item_type = item.get_type().lower()
-        if item_type == search_query:
-            search_result.append(item)
+
+    # the library keeps a bucket for each type, so just get the bucket of this type
+    for item_type in library_manager.get_types():
+        if item_type.lower() == search_query:
+            search_result = library_manager.get_items_by_type(item_type)
 
     # display the search result
-    display.display_search_result(search_query, search_result, users)
+    display.display_search_result(search_query, search_result, library_manager)
 
 # Stores the users list after updating it
-def store_users(updated_users_list):
+def store_users(updated_users_list, compacting=False):
     """
     stores the updating users list into the JSON file
 
@@ -182,44 +983,73 @@ def store_users(updated_users_list):
 
     Args:
         updated_users_data (list): The updating list of useers to store it
+        compacting (bool): true if the users are the same as the file + the journal (just folding the journal),
+            so the other processes that read the journal don't need to reload the whole file
 
     Returns:
         bool: Returns true if the process done, otherwise False
     """
-    try:
-        # make a list to store instances after convert them
-        users = []
+    # save the waiting changes first, and stop the background saving while rewriting the file
+    # (the writer lock => the other processes wait until the file is rewritten)
+    with hold_writes(), exclusive_lock():
+        try:
+            # SQLite backend => upsert the users rows, and delete the removed ones
+            if use_sqlite():
+                sqlite_storage.store_users(updated_users_list)
+                return True
 
-        # loop over the updated users list and convert them
-        # each user instance to a dictionary contains it's information
-        for user in updated_users_list:
-            user_dict = user.instance_to_dict()
-            users.append(user_dict)
+            # sharded backend => rewrite just the shards that changed
+            if use_sharded():
+                sharded_storage.store('user', [user.instance_to_dict() for user in updated_users_list], DURABILITY)
+                return True
 
-        if not os.path.exists(USERS_FILE_NAME):
-            # if the file doesn't Exist IOError
-            raise IOError("\n❌ Warning: Users File Dosen't Exist...")
+            # the other processes changes enter the users list first (not replaced by an old copy)
+            check_fresh('users')
+
+            # make a list to store instances after convert them
+            users = []
+
+            # loop over the updated users list and convert them
+            # each user instance to a dictionary contains it's information
+            for user in updated_users_list:
+                user_dict = user.instance_to_dict()
+                users.append(user_dict)
+
+            # keep the versions in the file (they are read again if the journal is compacted)
+            add_versions('user', users)
+
+            if not os.path.exists(USERS_FILE_NAME):
+                # if the file doesn't Exist IOError
+                raise IOError("\n❌ Warning: Users File Dosen't Exist...")
         
-        # save the users list of dictionaries
-        # indent=4 to write the objects in the JSON file in nice formatting
-        with open(USERS_FILE_NAME, 'w') as f:
-            json.dump(users, f, indent=4)
+            # save the users list of dictionaries
+            # indent=4 to write the objects in the JSON file in nice formatting
+            # write a temp file then rename it, so a crash never leaves a half file
+            atomic_file.write_atomic(USERS_FILE_NAME, json.dumps(users, indent=4), DURABILITY)
+
+            # refresh the binary snapshot to be the same as the new JSON file
+            if USE_BINARY_SNAPSHOT:
+                snapshot.write_snapshot(USERS_FILE_NAME, users)
+
+            # the users file has the latest state now, so the users journal records are not needed
+            drop_journal_records('user')
+            note_rewrite(compacting)
             return True
 
-    except IOError as e:
-        print(e)
-        return False
+        except IOError as e:
+            console.say(e)
+            return False
     
-    except json.decoder.JSONDecodeError:
-        print('\n❌ Users file is not formatted correctly')
-        return False
+        except json.decoder.JSONDecodeError:
+            console.say('\n❌ Users file is not formatted correctly')
+            return False
 
-    except Exception:
-        print("\n❌ Failed to save users file...")
-        return False
+        except Exception:
+            console.say("\n❌ Failed to save users file...")
+            return False
 
 # Stores the items list after updating it
-def store_items(updated_items_list):
+def store_items(updated_items_list, compacting=False):
     """
     stores the updating items list into the JSON file
 
@@ -229,130 +1059,475 @@ def store_items(updated_items_list):
 
     Args:
         updated_items_data (list): The updating list of items
+        compacting (bool): true if the items are the same as the file + the journal (just folding the journal),
+            so the other processes that read the journal don't need to reload the whole file
 
     Returns:
         bool: Returns true if the process done, otherwise false
     """
-    try:
-        # make a list to store instances after convert them
-        items = []
+    # save the waiting changes first, and stop the background saving while rewriting the file
+    # (the writer lock => the other processes wait until the file is rewritten)
+    with hold_writes(), exclusive_lock():
+        try:
+            # SQLite backend => upsert the items rows, and delete the removed ones
+            if use_sqlite():
+                sqlite_storage.store_items(updated_items_list)
+                return True
 
-        # loop over the updated items list and convert
-        # each item instance to a dictionary contains it's information
-        for item in updated_items_list:
-            item_dict = item.instance_to_dict()
-            items.append(item_dict)
+            # sharded backend => rewrite just the shards that changed
+            if use_sharded():
+                sharded_storage.store('item', [item.instance_to_dict() for item in updated_items_list], DURABILITY)
+                return True
 
-        if not os.path.exists(ITEMS_FILE_NAME):
-                # if the file doesn't Exist IOError
-                raise IOError("\n❌ Warning: Items File Dosen't Exist...")
+            # the other processes changes enter the items list first (not replaced by an old copy)
+            check_fresh('items')
+
+            # make a list to store instances after convert them
+            items = []
+
+            # the mapped catalog => the not changed items are read from it directly (no instances)
+            if isinstance(updated_items_list, columnar_catalog.MappedItems):
+                items = list(updated_items_list.iter_records())
+            else:
+                # loop over the updated items list and convert
+                # each item instance to a dictionary contains it's information
+                for item in updated_items_list:
+                    item_dict = item.instance_to_dict()
+                    items.append(item_dict)
+
+            # keep the versions in the file (they are read again if the journal is compacted)
+            add_versions('item', items)
+
+            if not os.path.exists(ITEMS_FILE_NAME):
+                    # if the file doesn't Exist IOError
+                    raise IOError("\n❌ Warning: Items File Dosen't Exist...")
         
-        # save the items list of dictionaries
-        with open(ITEMS_FILE_NAME, 'w') as f:
-            json.dump(items, f, indent=4)
+            # save the items list of dictionaries
+            # write a temp file then rename it, so a crash never leaves a half file
+            atomic_file.write_atomic(ITEMS_FILE_NAME, json.dumps(items, indent=4), DURABILITY)
+
+            # refresh the binary snapshot to be the same as the new JSON file
+            if USE_BINARY_SNAPSHOT:
+                snapshot.write_snapshot(ITEMS_FILE_NAME, items)
+
+            # refresh the mapped catalog too (the app keeps using the old mapping until the next start)
+            if USE_COLUMNAR_CATALOG:
+                columnar_catalog.write_catalog(ITEMS_FILE_NAME, items)
+
+            # the items file has the latest state now, so the items journal records are not needed
+            drop_journal_records('item')
+            note_rewrite(compacting)
             return True
 
-    except IOError as e:
-        print(e)
-        return False
+        except IOError as e:
+            console.say(e)
+            return False
     
-    except json.decoder.JSONDecodeError:
-        print('\n❌ Items file is not formatted correctly')
-        return False
+        except json.decoder.JSONDecodeError:
+            console.say('\n❌ Items file is not formatted correctly')
+            return False
 
-    except Exception:
-        print("\n❌ Failed to save items file...")
-        return False
+        except Exception:
+            console.say("\n❌ Failed to save items file...")
+            return False
 
 # update a user value
-def update_users(users, user):
+def update_users(library_manager, user):
     """
     Updates a user in the users list and save it to the users file
 
     to ensure all data will keep sync
 
     Args:
-        users (list): List of all users
+        library_manager (Library): the library object which has all users
         user (User): User to update
 
     Returns:
         bool: true if update successful, otherwise false
     """
     try:
-        # first we need to find the user in the list
-        user_found = False
-        # looping over users using enumerate to access the index and the value for each user
-        for index, u in enumerate(users):
-            # if the user has the same id with the user i want to update
-            if u.get_user_id() == user.get_user_id():
-                # update the user by reassign the new value
-                users[index] = user
-                user_found = True
-                break
-
-        # if we didn't find the user, raise an error
-        if not user_found:
+        # first we need to find the user using the library users index (no looping)
+        if library_manager.get_user(user.get_user_id()) is not user:
             raise UserNotFoundError(f"User {user.get_name()} not found in users list")
 
-        # try to save the changes to the file
-        if not store_users(users):
+        # group commit => mark the user as changed, the scheduler saves it later with the other changes
+        if GROUP_COMMIT:
+            get_scheduler().mark('user', user.get_user_id(), user)
+
+        # SQLite backend => update just the user row
+        elif use_sqlite():
+            if not sqlite_storage.update_user(user):
+                raise UserNotFoundError(f"User {user.get_name()} not found in users table")
+
+        # sharded backend => rewrite just the shard of this user
+        elif use_sharded():
+            if not sharded_storage.update_records([('user', user.instance_to_dict())], DURABILITY):
+                raise UserNotFoundError(f"User {user.get_name()} not found in users shards")
+
+        # append just this user to the journal instead of rewriting the whole users file
+        elif not append_journal('user', user.instance_to_dict()):
+            raise IOError("Failed to save user changes to file")
+
+        # fold the journal back into the JSON files if it became too big
+        # (both files => the journal may be full of the items records)
+        if journal_size() >= JOURNAL_COMPACT_SIZE and not compact_journal(library_manager.get_users(), library_manager.get_items()):
             raise IOError("Failed to save user changes to file")
 
         return True
 
     except UserNotFoundError as e:
-        print(e)
+        console.say(e)
         return False
 
     except Exception:
-        print("❌ Failed to update user...")
+        console.say("❌ Failed to update user...")
         return False
 
 # update an item value
-def update_items(items, item):
+def update_items(library_manager, item):
     """
     Updates an item in the items list and saves it to the items file
 
     Args:
-        items (list): List of all items
+        library_manager (Library): the library object which has all items
         item (LibraryItem): Item to update
 
     Returns:
         bool: True if update successful, False otherwise
     """
     try:
-        # find the item in the list
-        item_found = False
-        # loop over all items list
-        for index, i in enumerate(items):
-            # if the item which need to updated has the same id of the one in the list
-            if i.get_item_id() == item.get_item_id():
-                # Update the item's with the new availability status
-                i.set_available(item.check_availability())
-                
-                # if the item is not reserved, clear the reserved_by_id
-                # make this if to handle magazine case
-                # so first will check if the item has these two methods
-                if hasattr(i, 'clear_reserved') and hasattr(item, 'get_reserved_by'):
-                    if item.get_reserved_by() is None:
-                        i.clear_reserved()
-                item_found = True
-                break
-
-        # if didn't find the item, raise an error
-        if not item_found:
+        # find the item using the library items index (no looping)
+        if library_manager.get_item(item.get_item_id()) is not item:
             raise ItemNotFoundError(f"Item {item.get_title()} not found in items list")
 
-        # try to save the changes to the file
-        if not store_items(items):
+        # group commit => mark the item as changed, the scheduler saves it later with the other changes
+        if GROUP_COMMIT:
+            get_scheduler().mark('item', item.get_item_id(), item)
+
+        # SQLite backend => update just the item row
+        elif use_sqlite():
+            if not sqlite_storage.update_item(item):
+                raise ItemNotFoundError(f"Item {item.get_title()} not found in items table")
+
+        # sharded backend => rewrite just the shard of this item
+        elif use_sharded():
+            if not sharded_storage.update_records([('item', item.instance_to_dict())], DURABILITY):
+                raise ItemNotFoundError(f"Item {item.get_title()} not found in items shards")
+
+        # append just this item to the journal instead of rewriting the whole items file
+        elif not append_journal('item', item.instance_to_dict()):
+            raise IOError("❌ Failed to save item changes to file...")
+
+        # fold the journal back into the JSON files if it became too big
+        # (both files => the journal may be full of the users records)
+        if journal_size() >= JOURNAL_COMPACT_SIZE and not compact_journal(library_manager.get_users(), library_manager.get_items()):
             raise IOError("❌ Failed to save item changes to file...")
 
         return True
     
     except ItemNotFoundError as e:
-        print(e)
+        console.say(e)
         return False
     
     except Exception:
-        print("❌ Failed to update items...")
-        return False
\ No newline at end of file
+        console.say("❌ Failed to update items...")
+        return False
+
+# update many users and items together
+def update_many(library_manager, users=(), items=()):
+    """
+    Saves many changed users and items together (e.g, after `Library.borrow_many()`)
+
+    instead of saving each one alone, they are saved in one write:
+    one group commit mark, one SQLite transaction, one write for each changed shard,
+    or one append to the journal.
+
+    Args:
+        library_manager (Library): the library object which has all users and items
+        users (list): the changed users
+        items (list): the changed items
+
+    Returns:
+        bool: true if all of them were saved, otherwise false
+    """
+    try:
+        for user in users:
+            if library_manager.get_user(user.get_user_id()) is not user:
+                raise UserNotFoundError(f"User {user.get_name()} not found in users list")
+        for item in items:
+            if library_manager.get_item(item.get_item_id()) is not item:
+                raise ItemNotFoundError(f"Item {item.get_title()} not found in items list")
+
+        # group commit => mark all of them together, so they are saved in the same flush
+        if GROUP_COMMIT:
+            get_scheduler().mark_many(
+                [('user', user.get_user_id(), user) for user in users] +
+                [('item', item.get_item_id(), item) for item in items]
+            )
+
+        elif not write_records(
+            [('user', user.instance_to_dict()) for user in users] +
+            [('item', item.instance_to_dict()) for item in items]
+        ):
+            raise IOError("❌ Failed to save the changes to file...")
+
+        # fold the journal back into the JSON files if it became too big
+        if journal_size() >= JOURNAL_COMPACT_SIZE and not compact_journal(library_manager.get_users(), library_manager.get_items()):
+            raise IOError("❌ Failed to save the changes to file...")
+
+        return True
+
+    except (UserNotFoundError, ItemNotFoundError) as e:
+        console.say(e)
+        return False
+
+    except Exception:
+        console.say("❌ Failed to update the users and items...")
+        return False
+
+# Journal: append one record for each change instead of rewriting the whole file
+def append_journal(kind, record):
+    """
+    Appends one compact record to the end of the journal file
+
+    Each line in the journal is one JSON object like => {"kind":"item","data":{...},"version":7}
+    so one borrow / return writes a few hundred bytes, not the whole catalog.
+
+    Args:
+        kind (str): the kind of the record 'item' or 'user'
+        record (dict): the item or user as a dictionary using `instance_to_dict()`
+
+    Returns:
+        bool: Returns true if the record was written, otherwise false
+    """
+    return append_journal_records([(kind, record)])
+
+def append_journal_records(records):
+    """
+    Appends many records to the end of the journal file in one write
+
+    with `SHARED_DATA` it's one commit: it holds the writer lock, reads the other processes commits,
+    then writes the records with the new version (the commit number) in each line.
+
+    Args:
+        records (list): list of (kind, dictionary) => kind is 'item' or 'user'
+
+    Returns:
+        bool: Returns true if the records were written, otherwise false
+    """
+    try:
+        with exclusive_lock():
+            # a half written last line (a crash) => remove it, otherwise the new records are written after it
+            repair_journal()
+
+            version = None
+            if is_shared_json():
+                # read the other processes commits first,
+                # a record that they changed meanwhile is not saved over their newer version
+                changed = catch_up()
+                kept = [(kind, record) for kind, record in records if record_key(kind, record) not in changed]
+                if len(kept) != len(records):
+                    _sync['conflicts'] += len(records) - len(kept)
+                    console.say(f"\n❌ {len(records) - len(kept)} changes were not saved, another process changed them first...")
+                records = kept
+                if not records:
+                    return True
+
+                # this commit number is the new version of each record
+                sequence, generation, rewrite_sequence = get_process_lock().read_header()
+                version = sequence + 1
+
+            # separators without spaces to keep each record compact
+            lines = [
+                json.dumps({'kind': kind, 'data': record} if version is None else
+                           {'kind': kind, 'data': record, 'version': version}, separators=(',', ':')) + '\n'
+                for kind, record in records
+            ]
+
+            # 'a' mode to write at the end of the file without touching the old records
+            atomic_file.append(JOURNAL_FILE_NAME, ''.join(lines), DURABILITY)
+
+            if version is not None:
+                get_process_lock().write_header(version, generation, rewrite_sequence)
+                for kind, record in records:
+                    _sync['versions'][record_key(kind, record)] = version
+                _sync.update(sequence=version, position=journal_size())
+        return True
+
+    except Exception:
+        console.say("\n❌ Failed to write to the journal file...")
+        return False
+
+# read the journal records of one kind
+def read_journal(kind):
+    """
+    Reads all the journal records of a specific kind in the same order they were written
+
+    if the last line was cut in the middle (the app crashed while writing it)
+    it will be ignored with all lines after it.
+    a line is complete just if it ends with a new line (the same as `read_journal_entries()` and `repair_journal()`),
+    so a last line without it is ignored even if it's valid JSON (the next append removes it).
+
+    Args:
+        kind (str): the kind of the records 'item' or 'user'
+
+    Returns:
+        list: Returns a list of records as dictionaries
+    """
+    records = []
+
+    # no journal yet => no changes after the last snapshot
+    if not os.path.exists(JOURNAL_FILE_NAME):
+        return records
+
+    with open(JOURNAL_FILE_NAME, 'r') as f:
+        for line in f:
+            entry = None
+            if line.endswith('\n'):
+                try:
+                    entry = json.loads(line)
+                except json.decoder.JSONDecodeError:
+                    pass
+
+            if entry is None:
+                # a half written record, stop here (the next append removes it, see `repair_journal()`)
+                console.say('\n❌ Warning: the journal has a half written record, the records after it are ignored...')
+                break
+
+            if entry['kind'] == kind:
+                records.append(entry['data'])
+
+    return records
+
+# apply the journal on top of the loaded data
+def replay_journal(kind, records):
+    """
+    Applies the journal records on top of the data loaded from the JSON file (the last snapshot)
+
+    each journal record is the full new state of one item or user,
+    so if the id already exists replace it, otherwise add it to the end.
+
+    Args:
+        kind (str): the kind of the records 'item' or 'user'
+        records (list): list of dictionaries loaded from the JSON file
+
+    Returns:
+        list: Returns the list of dictionaries after applying the journal
+    """
+    id_key = 'item_id' if kind == 'item' else 'user_id'
+
+    journal_records = read_journal(kind)
+    if not journal_records:
+        return records
+
+    # dictionary (id => position) to find each record in O(1) not looping over all the list
+    positions = {record[id_key]: index for index, record in enumerate(records)}
+
+    for record in journal_records:
+        index = positions.get(record[id_key])
+        if index is None:
+            positions[record[id_key]] = len(records)
+            records.append(record)
+        else:
+            records[index] = record
+
+    return records
+
+# remove the records of one kind from the journal
+def drop_journal_records(kind):
+    """
+    Removes all the journal records of a specific kind after storing them into the JSON File
+
+    the other kind records stay in the journal until their file is stored as well,
+    when the journal has nothing left it will be deleted.
+
+    Args:
+        kind (str): the kind of the records 'item' or 'user'
+    """
+    if not os.path.exists(JOURNAL_FILE_NAME):
+        return
+
+    # keep just the records of the other kind
+    with open(JOURNAL_FILE_NAME, 'r') as f:
+        remaining = [line for line in f if not line.startswith(f'{{"kind":"{kind}"')]
+
+    if not remaining:
+        os.remove(JOURNAL_FILE_NAME)
+        return
+
+    # write the remaining records to a temp file then replace the journal with it
+    # so a crash here will not lose the journal
+    atomic_file.write_atomic(JOURNAL_FILE_NAME, ''.join(remaining), DURABILITY)
+
+# remove a half written last line of the journal
+def repair_journal():
+    """
+    Cuts the journal back to the end of its last complete line (call it while holding the writer lock)
+
+    if the app crashed while appending a record, the journal ends with a half line.
+    the next record would be written right after it (glued into one broken line),
+    and the journal readers stop at the broken line => that record and all the records after it would be lost.
+
+    Returns:
+        int: how many bytes were removed (0 if the journal ends with a complete line)
+    """
+    if not os.path.exists(JOURNAL_FILE_NAME):
+        return 0
+
+    with open(JOURNAL_FILE_NAME, 'rb+') as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return 0
+        f.seek(size - 1)
+        if f.read(1) == b'\n':
+            return 0
+
+        # search the last new line from the end, one chunk each time
+        end = 0
+        position = size
+        while position > 0:
+            start = max(0, position - STREAM_CHUNK_SIZE)
+            f.seek(start)
+            index = f.read(position - start).rfind(b'\n')
+            if index != -1:
+                end = start + index + 1
+                break
+            position = start
+
+        f.truncate(end)
+        if DURABILITY != 'fast':
+            f.flush()
+            os.fsync(f.fileno())
+
+    console.say(f'\n❌ Warning: the last journal record was half written (the app stopped while saving it), {size - end} bytes removed')
+    return size - end
+
+# Returns the size of the journal file
+def journal_size():
+    """Returns the size of the journal file in bytes (0 if it doesn't exist)"""
+    if not os.path.exists(JOURNAL_FILE_NAME):
+        return 0
+    return os.path.getsize(JOURNAL_FILE_NAME)
+
+# fold the journal back into the JSON files
+def compact_journal(users, items, force=False):
+    """
+    Compaction: stores the users and items into their JSON files and clear the journal
+
+    It happens just when the journal is bigger than `JOURNAL_COMPACT_SIZE`,
+    or if force is true.
+
+    Args:
+        users (list): list of all users instances
+        items (list): list of all items instances
+        force (bool): compact even if the journal is still small
+
+    Returns:
+        bool: Returns true if the journal was compacted, otherwise false
+    """
+    size = journal_size()
+    if size == 0 or (not force and size < JOURNAL_COMPACT_SIZE):
+        return False
+
+    # each store removes its kind records from the journal
+    return store_users(users, compacting=True) and store_items(items, compacting=True)
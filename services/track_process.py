@@ -5,13 +5,14 @@ and make the main module more readable and simple
 so this module will make the main module interact with other modules,
 using simpler functions to simple the process and make the code nice.
 """
+import time
 from colorama import Fore, Style # to display colors and styles to the CLI
 from models.user import User
 from models.library import Library
 from models.book import Book
 from models.dvd import DVD
 from models.magazine import Magazine
-from services import display, storage, validators
+from services import console, display, storage, validators
 from Exceptions.exceptions import ItemCanNotReserve, ItemNotAvailableError, ItemNotFoundError
 
 # Initialize the Library_object and store users, items as an attributes
@@ -29,17 +30,64 @@ def initialize_library():
     """
 
     # create an object from the `Library` and give it's constructor users, items as arguments from JSON Files
-    library_manager = Library(storage.load_users(), storage.load_items())
+    # (the mapped catalog, or the items generator => a big items file is never in the memory all at once)
+    library_manager = Library(storage.load_users(), storage.open_items())
 
     # get the private __users attribute using get_users
     users = library_manager.get_users()
     # get the private __items attribute using get_users
     items = library_manager.get_items()
 
+    # the users saved in the old format (lists with the items titles) => store them again in the id sets format
+    storage.migrate_old_users(users)
+
+    # if the journal became too big fold it back into the JSON files
+    storage.compact_journal(users, items)
+
+    # link the library to the storage, so it reads the changes of the other processes (e.g, another terminal)
+    storage.refresh(library_manager)
+
     return users, items, library_manager
 
+# run the handler of one menu choice
+def handle_choice(choice, users, items, library_manager):
+    """
+    Runs the handler of the menu choice (the main loop, and the replay driver use it)
+
+    the exit choice (7) isn't handled here, the main loop saves and exits
+
+    Args:
+        choice (int): the menu choice (1 - 6) from `display_welcome_message()`
+        users (list): the list of all users instances
+        items (list): the list of all items instances
+        library_manager (Library): the library object we used to access the library methods
+    """
+    # view all available items
+    if choice == 1:
+        display.display_available_items(library_manager)
+
+    # search an items based on title, or type
+    elif choice == 2:
+        handle_searching(users, items, library_manager)
+
+    # register a new user
+    elif choice == 3:
+        register_user(users, library_manager)
+
+    # Borrow an item / return an item
+    elif choice == 4:
+        handle_borrow_return(users, items, library_manager)
+
+    # Reserve an item / cancel reservation
+    elif choice == 5:
+        handle_reserve_cancel(users, items, library_manager)
+
+    # Admin: Add/Remove Items/Users (As Admin)
+    elif choice == 6:
+        handle_admin(users, items, library_manager)
+
 # This function handle the searching process
-def handle_searching(users, items):
+def handle_searching(users, items, library_manager):
     """
     Make the user Desides which search methods want to choose (by title, or search by type)
 
@@ -48,7 +96,9 @@ def handle_searching(users, items):
     and if the choise 2 => call 'search_by_type()' function.
 
     Args:
+        users (list): the list of users instances
         items (list): the list of items instances
+        library_manager (Library): the library object which has the title index
     """
 
     # display search methods (title, or type)
@@ -56,16 +106,16 @@ def handle_searching(users, items):
 
     # handle searching by title
     if search_type == 1:
-        search_query = input('\n✒️ Please enter a title: ').strip().lower()
-        storage.search_by_title(search_query, items, users)
+        search_query = console.ask('\n✒️ Please enter a title: ').strip().lower()
+        storage.search_by_title(search_query, library_manager)
     
     # handle searching by type
     elif search_type == 2:
-        search_query = input('\n✒️ Please enter a type: ').strip().lower()
-        storage.search_by_type(search_query, items, users)
+        search_query = console.ask('\n✒️ Please enter a type: ').strip().lower()
+        storage.search_by_type(search_query, library_manager)
 
 # This function handle register a new user process by dealing with
-def register_user(users):
+def register_user(users, library_manager):
     """
     handle register a new user
 
@@ -76,23 +126,26 @@ def register_user(users):
 
     Args:
         users (list): the list of all users
+        library_manager (Library): An instance from Library, to access `add_user()` Library method
     """
     # get the email and the name of the new user after validation
     email, name = display.get_new_user_info(users, 'Your')
     
-    # create a new user
-    new_user = User(name, email)
-    # then append the new user users list to store it later using `store_users()` function
-    users.append(new_user)
-
-    # save the new users_data into the JSON file
-    if storage.store_users(users):
-        # using colorama package to print an ouput with red color using `Fore`
-        print(f'\n🎉 {name} now you are a member on the library\n🆔 your ID is: {new_user.get_display_id()} {Fore.RED + '[PLEASE SAVE IT]'}')
-        # then reset the style to the default again
-        print(Style.RESET_ALL)
-    else:
-        print('❌ Faild added the user...')
+    # one step between the processes: read their changes first, then change and save before they continue
+    with storage.shared_transaction(library_manager):
+        # create a new user
+        new_user = User(name, email)
+        # then add the new user to the library (users list, and the ids indexes) to store it later using `store_users()` function
+        library_manager.add_user(new_user)
+
+        # save the new users_data into the JSON file
+        if storage.store_users(users):
+            # using colorama package to print an ouput with red color using `Fore`
+            console.say(f'\n🎉 {name} now you are a member on the library\n🆔 your ID is: {new_user.get_display_id()} {Fore.RED + '[PLEASE SAVE IT]'}')
+            # then reset the style to the default again
+            console.say(Style.RESET_ALL)
+        else:
+            console.say('❌ Faild added the user...')
 
 # handle the borrowing and return process
 def handle_borrow_return(users, items, library_manager):
@@ -133,35 +186,39 @@ def borrow_item(users, items, library_manager):
         library_manager (Library): the library object we used to access the library `borrow_item()` method
     """
     # get the user and item after validation
-    user, item = display.get_user_item_info(users, items, 'Borrow')
+    user, item = display.get_user_item_info(library_manager, 'Borrow')
 
     # if one of them doesn't exist using get_user_item_info => stop the function
     if not user or not item:
         return
 
-    # make the borrowing process using `borrow_item()` method
-    is_success = library_manager.borrow_item(user, item)
+    # one step between the processes: read their changes first, then change and save before they continue
+    with storage.shared_transaction(library_manager):
+        # make the borrowing process using `borrow_item()` method
+        is_success = library_manager.borrow_item(user, item)
 
-    # try to update changes in items and users lists
-    if is_success:
-        # pass the new user status to update it in the list of all users
-        if not storage.update_users(users, user):
-            print("\n❌ Failed to save user changes...")
-            return
-        # pass the new item status to update it in the list of all items
-        # after any borrow or reserved I need to update the lists to keep sync
-        if not storage.update_items(items, item):
-            print("\n❌ Failed to save item changes...")
-            return
+        # try to update changes in items and users lists
+        if is_success:
+            # pass the new user status to update it in the list of all users
+            if not storage.update_users(library_manager, user):
+                console.say("\n❌ Failed to save user changes...")
+                return
+            # pass the new item status to update it in the list of all items
+            # after any borrow or reserved I need to update the lists to keep sync
+            if not storage.update_items(library_manager, item):
+                console.say("\n❌ Failed to save item changes...")
+                return
         
-        print(f"\n✅ {user.get_name()} borrowed {item.get_title()} successfully.")
-        return
-    else:
-        # display the unavailable to borrow message
-        try:
-            display.display_not_available_to_have(users, item, "borrowed")
-        except ItemNotAvailableError as e:
-            print(e)
+            # the due date of the loan (year-month-day)
+            due_date = time.strftime('%Y-%m-%d', time.localtime(user.get_borrowed_item(item.get_item_id())['due']))
+            console.say(f"\n✅ {user.get_name()} borrowed {item.get_title()} successfully (return it before {due_date}).")
+            return
+        else:
+            # display the unavailable to borrow message
+            try:
+                display.display_not_available_to_have(library_manager, item, "borrowed")
+            except ItemNotAvailableError as e:
+                console.say(e)
 
 # Return an Item
 def return_item(users, items, library_manager):
@@ -180,29 +237,41 @@ def return_item(users, items, library_manager):
     """
 
     # get the user and item after validating 
-    user, item = display.get_user_item_info(users, items, 'Return')
+    user, item = display.get_user_item_info(library_manager, 'Return')
 
     # if one of them dosen't exist using get_user_item_info => stop the function
     if not user or not item:
         return
 
-    # make the Returning process using `return_item()` method
-    is_success = library_manager.return_item(user, item)
+    # one step between the processes: read their changes first, then change and save before they continue
+    with storage.shared_transaction(library_manager):
+        # the users who reserved a copy before returning (to know who got it from the queue)
+        holders = library_manager.get_holders(item)
+        # make the Returning process using `return_item()` method
+        is_success = library_manager.return_item(user, item)
 
-    # if success please update the users and items lists to keep all data sync togother
-    if is_success:
-        # pass the new user status to update it in the list of all users
-        if not storage.update_users(users, user):
-            print("\n❌ Failed to save user changes...")
-            return
-        # pass the new item status to update it in the list of all items
-        if not storage.update_items(items, item):
-            print("\n❌ Failed to save item changes...")
-            return
+        # if success please update the users and items lists to keep all data sync togother
+        if is_success:
+            # pass the new user status to update it in the list of all users
+            if not storage.update_users(library_manager, user):
+                console.say("\n❌ Failed to save user changes...")
+                return
+            # pass the new item status to update it in the list of all items
+            if not storage.update_items(library_manager, item):
+                console.say("\n❌ Failed to save item changes...")
+                return
+            # the item was given to the first waiting user (if there is a queue) => save them too
+            next_user = next((holder for holder in library_manager.get_holders(item) if holder not in holders), None)
+            if next_user is not None and not storage.update_users(library_manager, next_user):
+                console.say("\n❌ Failed to save user changes...")
+                return
         
-        print(f"\n✅ {user.get_name()} Returned {item.get_title() }, and now it's available again.")
-    else:
-        print(f'\n❌ Returning {item.get_title()} Faild...')
+            if next_user is not None:
+                console.say(f"\n✅ {user.get_name()} Returned {item.get_title() }, and now it's reserved for {next_user.get_name()} (the first in the queue).")
+            else:
+                console.say(f"\n✅ {user.get_name()} Returned {item.get_title() }, and now it's available again.")
+        else:
+            console.say(f'\n❌ Returning {item.get_title()} Faild...')
 
 # handle the Reservation and cancel_reservation proccess
 def handle_reserve_cancel(users, items, library_manager):
@@ -248,44 +317,51 @@ def reserve_item(users, items, library_manager):
         Item_Can_not_reserve: Raise an error if the user want to reserve a magazine
     """
     # get the user and item after validating  
-    user, item = display.get_user_item_info(users, items, 'Reserve') 
+    user, item = display.get_user_item_info(library_manager, 'Reserve') 
 
     # if one of them dosen't exist using get_user_item_info => stop the function
     if not user or not item:
         return
 
-    try:
-        # if user want to reserve a magazine => raise custom `Item_Can_not_reserve`
-        if item.__class__.__name__ == 'Magazine':
-            raise ItemCanNotReserve("❌ You can't reserve a magazine!")
+    # one step between the processes: read their changes first, then change and save before they continue
+    with storage.shared_transaction(library_manager):
+        try:
+            # if user want to reserve a magazine => raise custom `Item_Can_not_reserve`
+            if item.__class__.__name__ == 'Magazine':
+                raise ItemCanNotReserve("❌ You can't reserve a magazine!")
         
-        # make the reservation using `make_reservation()` using the library object
-        is_success = library_manager.make_reservation(user, item)
+            # make the reservation using `make_reservation()` using the library object
+            is_success = library_manager.make_reservation(user, item)
+
+            # if the reservation procces done
+            # update the users, and items list to keep all data in sync
+            if is_success:
+                # pass the new user status to update it in the list of all users
+                if not storage.update_users(library_manager, user):
+                    console.say("\n❌ Failed to save user changes...")
+                    return
+                # pass the new item status to update it in the list of all items
+                if not storage.update_items(library_manager, item):
+                    console.say("\n❌ Failed to save item changes...")
+                    return
 
-        # if the reservation procces done
-        # update the users, and items list to keep all data in sync
-        if is_success:
-            # pass the new user status to update it in the list of all users
-            if not storage.update_users(users, user):
-                print("\n❌ Failed to save user changes...")
-                return
-            # pass the new item status to update it in the list of all items
-            if not storage.update_items(items, item):
-                print("\n❌ Failed to save item changes...")
+                # not available => the user joined the queue of the item
+                position = library_manager.get_waitlist_position(user, item)
+                if position is not None:
+                    console.say(f"\n✅ {user.get_name()} is waiting {item.get_title() } (number {position} in the queue)")
+                else:
+                    console.say(f"\n✅ {user.get_name()} Reserved the {item.get_title() }")
                 return
-
-            print(f"\n✅ {user.get_name()} Reserved the {item.get_title() }")
-            return
     
-        else:
-            # display that the item already not available from another user
-            try:
-                display.display_not_available_to_have(users, item, "reserved")
-            except ItemNotAvailableError as e:
-                print(e)
+            else:
+                # display that the item already not available from another user
+                try:
+                    display.display_not_available_to_have(library_manager, item, "reserved")
+                except ItemNotAvailableError as e:
+                    console.say(e)
 
-    except ItemCanNotReserve as e:
-        print(e)
+        except ItemCanNotReserve as e:
+            console.say(e)
 
 # cancel the reservation
 def cancel_resrvation(users, items, library_manager):
@@ -303,30 +379,37 @@ def cancel_resrvation(users, items, library_manager):
         library_manager (Library): the library object we used to access the library `cancel_reserve()` method
     """
     # get the user and item after validation
-    user, item = display.get_user_item_info(users, items, 'Cancel Reservation')
+    user, item = display.get_user_item_info(library_manager, 'Cancel Reservation')
 
     if not user or not item:
         return
 
-    # make the cancel reservation using `cancel_reserve()` using the library object
-    is_success = library_manager.cancel_reserve(user, item)
+    # one step between the processes: read their changes first, then change and save before they continue
+    with storage.shared_transaction(library_manager):
+        # make the cancel reservation using `cancel_reserve()` using the library object
+        is_success = library_manager.cancel_reserve(user, item)
 
-    # if the procces done
-    # update the users, and items list to keep all data in sync
-    if is_success:
-        # pass the new user status to update it in the list of all users
-        if not storage.update_users(users, user):
-            print("\n❌ Failed to save user changes...")
-            return
-        # pass the new item status to update it in the list of all items
-        if not storage.update_items(items, item):
-            print("\n❌ Failed to save item changes...")
-            return
+        # if the procces done
+        # update the users, and items list to keep all data in sync
+        if is_success:
+            # pass the new user status to update it in the list of all users
+            if not storage.update_users(library_manager, user):
+                console.say("\n❌ Failed to save user changes...")
+                return
+            # pass the new item status to update it in the list of all items
+            if not storage.update_items(library_manager, item):
+                console.say("\n❌ Failed to save item changes...")
+                return
+            # the item was given to the first waiting user (if there is a queue) => save them too
+            for next_user in library_manager.get_holders(item):
+                if next_user is not user and not storage.update_users(library_manager, next_user):
+                    console.say("\n❌ Failed to save user changes...")
+                    return
 
-        print(f"\n✅ {user.get_name()} cancel the reservation of {item.get_title() }")
+            console.say(f"\n✅ {user.get_name()} cancel the reservation of {item.get_title() }")
     
-    else:
-        print(f'\n❌ Cancel The Reservation of {item.get_title()} faild...')
+        else:
+            console.say(f'\n❌ Cancel The Reservation of {item.get_title()} faild...')
 
 # handle adding, removing items / users from items JSON File
 def handle_admin(users, items, library_manager):
@@ -389,37 +472,46 @@ def add_an_item(items, library_manager):
     # get the item info
     item_type, title, author = display.get_admin_item_info('Add')
 
-    # Check if item already exists
-    for item in items:
-        # for each item in the list if has the same type, title, author as the input item (It's exist before)
-        if item.get_type().lower() == item_type.lower() and item.get_title().lower() == title.lower() and item.get_author().lower() == author.lower():
-            print("\n❌ The Item Already Exist...")
-            return
-
-    # Create new item based on type
-    new_item = None
-    if item_type == 'Book':
-        new_item = Book(title, author, True)
-    elif item_type == 'DVD':
-        new_item = DVD(title, author, True)
-    elif item_type == 'Magazine':
-        new_item = Magazine(title, author, True)
-    else:
-        print("\n❌ Invalid item type...")
-        return
+    # one step between the processes: read their changes first, then change and save before they continue
+    with storage.shared_transaction(library_manager):
+        # Check if item already exists
+        # (the same title is one of the title search results, no need to check all items)
+        for item in library_manager.search_by_title(title.lower()):
+            # for each item in the list if has the same type, title, author as the input item (It's exist before)
+            # => the library has one more copy of it (not a new item), and the first waiting user gets it
+            if item.get_type().lower() == item_type.lower() and item.get_title().lower() == title.lower() and item.get_author().lower() == author.lower():
+                next_users = library_manager.add_copies(item)
+                if not storage.update_many(library_manager, next_users, [item]):
+                    console.say("\n❌ Failed to save item changes...")
+                    return
 
-    # Add the new item to the library
-    if new_item:
-        library_manager.add_item(new_item)
+                console.say(f"\n✅ {title} Added successfully, the library has {item.get_copies_count()} copies of it now.")
+                return
 
-        # I updated it manually above
-        # just store all items including the new one
-        if not storage.store_items(items):
-            print("\n❌ Failed to save item changes...")
+        # Create new item based on type
+        new_item = None
+        if item_type == 'Book':
+            new_item = Book(title, author, True)
+        elif item_type == 'DVD':
+            new_item = DVD(title, author, True)
+        elif item_type == 'Magazine':
+            new_item = Magazine(title, author, True)
+        else:
+            console.say("\n❌ Invalid item type...")
             return
+
+        # Add the new item to the library
+        if new_item:
+            library_manager.add_item(new_item)
+
+            # I updated it manually above
+            # just store all items including the new one
+            if not storage.store_items(items):
+                console.say("\n❌ Failed to save item changes...")
+                return
         
-        print(f"\n✅ {title} Added successfully.")
-        return
+            console.say(f"\n✅ {title} Added successfully.")
+            return
 
 # remove an existing item (ADMIN)
 def remove_an_item(users, items, library_manager):
@@ -440,43 +532,49 @@ def remove_an_item(users, items, library_manager):
         # get the item info
         item_type, title, author = display.get_admin_item_info('Remove')
 
-        # Check if item already exists
-        item_found = False
-        for item in items:
-            # if the item already exist => remove it from the items list
-            if item.get_type().lower() == item_type.lower() and item.get_title().lower() == title.lower() and item.get_author().lower() == author.lower():
-                if hasattr(item, 'get_reserved_by'):
-                    for user in users:
-                        # Check if item is reserved by this user
-                        if user.get_user_id() == item.get_reserved_by():
-                            raise Exception(f"\n❌ Cannot remove item: {item.get_title()} is reserved by {user.get_name()}")
-                        
-                        # Check if item is borrowed by this user
-                        for borrowed_item in user.get_borrowed_items():
-                            if borrowed_item['item_id'] == item.get_item_id():
-                                raise Exception(f"\n❌ Cannot remove item: {item.get_title()} is borrowed by {user.get_name()}")
-                        
-                    # If we get here, item is not reserved or borrowed by anyone
-                    library_manager.remove_item(item)
-                    item_found = True
+        # one step between the processes: read their changes first, then change and save before they continue
+        with storage.shared_transaction(library_manager):
+            # Check if item already exists
+            item_found = False
+            # (the same title is one of the title search results, no need to check all items)
+            for item in library_manager.search_by_title(title.lower()):
+                # if the item already exist => remove it from the items list
+                if item.get_type().lower() == item_type.lower() and item.get_title().lower() == title.lower() and item.get_author().lower() == author.lower():
+                    if hasattr(item, 'get_reserved_by'):
+                        # Check if item (any copy of it) is reserved by a user (library index item id => user)
+                        for reserver in library_manager.get_holders(item):
+                            raise Exception(f"\n❌ Cannot remove item: {item.get_title()} is reserved by {reserver.get_name()}")
+
+                        # Check if users are waiting the item (its queue)
+                        waiting = library_manager.get_waitlist_length(item.get_item_id())
+                        if waiting:
+                            raise Exception(f"\n❌ Cannot remove item: {waiting} user(s) are waiting {item.get_title()}")
+
+                        # Check if item (any copy of it) is borrowed by a user (library index item id => user)
+                        for borrower in library_manager.get_borrowers(item):
+                            raise Exception(f"\n❌ Cannot remove item: {item.get_title()} is borrowed by {borrower.get_name()}")
+
+                        # If we get here, item is not reserved or borrowed by anyone
+                        library_manager.remove_item(item)
+                        item_found = True
                 
-                # I updated it manually above
-                # Just store all items without the one we removed
-                if not storage.store_items(items):
-                    print("\n❌ Failed to save item changes...")
-                    return
+                    # I updated it manually above
+                    # Just store all items without the one we removed
+                    if not storage.store_items(items):
+                        console.say("\n❌ Failed to save item changes...")
+                        return
                 
-                print(f"\n✅ {title} Removed successfully.")
-                return
+                    console.say(f"\n✅ {title} Removed successfully.")
+                    return
 
-        if not item_found:
-            raise ItemNotFoundError("\n❌ Item does not exist...")
+            if not item_found:
+                raise ItemNotFoundError("\n❌ Item does not exist...")
 
     except ItemNotFoundError as e:
-        print(e)
+        console.say(e)
     
     except Exception as e:
-        print(e)
+        console.say(e)
 
 # Add a user (ADMIN)
 def add_a_user(users, library_manager):
@@ -494,26 +592,28 @@ def add_a_user(users, library_manager):
         # Get user information using existing function that handles all validation
         email, name = display.get_new_user_info(users, 'The')
         
-        # Create new user instance
-        new_user = User(name, email)
+        # one step between the processes: read their changes first, then change and save before they continue
+        with storage.shared_transaction(library_manager):
+            # Create new user instance
+            new_user = User(name, email)
         
-        # Add the user to the library
-        if not library_manager.add_user(new_user):
-            raise Exception("\n❌ Failed to add user!")
+            # Add the user to the library
+            if not library_manager.add_user(new_user):
+                raise Exception("\n❌ Failed to add user!")
             
-        # Update storage
-        if not storage.store_users(users):
-            raise Exception("\n❌ Failed to save user information!")
+            # Update storage
+            if not storage.store_users(users):
+                raise Exception("\n❌ Failed to save user information!")
             
-        # Display the success message
-        print(f'\n✅ The Admin: Successfully added a new user:\n')
-        print(f'👲 Name: {name}')
-        print(f'📧 Email: {email}')
-        print(f'🆔 User ID: {new_user.get_display_id()}')
-        return True
+            # Display the success message
+            console.say(f'\n✅ The Admin: Successfully added a new user:\n')
+            console.say(f'👲 Name: {name}')
+            console.say(f'📧 Email: {email}')
+            console.say(f'🆔 User ID: {new_user.get_display_id()}')
+            return True
         
     except Exception as e:
-        print(e)
+        console.say(e)
         return False
 
 # remove a user (ADMIN)
@@ -530,34 +630,39 @@ def remove_a_user(users, library_manager):
     """
     try:
         # Get user ID to remove
-        user_id = input("\nEnter user ID to remove: ").strip()
+        user_id = console.ask("\nEnter user ID to remove: ").strip()
         
         # Validate user ID using the user id validation function
-        user_to_remove = validators.user_id_validation(user_id, users)
+        user_to_remove = validators.user_id_validation(user_id, library_manager)
         if not user_to_remove:
             return False
             
-        # Check if user has any borrowed or reserved items
-        borrowed_items = user_to_remove.get_borrowed_items()
-        reserved_items = user_to_remove.get_reserved_items()
+        # one step between the processes: read their changes first, then change and save before they continue
+        with storage.shared_transaction(library_manager):
+            # Check if user has any borrowed or reserved items
+            borrowed_items = user_to_remove.get_borrowed_items()
+            reserved_items = user_to_remove.get_reserved_items()
         
-        if borrowed_items:
-            raise Exception(f"\n❌ Cannot remove user: {user_to_remove.get_name()} has {len(borrowed_items)} borrowed item(s)")
+            if borrowed_items:
+                raise Exception(f"\n❌ Cannot remove user: {user_to_remove.get_name()} has {len(borrowed_items)} borrowed item(s)")
             
-        if reserved_items:
-            raise Exception(f"\n❌ Cannot remove user: {user_to_remove.get_name()} has {len(reserved_items)} reserved item(s)")
+            if reserved_items:
+                raise Exception(f"\n❌ Cannot remove user: {user_to_remove.get_name()} has {len(reserved_items)} reserved item(s)")
+
+            if user_to_remove.get_waiting_items():
+                raise Exception(f"\n❌ Cannot remove user: {user_to_remove.get_name()} is waiting {len(user_to_remove.get_waiting_items())} item(s)")
             
-        # Remove the user
-        if not library_manager.remove_user(user_to_remove):
-            raise Exception("\n❌ Failed to remove user!")
+            # Remove the user
+            if not library_manager.remove_user(user_to_remove):
+                raise Exception("\n❌ Failed to remove user!")
             
-        # Update storage
-        if not storage.store_users(users):
-            raise Exception("\n❌ Failed to save user data!")
+            # Update storage
+            if not storage.store_users(users):
+                raise Exception("\n❌ Failed to save user data!")
             
-        print(f"\n✅ User {user_to_remove.get_name()} removed successfully!")
-        return True
+            console.say(f"\n✅ User {user_to_remove.get_name()} removed successfully!")
+            return True
         
     except Exception as e:
-        print(e)
+        console.say(e)
         return False
@@ -3,7 +3,12 @@ This module has all validation methods to ensure
 the input from users will be correctly, and don't crash the application.
 """
 import re
-from Exceptions.exceptions import InputNotInRangeError, EmailIsNotValid, EmailAlreadyExistsError, InputFieldEmptyError, UserNotFoundError, ItemNotFoundError, AdminPasswordWrongError, TypeIsNotValidError
+from services import console
+from Exceptions.exceptions import InputNotInRangeError, EmailIsNotValid, EmailAlreadyExistsError, InputFieldEmptyError, UserNotFoundError, ItemNotFoundError, AdminPasswordWrongError, TypeIsNotValidError, DisplayIdCollisionError
+
+# USE CONSTANTS (shared with the server module, which validates without `input()`)
+EMAIL_PATTERN = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+ADMIN_PASSWORD = '12345'
 
 # validate input is an integer and in a specifc range
 # using to receive choices or inputs from the user
@@ -39,11 +44,11 @@ def int_validation(num, start, end, num_type):
             return value
         
         except ValueError:
-            num = input(f"\n👎 {num_type} can't be a string, Please enter a valid {num_type} (Just numbers allow): ")
+            num = console.ask(f"\n👎 {num_type} can't be a string, Please enter a valid {num_type} (Just numbers allow): ")
 
         except InputNotInRangeError as e:
-            print(e)
-            num = input(f'Please enter a valid {num_type} (between {start} - {end}): ')
+            console.say(e)
+            num = console.ask(f'Please enter a valid {num_type} (between {start} - {end}): ')
 
 # validate the email (I use Stack overflow to learn about email validations process, and regax)
 def email_validation(email, users):
@@ -72,7 +77,7 @@ def email_validation(email, users):
                 raise InputFieldEmptyError("\n❌ You can't left the email empty!")
 
             # check if the email is valid using regax
-            valid = re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email)
+            valid = re.match(EMAIL_PATTERN, email)
 
             # if not valid raise a custom error => `EmailIsNotValid`
             if not valid:
@@ -88,16 +93,16 @@ def email_validation(email, users):
             return email
 
         except InputFieldEmptyError as e:
-            print(e)
-            email = input('Please enter the email: ').lower()
+            console.say(e)
+            email = console.ask('Please enter the email: ').lower()
 
         except EmailIsNotValid as e:
-            print(e)
-            email = input('Please enter a valid email (e.g, example@gmail.com): ').lower()
+            console.say(e)
+            email = console.ask('Please enter a valid email (e.g, example@gmail.com): ').lower()
 
         except EmailAlreadyExistsError as e:
-            print(e)
-            email = input('Please try again with another email: ').lower()
+            console.say(e)
+            email = console.ask('Please try again with another email: ').lower()
 
 # check if the input field field is empty
 def empty_input_validation(name, message):
@@ -124,11 +129,11 @@ def empty_input_validation(name, message):
             return name
             
         except InputFieldEmptyError as e:
-            print(e)
-            name = input(f"Please input the {message}: ").strip()
+            console.say(e)
+            name = console.ask(f"Please input the {message}: ").strip()
 
 # validate the user id => (exist and valid)
-def user_id_validation(display_user_id, users):
+def user_id_validation(display_user_id, library_manager):
     """
     Receive the user display id (the first 8 characters from ID) and validate if there's matches value
 
@@ -140,12 +145,13 @@ def user_id_validation(display_user_id, users):
 
     Args:
         display_user_id (str): the first 8 characters from the full_user_id
-        users (list): list of users
+        library_manager (Library): the library object which has the users display id index
 
     Raises:
         InputFieldEmptyError: Raise an error if the user dosen;t input any value
         InputNotInRangeError: Raise an error if the user input ID doesn't contains 8 characters
         UserNotFoundError: Raise an error when there's no any matched_user by this ID
+        DisplayIdCollisionError: Raise an error when more than one user has this ID
 
     Returns:
         User: Returns the matched user as instance from User class 
@@ -160,33 +166,28 @@ def user_id_validation(display_user_id, users):
             if  len(display_user_id) != 8:
                 raise InputNotInRangeError("\n❌ User id must be 8 characters!")
             
-            # searching for the user using the display_user_id
-            matched_user = None
-            for user in users:
-                full_user_id = user.get_user_id()
-                # if startswith the same values => so this is the user
-                if full_user_id.startswith(display_user_id):
-                    matched_user = user
-                
+            # searching for the user using the display_user_id (dictionary lookup no looping)
+            matched_user = library_manager.find_user(display_user_id)
+
             if not matched_user:
                 raise UserNotFoundError("\n❌ User dosen't exist...")
 
             return matched_user
 
         except InputFieldEmptyError as e:
-            print(e)
-            display_user_id = input('Please input the user id: ').strip()
+            console.say(e)
+            display_user_id = console.ask('Please input the user id: ').strip()
         
         except InputNotInRangeError as e:
-            print(e)
-            display_user_id = input('Please input the user id: ').strip()
+            console.say(e)
+            display_user_id = console.ask('Please input the user id: ').strip()
 
-        except UserNotFoundError as e:
-            print(e)
+        except (UserNotFoundError, DisplayIdCollisionError) as e:
+            console.say(e)
             break
 
 # validate the item id => (exist and valid)
-def item_id_validation(display_item_id, items):
+def item_id_validation(display_item_id, library_manager):
     """
     Receive the item display id (the first 8 characters from ID) and validate if there's matches value
 
@@ -198,12 +199,13 @@ def item_id_validation(display_item_id, items):
 
     Args:
         display_user_id (str): the first 8 characters from the full_item_id
-        items (list): list of items
+        library_manager (Library): the library object which has the items display id index
 
     Raises:
         InputFieldEmptyError: Raise an error if the user dosen't input any value
         InputNotInRangeError: Raise an error if the user input ID doesn't contains 8 characters
         UserNotFoundError: Raise an error when there's no any matched_item by this ID
+        DisplayIdCollisionError: Raise an error when more than one item has this ID
 
     Returns:
         User: Returns the matched item as instance from Item class 
@@ -218,14 +220,8 @@ def item_id_validation(display_item_id, items):
             if  len(display_item_id) != 8:
                 raise InputNotInRangeError("\n❌ Item id must be 8 characters!")
             
-            # searching for the item
-            matched_item = None
-            for item in items:
-                # if the full_item_id is startswith the same input display_item_id characters
-                # if yes please put this item as the matched_item
-                full_item_id = item.get_item_id()
-                if full_item_id.startswith(display_item_id):
-                    matched_item = item
+            # searching for the item using the display_item_id (dictionary lookup no looping)
+            matched_item = library_manager.find_item(display_item_id)
             
             # raise an error if there'e no item found by this id
             if not matched_item:
@@ -234,15 +230,15 @@ def item_id_validation(display_item_id, items):
             return matched_item
 
         except InputFieldEmptyError as e:
-            print(e)
-            display_item_id = input('Please input your item id: ').strip()
+            console.say(e)
+            display_item_id = console.ask('Please input your item id: ').strip()
         
         except InputNotInRangeError as e:
-            print(e)
-            display_item_id = input('Please input your item id: ').strip()
+            console.say(e)
+            display_item_id = console.ask('Please input your item id: ').strip()
 
-        except ItemNotFoundError as e:
-            print(e)
+        except (ItemNotFoundError, DisplayIdCollisionError) as e:
+            console.say(e)
             break
 
 # check is the admin password is correct
@@ -265,18 +261,18 @@ def check_admin(password):
             if not password:
                 raise InputFieldEmptyError("\n❌ You can't left the password empty!")
             
-            if password != '12345':
+            if password != ADMIN_PASSWORD:
                 raise AdminPasswordWrongError("\n❌ Please input the correct password. ")
             
             return 'admin'
             
         except InputFieldEmptyError as e:
-            print(e)
-            password = input("Please input the admin password: ")
+            console.say(e)
+            password = console.ask("Please input the admin password: ")
         
         except AdminPasswordWrongError as e:
-            print(e)
-            password = input('Enter the correct admin password, or -1 to back to the main menu: ')
+            console.say(e)
+            password = console.ask('Enter the correct admin password, or -1 to back to the main menu: ')
             if password == '-1':
                 return 'stop'
             
@@ -317,9 +313,9 @@ def type_validation(item_type):
             return item_type
             
         except InputFieldEmptyError as e:
-            print(e)
-            item_type = input("Please input the item type: ")
+            console.say(e)
+            item_type = console.ask("Please input the item type: ")
 
         except TypeIsNotValidError as e:
-            print(e)
-            item_type = input("\nPlease enter a valid type (Book, DVD, Magazine): ").strip()
\ No newline at end of file
+            console.say(e)
+            item_type = console.ask("\nPlease enter a valid type (Book, DVD, Magazine): ").strip()
\ No newline at end of file
@@ -0,0 +1,57 @@
+"""
+The shared pytest fixtures: the tests import the project packages (models, services) from the project folder,
+each storage test uses its own temp data folder (never `data/`),
+and the library tests make a small library, then save and load it again the same way
+"""
+import json
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.library import Library
+from models.libraryitem import ITEM_CLASSES
+from models.user import User
+from services import storage
+
+@pytest.fixture
+def data_folder(tmp_path, monkeypatch):
+    """Makes the storage use empty data files in a temp folder, and saves right away (no group commit)"""
+    monkeypatch.setattr(storage, 'ITEMS_FILE_NAME', str(tmp_path / 'items.json'))
+    monkeypatch.setattr(storage, 'USERS_FILE_NAME', str(tmp_path / 'users.json'))
+    monkeypatch.setattr(storage, 'JOURNAL_FILE_NAME', str(tmp_path / 'journal.log'))
+    monkeypatch.setattr(storage, 'GROUP_COMMIT', False)
+    (tmp_path / 'items.json').write_text('[]')
+    (tmp_path / 'users.json').write_text('[]')
+    yield tmp_path
+    storage.close_storage()
+
+@pytest.fixture
+def make_library():
+    """
+    Returns a function that makes a library of the items and new users
+
+        library, users = make_library(book, magazine, users_count=5)
+    """
+    def make(*items, users_count=4):
+        users = [User(f'user {number}', f'user{number}@library.com') for number in range(users_count)]
+        return Library(users, list(items)), users
+    return make
+
+@pytest.fixture
+def reload_library():
+    """
+    Returns a function that saves the users and the items as JSON (like the files), loads them back,
+    and makes a new library of the loaded ones
+
+        loaded_library, loaded_users, loaded_items = reload_library(users, items)
+    """
+    def reload(users, items):
+        loaded_users = [User.dict_to_instance(json.loads(json.dumps(user.instance_to_dict()))) for user in users]
+        loaded_items = [
+            ITEM_CLASSES[item.get_type()].dict_to_instance(json.loads(json.dumps(item.instance_to_dict())))
+            for item in items
+        ]
+        return Library(loaded_users, loaded_items), loaded_users, loaded_items
+    return reload
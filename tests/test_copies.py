@@ -0,0 +1,69 @@
+"""
+Tests of the titles that have many copies: the availability and the counters follow the free copies,
+and a new copy goes to the first waiting user
+"""
+from models.book import Book
+from models.magazine import Magazine
+
+def test_single_copy_is_not_available_after_borrowing(make_library):
+    """One copy => borrowing it makes the item not available"""
+    book = Book('Dune', 'Frank Herbert', True)
+    library, users = make_library(book)
+
+    assert library.borrow_item(users[0], book)
+    assert not book.check_availability()
+    assert not library.borrow_item(users[1], book)
+    assert library.get_available_count('Book') == 0 and library.get_not_available_count('Book') == 1
+
+def test_item_is_available_while_a_copy_is_free(make_library):
+    """Each borrow takes a free copy, the item is not available when no copy is free"""
+    magazine = Magazine('Time', 'Time Inc', True)
+    library, users = make_library(magazine)
+    library.add_copies(magazine, 2)
+    assert magazine.get_copies_count() == 3
+
+    assert library.borrow_item(users[0], magazine) and library.borrow_item(users[1], magazine)
+    assert magazine.check_availability() and magazine.get_free_copies() == 1
+    assert library.get_available_count('Magazine') == 1
+
+    assert library.borrow_item(users[2], magazine)
+    assert not magazine.check_availability() and magazine.get_free_copies() == 0
+    assert library.get_available_count('Magazine') == 0 and library.get_not_available_count('Magazine') == 1
+    assert not library.borrow_item(users[3], magazine)
+
+    # returning one copy makes the item available again
+    assert library.return_item(users[1], magazine)
+    assert magazine.check_availability() and magazine.get_free_copies() == 1
+    assert library.get_available_count('Magazine') == 1
+    assert sorted(user.get_name() for user in library.get_borrowers(magazine)) == ['user 0', 'user 2']
+
+def test_new_copy_goes_to_the_first_waiting_user(make_library):
+    """Adding copies of a waited item reserves one for the first user in the queue"""
+    book = Book('Dune', 'Frank Herbert', True)
+    library, users = make_library(book)
+    assert library.borrow_item(users[0], book)
+    assert library.make_reservation(users[1], book)
+
+    assert library.add_copies(book, 2) == [users[1]]
+    assert book.get_copies_count() == 3 and book.get_free_copies() == 1
+    assert library.get_holders(book) == [users[1]]
+    assert library.get_available_count('Book') == 1
+
+    # the holder borrows their reserved copy, the last free copy is still there
+    assert library.borrow_item(users[1], book)
+    assert library.get_holders(book) == []
+    assert book.get_free_copies() == 1
+
+def test_copies_are_kept_when_loading_again(make_library, reload_library):
+    """The copies and who has them are the same after saving and loading them"""
+    book = Book('Dune', 'Frank Herbert', True)
+    library, users = make_library(book)
+    library.add_copies(book, 1)
+    assert library.borrow_item(users[0], book) and library.borrow_item(users[1], book)
+
+    loaded_library, loaded_users, (loaded_book,) = reload_library(users, [book])
+    assert loaded_book.get_copies_count() == 2 and loaded_book.get_free_copies() == 0
+    assert not loaded_book.check_availability()
+    assert loaded_library.get_not_available_count('Book') == 1
+    assert loaded_library.return_item(loaded_users[0], loaded_book)
+    assert loaded_book.check_availability() and loaded_library.get_available_count('Book') == 1
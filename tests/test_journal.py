@@ -0,0 +1,73 @@
+"""
+Tests of the journal (storage module): appending, reading, and the half written last record after a crash
+"""
+from services import storage
+
+def item_record(title):
+    """Returns a small item dictionary (the journal doesn't check the fields)"""
+    return {'title': title, 'author': 'Author', 'item_id': f'{title}-id', 'type': 'Book', 'available': True}
+
+def journal_bytes():
+    """Returns the journal file content"""
+    with open(storage.JOURNAL_FILE_NAME, 'rb') as f:
+        return f.read()
+
+def test_append_then_read(data_folder):
+    """The records are read back in the order they were written, just the asked kind"""
+    assert storage.append_journal_records([('item', item_record('a')), ('item', item_record('b'))])
+    assert [record['title'] for record in storage.read_journal('item')] == ['a', 'b']
+    assert storage.read_journal('user') == []
+
+def test_complete_journal_is_not_repaired(data_folder):
+    """A journal that ends with a complete line is not changed"""
+    assert storage.append_journal_records([('item', item_record('a'))])
+    size = storage.journal_size()
+    assert storage.repair_journal() == 0
+    assert storage.journal_size() == size
+
+def test_torn_tail_is_cut_before_appending(data_folder):
+    """The next record isn't glued to the half record (otherwise the readers would lose it)"""
+    assert storage.append_journal_records([('item', item_record('a'))])
+    complete = journal_bytes()
+
+    # the app stopped in the middle of writing a record
+    with open(storage.JOURNAL_FILE_NAME, 'ab') as f:
+        f.write(b'{"kind":"item","data":{"title":"half')
+    # the half record is ignored by the readers
+    assert [record['title'] for record in storage.read_journal('item')] == ['a']
+
+    assert storage.append_journal_records([('item', item_record('b'))])
+    assert journal_bytes().startswith(complete)
+    assert b'half' not in journal_bytes()
+    assert [record['title'] for record in storage.read_journal('item')] == ['a', 'b']
+
+def test_repair_journal_returns_removed_bytes(data_folder):
+    """The journal is cut back to the end of the last complete line"""
+    assert storage.append_journal_records([('item', item_record('a'))])
+    size = storage.journal_size()
+    with open(storage.JOURNAL_FILE_NAME, 'ab') as f:
+        f.write(b'{"kind":"it')
+
+    assert storage.repair_journal() == len(b'{"kind":"it')
+    assert storage.journal_size() == size
+
+def test_journal_that_is_just_a_half_line(data_folder):
+    """No complete line at all => the journal becomes empty"""
+    with open(storage.JOURNAL_FILE_NAME, 'wb') as f:
+        f.write(b'{"kind":"item","da')
+
+    assert storage.repair_journal() == len(b'{"kind":"item","da')
+    assert storage.journal_size() == 0
+
+def test_last_line_without_new_line_is_torn(data_folder):
+    """A last record that is valid JSON but has no new line is torn too (the load and the next append agree)"""
+    assert storage.append_journal_records([('item', item_record('a'))])
+    with open(storage.JOURNAL_FILE_NAME, 'ab') as f:
+        f.write(b'{"kind":"item","data":{"title":"c"}}')
+
+    assert [record['title'] for record in storage.read_journal('item')] == ['a']
+    entries, _ = storage.read_journal_entries(0)
+    assert [entry['data']['title'] for entry in entries] == ['a']
+
+    assert storage.append_journal_records([('item', item_record('b'))])
+    assert [record['title'] for record in storage.read_journal('item')] == ['a', 'b']
@@ -0,0 +1,127 @@
+"""
+Tests of the lazy listing: the library type buckets are read while they change, without copying them,
+and a page resumes right after the last item of the previous page (the cursor)
+"""
+import json
+from itertools import islice
+import pytest
+from models.book import Book
+from models.dvd import DVD
+from models.library import Library
+from models.magazine import Magazine
+from models.type_bucket import TypeBucket
+from services import columnar_catalog, display
+from Exceptions.exceptions import ItemNotFoundError
+
+def make_books(count):
+    """Returns `count` books (Book 0, Book 1, ...)"""
+    return [Book(f'Book {number}', 'Author', True) for number in range(count)]
+
+def test_bucket_keeps_the_added_order():
+    """The items are listed in the order they were added, the removed ones are skipped"""
+    bucket, books = TypeBucket(), make_books(5)
+    for book in books:
+        bucket.add(book)
+    assert bucket.remove(books[1].get_item_id())
+    assert not bucket.remove(books[1].get_item_id())
+
+    assert list(bucket.iter_items()) == [books[0], books[2], books[3], books[4]]
+    assert len(bucket) == 4
+    assert bucket.get(books[2].get_item_id()) is books[2] and bucket.get(books[1].get_item_id()) is None
+
+def test_listing_while_adding_and_removing():
+    """A started listing sees the items added after it started, and skips the removed ones"""
+    bucket, books = TypeBucket(), make_books(4)
+    for book in books[:3]:
+        bucket.add(book)
+
+    listing = bucket.iter_items()
+    assert next(listing) is books[0]
+    bucket.add(books[3])
+    assert bucket.remove(books[1].get_item_id())
+    assert list(listing) == [books[2], books[3]]
+
+def test_listing_continues_after_the_bucket_is_made_again():
+    """Removing most of the items makes the bucket again, a started listing continues after its last item"""
+    bucket, books = TypeBucket(), make_books(300)
+    for book in books:
+        bucket.add(book)
+
+    listing = bucket.iter_items()
+    assert [next(listing) for _ in range(10)] == books[:10]
+    # the items 5 to 249 are removed (more than half => the bucket is made again)
+    for book in books[5:250]:
+        assert bucket.remove(book.get_item_id())
+    new_book = Book('New Book', 'Author', True)
+    bucket.add(new_book)
+
+    assert list(listing) == books[250:] + [new_book]
+    assert list(bucket.iter_items()) == books[:5] + books[250:] + [new_book]
+
+def make_catalog_items(folder, items):
+    """Writes the items into a catalog file in the folder, returns the mapped items"""
+    json_file_name = str(folder / 'items.json')
+    records = [item.instance_to_dict() for item in items]
+    with open(json_file_name, 'w') as f:
+        json.dump(records, f)
+    assert columnar_catalog.write_catalog(json_file_name, records)
+    return columnar_catalog.open_catalog(json_file_name)
+
+def all_pages(library, item_type=None, page_size=3):
+    """Returns the pages ids, each page starts after the last id of the page before it (the cursor)"""
+    pages, after_item_id = [], None
+    while True:
+        ids = [item.get_item_id() for item in islice(display.iter_items(library, item_type, after_item_id), page_size)]
+        rows, next_after_item_id = display.get_items_page(library, item_type, after_item_id, page_size)
+        assert len(rows) == len(ids)
+        pages.append(ids)
+        if next_after_item_id is None:
+            return pages
+        assert next_after_item_id == ids[-1]
+        after_item_id = next_after_item_id
+
+def mixed_items():
+    """Returns books, magazines, and DVDs mixed in one list"""
+    return [
+        (Book if number % 3 == 0 else Magazine if number % 3 == 1 else DVD)(f'Title {number}', 'Author', True)
+        for number in range(20)
+    ]
+
+def test_next_page_starts_after_the_last_id():
+    """The pages of the cursor are the listing split into pages (nothing skipped, nothing repeated)"""
+    library = Library([], mixed_items())
+    for item_type in (None, 'Book', 'DVD'):
+        listing = [item.get_item_id() for item in display.iter_items(library, item_type)]
+        pages = all_pages(library, item_type)
+        assert [item_id for page in pages for item_id in page] == listing
+        assert all(len(page) == 3 for page in pages[:-1])
+
+def test_next_page_in_the_catalog(tmp_path):
+    """The mapped catalog resumes from the item number in its type column, and the added items after it"""
+    items = mixed_items()
+    mapped = make_catalog_items(tmp_path, items)
+    assert isinstance(mapped, columnar_catalog.MappedItems)
+    library = Library([], mapped)
+    library.add_item(Book('New Book', 'Author', True))
+
+    pages = all_pages(library, 'Book')
+    assert [library.get_item(item_id).get_title() for page in pages for item_id in page] == (
+        [item.get_title() for item in items if item.get_type() == 'Book'] + ['New Book']
+    )
+    assert [item_id for page in all_pages(library) for item_id in page] == [item.get_item_id() for item in display.iter_items(library)]
+
+def test_next_page_after_a_removed_item():
+    """The last item of a page was removed before the next page => the next page still starts right after it"""
+    books = make_books(6)
+    library = Library([], list(books))
+    rows, after_item_id = display.get_items_page(library, 'Book', page_size=3)
+    assert after_item_id == books[2].get_item_id()
+
+    assert library.remove_item(books[2])
+    assert [item.get_item_id() for item in display.iter_items(library, 'Book', after_item_id)] == [book.get_item_id() for book in books[3:]]
+
+def test_unknown_cursor():
+    """A cursor item that was never listed is an error (not the first page again)"""
+    library = Library([], make_books(3))
+    with pytest.raises(ItemNotFoundError):
+        list(display.iter_items(library, 'Book', 'no-such-id'))
@@ -0,0 +1,52 @@
+"""
+Tests of the overdue loans: the oldest due time first, and returned items leave the overdue list
+"""
+import time
+from models.book import Book
+from models.due_index import DueIndex
+from models.library import DAY_SECONDS, LOAN_DAYS
+
+# a time after the loans that start now are due
+def after_the_loan_days():
+    """Returns a time a bit after the due time of a loan that starts now"""
+    return time.time() + LOAN_DAYS * DAY_SECONDS + 5
+
+def test_due_index_order():
+    """The overdue entries are ordered by the due time, the limit keeps the oldest ones"""
+    due_index = DueIndex()
+    for item_id, due in (('c', 30.0), ('a', 10.0), ('d', 40.0), ('b', 20.0)):
+        due_index.add(item_id, due)
+    due_index.remove('b')
+
+    assert due_index.overdue(35.0) == [(10.0, 'a'), (30.0, 'c')]
+    assert due_index.overdue(100.0, 2) == [(10.0, 'a'), (30.0, 'c')]
+    assert due_index.overdue(5.0) == []
+
+def test_library_overdue_oldest_first(make_library):
+    """The loans are overdue after the loan days, the oldest first, and a returned item isn't overdue"""
+    books = [Book(f'Book {number}', 'Author', True) for number in range(3)]
+    library, users = make_library(*books, users_count=2)
+
+    assert library.borrow_item(users[0], books[2])
+    # the second loan is due a bit later
+    time.sleep(0.01)
+    assert library.borrow_item(users[1], books[0])
+    assert library.get_overdue() == []
+
+    later = after_the_loan_days()
+    overdue = library.get_overdue(later)
+    assert [loan['item'] for loan in overdue] == [books[2], books[0]]
+    assert [loan['user'] for loan in overdue] == users
+    assert [loan['item'] for loan in library.get_overdue(later, 1)] == [books[2]]
+
+    assert library.return_item(users[0], books[2])
+    assert [loan['item'] for loan in library.get_overdue(later)] == [books[0]]
+
+def test_overdue_after_loading_again(make_library, reload_library):
+    """The due times are saved with the users, so the loaded library finds the same overdue loans"""
+    book = Book('Dune', 'Frank Herbert', True)
+    library, users = make_library(book, users_count=1)
+    assert library.borrow_item(users[0], book)
+
+    loaded_library, _, _ = reload_library(users, [book])
+    assert [loan['item_id'] for loan in loaded_library.get_overdue(after_the_loan_days())] == [book.get_item_id()]
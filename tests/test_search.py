@@ -0,0 +1,53 @@
+"""
+Tests of the search limits: the service and the SQLite backend read just the first matched items (limit + 1)
+"""
+import asyncio
+import pytest
+from models.book import Book
+from models.dvd import DVD
+from models.library import Library
+from services import sqlite_storage
+from services.server import LibraryServer
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """Makes the SQLite backend use a new database file in a temp folder, with 10 DVDs then 10 books"""
+    monkeypatch.setattr(sqlite_storage, 'DATABASE_FILE_NAME', str(tmp_path / 'library.db'))
+    monkeypatch.setattr(sqlite_storage, '_connection', None)
+    items = [DVD(f'Ocean {number}', 'Author', True) for number in range(10)]
+    items += [Book(f'Ocean Book {number}', 'Author', True) for number in range(10)]
+    sqlite_storage.migrate([item.instance_to_dict() for item in items], [])
+    yield items
+    sqlite_storage.get_connection().close()
+
+def test_sqlite_search_by_type_limit(database):
+    """The type is changed to the stored name, and just `limit` rows are read (in the items order)"""
+    dvds = [item.get_item_id() for item in database[:10]]
+    assert [item.get_item_id() for item in sqlite_storage.search_by_type('dvd', 4)] == dvds[:4]
+    assert [item.get_item_id() for item in sqlite_storage.search_by_type('DVD')] == dvds
+    assert sqlite_storage.search_by_type('poster', 4) == []
+
+def test_sqlite_search_by_type_uses_the_type_index(database):
+    """The query compares the type column itself, so SQLite searches it using the type index"""
+    plan = sqlite_storage.get_connection().execute(
+        'EXPLAIN QUERY PLAN SELECT item_id FROM items WHERE type = ? ORDER BY rowid LIMIT ?', ('DVD', 5)
+    ).fetchall()
+    assert any('idx_items_type_name' in row[-1] for row in plan)
+
+def test_sqlite_search_by_title_limit(database):
+    """Both the starts with, and the contains searches stop at the limit"""
+    assert [item.get_title() for item in sqlite_storage.search_by_title('oc', 3)] == ['Ocean 0', 'Ocean 1', 'Ocean 2']
+    assert [item.get_title() for item in sqlite_storage.search_by_title('book', 2)] == ['Ocean Book 0', 'Ocean Book 1']
+    assert len(sqlite_storage.search_by_title('ocean')) == 20
+
+def test_service_search_by_type_limit():
+    """The service answers the first `limit` items of the type, and tells if there are more"""
+    books = [Book(f'Book {number}', 'Author', True) for number in range(30)]
+    server = LibraryServer([], Library([], list(books)))
+
+    response = asyncio.run(server.dispatch({'op': 'search', 'by': 'type', 'query': 'book', 'limit': 5}))
+    assert response['ok'] and response['more']
+    assert [item['item_id'] for item in response['items']] == [book.get_item_id() for book in books[:5]]
+
+    response = asyncio.run(server.dispatch({'op': 'search', 'by': 'type', 'query': 'book', 'limit': 30}))
+    assert response['ok'] and not response['more'] and len(response['items']) == 30
@@ -0,0 +1,50 @@
+"""
+Tests of the titles trigram index: searching while another thread removes items (and the index is built again)
+"""
+import threading
+import time
+from models.book import Book
+from models.title_index import TitleIndex
+
+def test_rebuild_keeps_the_results():
+    """Removing most of the items builds the index again, the other items are still found in order"""
+    books = [Book(f'Ocean {number}', 'Author', True) for number in range(50)]
+    index = TitleIndex(books)
+    for book in books[:40]:
+        assert index.remove(book)
+
+    assert index.search('ocean') == books[40:]
+    assert index.search('oc') == books[40:]
+    assert index.search('ocean 45') == [books[45]]
+    new_book = Book('Ocean New', 'Author', True)
+    index.add(new_book)
+    assert index.search('ocean', 3) == books[40:43]
+    assert index.search('ocean n') == [new_book]
+
+def test_search_while_building_again():
+    """A search that runs while the index is built again never misses an item that stays in it"""
+    kept = Book('Dune Messiah', 'Frank Herbert', True)
+    index = TitleIndex([kept])
+    others = [Book(f'Dune Part {number}', 'Author', True) for number in range(200)]
+    stop = threading.Event()
+
+    def change():
+        """Add then remove many items again and again (each removing round builds the index again)"""
+        while not stop.is_set():
+            for book in others:
+                index.add(book)
+            for book in others:
+                index.remove(book)
+
+    changer = threading.Thread(target=change)
+    changer.start()
+    missed = 0
+    try:
+        end = time.perf_counter() + 0.5
+        while time.perf_counter() < end:
+            if kept not in index.search('dune m') or kept not in index.search('du'):
+                missed += 1
+    finally:
+        stop.set()
+        changer.join()
+    assert missed == 0
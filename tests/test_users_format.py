@@ -0,0 +1,65 @@
+"""
+Tests of the users format (the borrowed, reserved, and waiting items as id sets),
+and the migration of the users saved in the old format (lists of the items dictionaries)
+"""
+import json
+from models.book import Book
+from models.library import Library
+from models.user import User
+from services import storage
+
+def old_user_dict(book):
+    """Returns a user dictionary in the old format that borrowed the book"""
+    return {
+        'user_id': 'user-1', 'name': 'Sara', 'email': 'sara@library.com',
+        'borrowed_items': [{'title': book.get_title(), 'author': book.get_author(), 'item_id': book.get_item_id(), 'due': 100.0}],
+        'reserved_items': []
+    }
+
+def test_migrate_dict_converts_the_old_lists():
+    """The lists become item id => details, without the title and the author, and the missing waiting items are added"""
+    book = Book('Dune', 'Frank Herbert', False)
+    old = old_user_dict(book)
+
+    assert User.is_old_format(old)
+    migrated = User.migrate_dict(old)
+    assert migrated == {
+        'user_id': 'user-1', 'name': 'Sara', 'email': 'sara@library.com',
+        'borrowed_items': {book.get_item_id(): {'due': 100.0}}, 'reserved_items': {}, 'waiting_items': {}
+    }
+    assert not User.is_old_format(migrated)
+    # the old dictionary is not changed
+    assert isinstance(old['borrowed_items'], list)
+
+def test_migrate_dict_keeps_the_new_format():
+    """A dictionary that is already in the new format is returned as it is"""
+    user_dict = User('Sara', 'sara@library.com').instance_to_dict()
+    assert User.migrate_dict(user_dict) is user_dict
+
+def test_old_user_in_the_library():
+    """An old format user is a borrower of its item, and can return it"""
+    book = Book('Dune', 'Frank Herbert', False)
+    user = User.dict_to_instance(old_user_dict(book))
+    library = Library([user], [book])
+
+    assert library.get_borrower(book.get_item_id()) is user
+    assert library.return_item(user, book)
+    assert book.check_availability()
+    assert user.get_borrowed_items() == {}
+
+def test_old_users_file_is_stored_again(data_folder):
+    """Loading an old users file converts the users, then `migrate_old_users()` writes them in the new format"""
+    book = Book('Dune', 'Frank Herbert', False)
+    with open(storage.USERS_FILE_NAME, 'w') as f:
+        json.dump([old_user_dict(book)], f)
+
+    users = storage.load_users()
+    assert users[0].get_borrowed_items() == {book.get_item_id(): {'due': 100.0}}
+    assert storage.migrate_old_users(users)
+
+    with open(storage.USERS_FILE_NAME) as f:
+        saved = json.load(f)
+    assert not User.is_old_format(saved[0])
+    assert saved[0]['borrowed_items'] == {book.get_item_id(): {'due': 100.0}}
+    # the next loading has nothing to migrate
+    assert not storage.migrate_old_users(storage.load_users())
@@ -0,0 +1,72 @@
+"""
+Tests of the reservation queues: first come, first served, and the first waiting user gets the returned item
+"""
+import pytest
+from models.book import Book
+from models.waitlist import Waitlist
+
+@pytest.fixture
+def borrowed_book(make_library):
+    """Returns (the library, its users, a book that the first user borrowed)"""
+    book = Book('Dune', 'Frank Herbert', True)
+    library, users = make_library(book)
+    assert library.borrow_item(users[0], book)
+    return library, users, book
+
+def test_waitlist_order():
+    """The users leave the queue in the order they joined, an older ticket goes before the newer ones"""
+    waitlist = Waitlist()
+    assert waitlist.add('a', 1) and waitlist.add('b', 2) and waitlist.add('c', 3)
+    assert not waitlist.add('a', 4)
+    assert waitlist.remove('b')
+    assert waitlist.position('c') == 2
+
+    waitlist = Waitlist([(5, 'a'), (9, 'b')])
+    assert waitlist.add('c', 7)
+    assert waitlist.user_ids() == ['a', 'c', 'b']
+    assert [waitlist.pop(), waitlist.pop(), waitlist.pop(), waitlist.pop()] == ['a', 'c', 'b', None]
+
+def test_positions_in_the_queue(borrowed_book):
+    """Reserving a borrowed item joins its queue, canceling moves the next users forward"""
+    library, users, book = borrowed_book
+    for user in users[1:]:
+        assert library.make_reservation(user, book)
+    # the same user twice, or the borrower => refused
+    assert not library.make_reservation(users[1], book)
+    assert not library.make_reservation(users[0], book)
+
+    assert [library.get_waitlist_position(user, book) for user in users[1:]] == [1, 2, 3]
+    assert library.cancel_reserve(users[2], book)
+    assert library.get_waitlist_position(users[3], book) == 2
+
+def test_return_gives_the_item_to_the_first_waiting_user(borrowed_book):
+    """Returning a waited item reserves it for the first user of the queue, in order"""
+    library, users, book = borrowed_book
+    assert library.make_reservation(users[1], book) and library.make_reservation(users[2], book)
+
+    assert library.return_item(users[0], book)
+    assert library.get_reserver(book.get_item_id()) is users[1]
+    assert not book.check_availability()
+    assert users[1].get_reserved_items() and not users[1].get_waiting_items()
+    assert library.get_waitlist_position(users[2], book) == 1
+
+    # the holder borrows it, then returns it => the next user
+    assert library.borrow_item(users[1], book)
+    assert library.return_item(users[1], book)
+    assert library.get_reserver(book.get_item_id()) is users[2]
+    assert library.get_waitlist_length(book.get_item_id()) == 0
+
+    # nobody waiting => canceling makes it available
+    assert library.cancel_reserve(users[2], book)
+    assert book.check_availability() and library.get_available_count('Book') == 1
+
+def test_queue_is_kept_when_loading_again(borrowed_book, reload_library):
+    """The queue order is the same after saving and loading it"""
+    library, users, book = borrowed_book
+    for user in (users[3], users[1], users[2]):
+        assert library.make_reservation(user, book)
+
+    loaded_library, loaded_users, (loaded_book,) = reload_library(users, [book])
+    assert [user.get_name() for user in loaded_library.get_waiting_users(loaded_book.get_item_id())] == ['user 3', 'user 1', 'user 2']
+    assert loaded_library.return_item(loaded_users[0], loaded_book)
+    assert loaded_library.get_reserver(loaded_book.get_item_id()) is loaded_users[3]